@@ -1,21 +1,23 @@
 from __future__ import annotations
 
 
-from pydantic import BaseModel, Field
 from typing import Literal, Any
 
 import json, os
+import contextvars
 import logging
-
-from langchain.agents import create_agent
-from langchain.tools import tool
-from langchain.agents.structured_output import ToolStrategy
-
-
-from langchain_openai import ChatOpenAI
-from langchain_community.utilities.searchapi import SearchApiAPIWrapper
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+from typing import Callable
 
 from utils.paper import ArxivPaper
+from utils.rate_limit import TokenBucket
+from utils.tracing import tracer
+from utils.paper_store import normalize_arxiv_id
+from backend.rerank_cache import RerankCache, text_hash
+from backend.rerank_scheduler import TokenUsage
+from backend.search_client import use_search_budget
 from backend.rerank_utils import (
     apply_llm_rerank_result,
     mark_llm_rerank_failed,
@@ -24,7 +26,13 @@ from backend.rerank_utils import (
 
 
 
-def _build_langchain_agent(cfg):
+_BATCH_PAPER_BLOCK = "[{arxiv_id}]\nTitle: {title}\nAbstract: {abstract}"
+
+
+@lru_cache(maxsize=None)
+def _response_format():
+    # pydantic is imported here so fully cached runs never load it.
+    from pydantic import BaseModel, Field
 
     class ResponseFormat(BaseModel):
         relevant: bool
@@ -33,28 +41,51 @@ def _build_langchain_agent(cfg):
         action: Literal["reject", "maybe_read", "shortlist", "clarify"]
         used_search: bool
 
-    def _build_llm(llm_cfg):
-        # TODO: add support for other LLMs if needed, now only deepseek-chat supported
-        if not llm_cfg.get("api_key"):
-            raise ValueError("Missing LLM API key. Set LANGCHAIN_RERANK_LLM_API_KEY in .env.")
-        model = ChatOpenAI(**llm_cfg)
-        return model
-    
+    return ResponseFormat
+
+
+def _batch_response_schema() -> dict[str, Any]:
+    # A plain JSON schema (not a pydantic model) so one malformed verdict does not reject
+    # the whole batch; each item is validated against ResponseFormat on its own.
+    verdict = _response_format().model_json_schema()
+    verdict["properties"] = {"arxiv_id": {"type": "string"}, **verdict["properties"]}
+    verdict["required"] = ["arxiv_id", *verdict.get("required", [])]
+    return {
+        "title": "BatchResponseFormat",
+        "description": "One verdict per candidate paper, keyed by arxiv_id.",
+        "type": "object",
+        "properties": {"verdicts": {"type": "array", "items": verdict}},
+        "required": ["verdicts"],
+    }
+
+
+def _build_llm(llm_cfg: dict[str, Any]):
+    # TODO: add support for other LLMs if needed, now only deepseek-chat supported
+    from langchain_openai import ChatOpenAI
+
+    if not llm_cfg.get("api_key"):
+        raise ValueError("Missing LLM API key. Set LANGCHAIN_RERANK_LLM_API_KEY in .env.")
+    return ChatOpenAI(**llm_cfg)
+
+
+def _build_langchain_agent(cfg, batched: bool = False, search_client=None, llm=None, system_prompt=None):
+    # langchain is imported here so fully cached runs never load it.
+    from langchain.agents import create_agent
+    from langchain.tools import tool
+    from langchain.agents.structured_output import ToolStrategy
+    from backend.search_client import SearchApiClient
+
     def _build_search_api_tool(tool_cfg: dict):
         if not tool_cfg.get("api_key"):
             raise ValueError("Missing search API key. Set LANGCHAIN_RERANK_SEARCH_API_KEY in .env.")
+        client = search_client or SearchApiClient.from_config(tool_cfg)
+
         @tool
         def search_api(query: str) -> str:
             """Search for brief context on a term or retrieve a paper abstract. 2-12 words."""
-            wrapper = SearchApiAPIWrapper(
-                api_key=tool_cfg["api_key"],
-                engine=tool_cfg["engine"],
-            )
-            results = wrapper.search(
-                query,
-                max_results=tool_cfg["max_results"],
-                max_snippet_length=tool_cfg["max_snippet_length"],
-            )
+            results = client.search(query)
+            if results is None:
+                return "Search budget for this run is exhausted; decide from the title and abstract."
             return json.dumps(results, ensure_ascii=False)
 
         return search_api
@@ -68,14 +99,13 @@ def _build_langchain_agent(cfg):
             raise ValueError(f"Unknown tool: {tool_name}") from exc
 
     return create_agent(
-        model=_build_llm(cfg["llm"]),
+        model=llm or _build_llm(cfg["llm"]),
         tools=[build_tool(name, cfg["tools"][name]) for name in cfg.get("tools", {})],
-        system_prompt=cfg["prompt"]["system"],
-        response_format=ToolStrategy(ResponseFormat),
+        system_prompt=cfg["prompt"]["system"] if system_prompt is None else system_prompt,
+        response_format=ToolStrategy(_batch_response_schema() if batched else _response_format()),
     )
 
 
-
 def _struct_resp2dict(struct_resp) -> dict[str, Any] | None:
     if struct_resp is None:
         return None
@@ -88,31 +118,23 @@ def _struct_resp2dict(struct_resp) -> dict[str, Any] | None:
     return {"_raw": struct_resp}
 
 
-def langchain_llm_rerank(
-    overview_text: str,
-    papers: list[ArxivPaper],
-    cfg_path: str = "data/langchain_rerank.json",
-    **kwargs
-) -> list[ArxivPaper]:
-
+def load_rerank_config(cfg_path: str) -> dict[str, Any]:
+    """Read and validate the rerank config; env API keys override the file."""
     with open(cfg_path, "r", encoding="utf-8") as f:
         cfg = json.load(f)
-
-    assert type(cfg) is dict
-    prompt_cfg = cfg.get("prompt", {})
-    if "system_path" in prompt_cfg:
-        system_path = prompt_cfg["system_path"]
-        if not os.path.isabs(system_path) and not os.path.exists(system_path):
-            system_path = os.path.join(os.path.dirname(cfg_path), system_path)
-        with open(system_path, "r", encoding="utf-8") as f:
-            prompt_cfg["system"] = f.read().strip()
-    if "template_path" in prompt_cfg:
-        template_path = prompt_cfg["template_path"]
-        if not os.path.isabs(template_path) and not os.path.exists(template_path):
-            template_path = os.path.join(os.path.dirname(cfg_path), template_path)
-        with open(template_path, "r", encoding="utf-8") as f:
-            prompt_cfg["template"] = f.read().strip()
-    cfg["prompt"] = prompt_cfg
+    if not isinstance(cfg, dict):
+        raise ValueError(f"{cfg_path}: expected a JSON object")
+    prompt_cfg = cfg.setdefault("prompt", {})
+    for name in ("system", "template", "batch_template"):
+        prompt_path = prompt_cfg.get(f"{name}_path")
+        if prompt_path and not os.path.isabs(prompt_path) and not os.path.exists(prompt_path):
+            prompt_cfg[f"{name}_path"] = os.path.join(os.path.dirname(cfg_path), prompt_path)
+    if not prompt_cfg.get("template") and not prompt_cfg.get("template_path"):
+        raise ValueError(f"{cfg_path}: prompt.template or prompt.template_path is required")
+    if not cfg.get("llm", {}).get("model"):
+        raise ValueError(f"{cfg_path}: llm.model is required")
+    if int(cfg.get("concurrency", {}).get("max_in_flight", 1)) < 1:
+        raise ValueError(f"{cfg_path}: concurrency.max_in_flight must be >= 1")
 
     llm_key = os.environ.get("LANGCHAIN_RERANK_LLM_API_KEY")
     if llm_key:
@@ -120,26 +142,403 @@ def langchain_llm_rerank(
     tool_key = os.environ.get("LANGCHAIN_RERANK_SEARCH_API_KEY")
     if tool_key and cfg.get("tools", {}).get("search_api"):
         cfg["tools"]["search_api"]["api_key"] = tool_key
+    return cfg
+
+
+class RerankSession:
+    """Long-lived LangChain rerank state: config, caches, rate limiter, LLM client and agents.
+
+    Config and env keys are read once. Prompt files are re-read when their mtime
+    changes; a new system prompt rebuilds the agents on the existing LLM client, a new
+    template only changes the next prompts. `rerank` and `rerank_one` may be called
+    repeatedly and from several threads.
+    """
+
+    def __init__(self, cfg_path: str = "data/langchain_rerank.json", call_timeout_s: float | None = None):
+        self.cfg_path = cfg_path
+        self.cfg = load_rerank_config(cfg_path)
+        if call_timeout_s:
+            # ChatOpenAI's request timeout; bounds how far an in-flight call can overrun a deadline.
+            self.cfg["llm"]["timeout"] = call_timeout_s
+        self.call_timeout_s = self.cfg["llm"].get("timeout")
+        self.usage = TokenUsage()
+        self.pricing = self.cfg.get("pricing", {})
+        self.cache = RerankCache.from_config(self.cfg.get("cache", {}))
+        concurrency_cfg = self.cfg.get("concurrency", {})
+        self.max_in_flight = max(1, int(concurrency_cfg.get("max_in_flight", 1)))
+        self.rate = concurrency_cfg.get("requests_per_second")
+        self.bucket = TokenBucket(self.rate, concurrency_cfg.get("burst")) if self.rate else None
+        self.batching = self.cfg.get("batching", {})
+        self.search_client = None
+        search_cfg = self.cfg.get("tools", {}).get("search_api")
+        if search_cfg and search_cfg.get("api_key"):
+            from backend.search_client import SearchApiClient
+
+            # Batched and single-paper agents share one client: pooled HTTP session and result cache.
+            self.search_client = SearchApiClient.from_config(search_cfg)
+        self._prompt_files: dict[str, tuple[int, str]] = {}
+        self._llm = None
+        self._agents: dict[bool, tuple[str, Any]] = {}
+        self._lock = threading.RLock()
+
+    def prompts(self) -> dict[str, str]:
+        """Current system/template/batch_template text, re-reading files whose mtime changed."""
+        prompt_cfg = self.cfg["prompt"]
+        prompts = {}
+        with self._lock:
+            for name in ("system", "template", "batch_template"):
+                path = prompt_cfg.get(f"{name}_path")
+                if not path:
+                    prompts[name] = prompt_cfg.get(name, "")
+                    continue
+                mtime = os.stat(path).st_mtime_ns
+                cached = self._prompt_files.get(name)
+                if cached is None or cached[0] != mtime:
+                    with open(path, "r", encoding="utf-8") as f:
+                        cached = (mtime, f.read().strip())
+                    if name in self._prompt_files:
+                        logging.info("Reloaded %s prompt from %s", name, path)
+                    self._prompt_files[name] = cached
+                prompts[name] = cached[1]
+        return prompts
+
+    def agent(self, batched: bool = False, system_prompt: str | None = None):
+        system_prompt = self.prompts()["system"] if system_prompt is None else system_prompt
+        with self._lock:
+            built = self._agents.get(batched)
+            if built is None or built[0] != system_prompt:
+                if self._llm is None:
+                    self._llm = _build_llm(self.cfg["llm"])
+                built = (
+                    system_prompt,
+                    _build_langchain_agent(
+                        self.cfg,
+                        batched=batched,
+                        search_client=self.search_client,
+                        llm=self._llm,
+                        system_prompt=system_prompt,
+                    ),
+                )
+                self._agents[batched] = built
+            return built[1]
+
+    @property
+    def chunk_size(self) -> int:
+        """Papers per LLM request: the batch size when batching is on, else 1."""
+        return max(1, int(self.batching.get("max_papers", 8))) if self.batching.get("enabled") else 1
+
+    def estimate_tokens(self, papers: list[ArxivPaper], overview_text: str) -> int:
+        """Rough input tokens for judging `papers` in one request (or one request each)."""
+        prompts = self.prompts()
+        chars_per_token = float(self.batching.get("chars_per_token", 4.0))
+        if len(papers) > 1 and self.chunk_size > 1 and prompts["batch_template"]:
+            text = prompts["batch_template"].format(
+                overview=overview_text, count=len(papers), papers=_format_batch_papers(papers)
+            )
+            return _estimate_tokens(prompts["system"] + text, chars_per_token)
+        return sum(
+            _estimate_tokens(
+                prompts["system"]
+                + prompts["template"].format(overview=overview_text, title=p.title, abstract=p.summary),
+                chars_per_token,
+            )
+            for p in papers
+        )
+
+    def cost(self, input_tokens: float, output_tokens: float) -> float:
+        return (
+            input_tokens * float(self.pricing.get("input_per_million", 0.0))
+            + output_tokens * float(self.pricing.get("output_per_million", 0.0))
+        ) / 1e6
+
+    def apply_cached(self, papers: list[ArxivPaper], overview_text: str) -> list[ArxivPaper]:
+        """Apply cached verdicts; returns the papers that still need an LLM call."""
+        cache = self.cache
+        if not cache:
+            return list(papers)
+        cache_key = self._cache_key(self.prompts(), overview_text)
+        pending: list[ArxivPaper] = []
+        for paper in papers:
+            cached = cache.get(paper.arxiv_id, *cache_key)
+            if cached is not None:
+                apply_llm_rerank_result(paper, cached)
+            else:
+                pending.append(paper)
+        tracer.count("llm_cache.hits", len(papers) - len(pending))
+        tracer.count("llm_cache.misses", len(pending))
+        logging.info("LLM rerank cache: %s", cache.stats())
+        return pending
+
+    def new_search_budget(self):
+        """A per-run `SearchBudget` for the search tool, or None without one."""
+        return self.search_client.new_budget() if self.search_client is not None else None
+
+    def rerank(self, papers: list[ArxivPaper], overview_text: str, search_budget=None) -> list[ArxivPaper]:
+        """Judge `papers` in place (cache first, then batched and single-paper calls).
+
+        Search tool calls are charged to `search_budget`, which the caller owns for the
+        whole run (see `RerankScheduler`); without one this call is its own run.
+        """
+        prompts = self.prompts()
+        cache, cache_key = self.cache, self._cache_key(prompts, overview_text)
+        pending = self.apply_cached(papers, overview_text)
+        if not pending:
+            return papers
+
+        def _store(paper: ArxivPaper, normalized: dict[str, Any] | None) -> None:
+            if normalized is not None and cache:
+                cache.put(paper.arxiv_id, *cache_key, normalized)
+
+        own_budget = search_budget is None
+        if own_budget:
+            search_budget = self.new_search_budget()
+        with use_search_budget(search_budget):
+            if self.batching.get("enabled") and len(pending) > 1 and prompts["batch_template"]:
+                batches = _pack_batches(
+                    pending,
+                    overview_text,
+                    prompts["system"],
+                    prompts["batch_template"],
+                    max_papers=int(self.batching.get("max_papers", 8)),
+                    max_input_tokens=int(self.batching.get("max_input_tokens", 6000)),
+                    chars_per_token=float(self.batching.get("chars_per_token", 4.0)),
+                )
+                batch_agent = self.agent(batched=True, system_prompt=prompts["system"])
+                logging.info("LLM rerank: %s papers packed into %s batched calls", len(pending), len(batches))
 
-    agent = _build_langchain_agent(cfg)
+                def _run_batch(batch: list[ArxivPaper]) -> list[ArxivPaper]:
+                    verdicts = _rerank_batch(
+                        batch_agent, prompts["batch_template"], overview_text, batch, self.bucket, self.usage
+                    )
+                    for paper in batch:
+                        _store(paper, verdicts.get(paper.arxiv_id))
+                    return [paper for paper in batch if paper.arxiv_id not in verdicts]
 
+                pending = [p for leftover in _map(_run_batch, batches, self.max_in_flight) for p in leftover]
+                if pending:
+                    tracer.count("llm.batch_fallbacks", len(pending))
+                    logging.info("LLM rerank: %s papers fall back to single-paper calls", len(pending))
+            if pending:
+                agent = self.agent(system_prompt=prompts["system"])
+                logging.info(
+                    "LLM rerank: %s papers, max_in_flight=%s, rate=%s/s",
+                    len(pending),
+                    self.max_in_flight,
+                    self.rate or "unlimited",
+                )
+                _map(
+                    lambda paper: _store(
+                        paper,
+                        _rerank_one(agent, prompts["template"], overview_text, paper, self.bucket, self.usage),
+                    ),
+                    pending,
+                    self.max_in_flight,
+                )
+        if own_budget and search_budget is not None:
+            logging.info("Search API: %s", search_budget.stats())
+        return papers
 
-    prompt_template = cfg["prompt"]["template"]
-    
+    def rerank_one(self, paper: ArxivPaper, overview_text: str, search_budget=None) -> dict[str, Any] | None:
+        """Judge one paper with a single-paper call (cache first); returns the verdict or None."""
+        prompts = self.prompts()
+        cache_key = self._cache_key(prompts, overview_text)
+        cached = self.cache.get(paper.arxiv_id, *cache_key) if self.cache else None
+        if cached is not None:
+            apply_llm_rerank_result(paper, cached)
+            return cached
+        agent = self.agent(system_prompt=prompts["system"])
+        with use_search_budget(search_budget or self.new_search_budget()):
+            normalized = _rerank_one(agent, prompts["template"], overview_text, paper, self.bucket, self.usage)
+        if normalized is not None and self.cache:
+            self.cache.put(paper.arxiv_id, *cache_key, normalized)
+        return normalized
 
+    def close(self) -> None:
+        if self.search_client is not None:
+            self.search_client.close()
+        if self.cache:
+            # Once per session, not per call: the scheduler calls `rerank` per chunk.
+            self.cache.prune()
+            self.cache.close()
+
+    def __enter__(self) -> "RerankSession":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    def _cache_key(self, prompts: dict[str, str], overview_text: str) -> tuple[str, str, str]:
+        # The batch template shapes verdicts only while batching is on.
+        batch_template = prompts["batch_template"] if self.batching.get("enabled") else ""
+        return (
+            text_hash(overview_text),
+            text_hash(prompts["system"], prompts["template"], batch_template),
+            str(self.cfg.get("llm", {}).get("model", "")),
+        )
+
+
+def langchain_llm_rerank(
+    overview_text: str,
+    papers: list[ArxivPaper],
+    cfg_path: str = "data/langchain_rerank.json",
+    **kwargs
+) -> list[ArxivPaper]:
+    """One-shot rerank; long-running callers should keep a `RerankSession` (see `rerank_registry.get_session`)."""
+    with RerankSession(cfg_path) as session:
+        return session.rerank(papers, overview_text)
+
+
+def _map(fn: Callable[[Any], Any], items: list[Any], max_in_flight: int) -> list[Any]:
+    if max_in_flight == 1 or len(items) <= 1:
+        return [fn(item) for item in items]
+    # Each worker writes only to its own papers, so results keep the caller's order
+    # regardless of which call finishes first.
+    # Workers run in a copy of the caller's context, so they see its search budget.
+    with ThreadPoolExecutor(max_workers=min(max_in_flight, len(items))) as pool:
+        futures = [pool.submit(contextvars.copy_context().run, fn, item) for item in items]
+        return [future.result() for future in futures]
+
+
+def _estimate_tokens(text: str, chars_per_token: float) -> int:
+    return int(len(text) / chars_per_token) + 1
+
+
+def _format_batch_papers(papers: list[ArxivPaper]) -> str:
+    return "\n\n".join(
+        _BATCH_PAPER_BLOCK.format(arxiv_id=p.arxiv_id, title=p.title, abstract=p.summary) for p in papers
+    )
+
+
+def _pack_batches(
+    papers: list[ArxivPaper],
+    overview_text: str,
+    system_prompt: str,
+    batch_template: str,
+    max_papers: int = 8,
+    max_input_tokens: int = 6000,
+    chars_per_token: float = 4.0,
+) -> list[list[ArxivPaper]]:
+    """Greedily pack papers (in order) so each prompt stays under `max_input_tokens`.
+
+    The system prompt and overview are paid once per batch; a paper that does not fit
+    on its own still gets a batch of one.
+    """
+    base = _estimate_tokens(
+        system_prompt + batch_template.format(overview=overview_text, count=0, papers=""),
+        chars_per_token,
+    )
+    batches: list[list[ArxivPaper]] = []
+    current: list[ArxivPaper] = []
+    used = base
     for paper in papers:
-        context = prompt_template.format(overview=overview_text, title=paper.title, abstract=paper.summary)
-        resp = agent.invoke({"messages": [{"role": "user", "content": context}]})
-        logging.info("agent resp keys=%s", list(resp.keys()))
-        structured_response = resp.get("structured_response")
-        logging.info("structured_response type=%s value=%s", type(structured_response), structured_response)
-        structured_response = _struct_resp2dict(structured_response)
-        logging.info(f"LLM rerank response for {paper.arxiv_id}: {structured_response}")
-
-        if structured_response:
-            normalized = normalize_llm_rerank_output(structured_response)
+        cost = _estimate_tokens(_format_batch_papers([paper]), chars_per_token) + 1
+        if current and (len(current) >= max(1, max_papers) or used + cost > max_input_tokens):
+            batches.append(current)
+            current, used = [], base
+        current.append(paper)
+        used += cost
+    if current:
+        batches.append(current)
+    return batches
+
+
+def _validate_verdict(item: Any) -> dict[str, Any] | None:
+    from pydantic import ValidationError
+
+    try:
+        verdict = _response_format().model_validate(item)
+    except ValidationError:
+        return None
+    return normalize_llm_rerank_output(verdict.model_dump())
+
+
+def _rerank_batch(
+    agent,
+    batch_template: str,
+    overview_text: str,
+    papers: list[ArxivPaper],
+    bucket: TokenBucket | None = None,
+    usage: TokenUsage | None = None,
+) -> dict[str, dict[str, Any]]:
+    """One call for several papers; returns the valid verdicts by arxiv_id and applies them.
+
+    Papers missing from the result (call error, unknown id, malformed verdict) are left
+    untouched for the caller to retry one at a time.
+    """
+    context = batch_template.format(
+        overview=overview_text, count=len(papers), papers=_format_batch_papers(papers)
+    )
+    if bucket is not None:
+        bucket.acquire()
+    tracer.count("llm.batch_calls")
+    try:
+        with tracer.span("llm.batch_call", papers=len(papers)):
+            resp = agent.invoke({"messages": [{"role": "user", "content": context}]})
+    except Exception as exc:
+        logging.warning("Batched LLM rerank of %s papers failed: %s", len(papers), exc)
+        return {}
+    _count_tokens(resp, usage)
+    structured_response = _struct_resp2dict(resp.get("structured_response")) or {}
+    logging.debug("Batched LLM rerank response: %s", structured_response)
+
+    by_id = {normalize_arxiv_id(p.arxiv_id): p for p in papers}
+    verdicts: dict[str, dict[str, Any]] = {}
+    items = structured_response.get("verdicts")
+    for item in items if isinstance(items, list) else []:
+        if not isinstance(item, dict):
+            continue
+        paper = by_id.get(normalize_arxiv_id(str(item.get("arxiv_id", ""))))
+        if paper is None or paper.arxiv_id in verdicts:
+            continue
+        normalized = _validate_verdict(item)
+        if normalized is not None:
             apply_llm_rerank_result(paper, normalized)
-        else:
-            logging.warning("LLM rerank failed for %s: no structured response", paper.arxiv_id)
-            mark_llm_rerank_failed(paper)
-    return papers
+            verdicts[paper.arxiv_id] = normalized
+    return verdicts
+
+
+def _rerank_one(
+    agent,
+    prompt_template: str,
+    overview_text: str,
+    paper: ArxivPaper,
+    bucket: TokenBucket | None = None,
+    usage: TokenUsage | None = None,
+) -> dict[str, Any] | None:
+    context = prompt_template.format(overview=overview_text, title=paper.title, abstract=paper.summary)
+    if bucket is not None:
+        bucket.acquire()
+    tracer.count("llm.calls")
+    try:
+        with tracer.span("llm.call", arxiv_id=paper.arxiv_id):
+            resp = agent.invoke({"messages": [{"role": "user", "content": context}]})
+    except Exception as exc:
+        logging.warning("LLM rerank failed for %s: %s", paper.arxiv_id, exc)
+        tracer.count("llm.failures")
+        mark_llm_rerank_failed(paper)
+        return None
+    _count_tokens(resp, usage)
+    structured_response = _struct_resp2dict(resp.get("structured_response"))
+    # Full responses are only logged at DEBUG; formatting them at INFO is costly at volume.
+    logging.debug("LLM rerank response for %s: %s", paper.arxiv_id, structured_response)
+
+    if structured_response:
+        normalized = normalize_llm_rerank_output(structured_response)
+        apply_llm_rerank_result(paper, normalized)
+        return normalized
+    logging.warning("LLM rerank failed for %s: no structured response", paper.arxiv_id)
+    tracer.count("llm.failures")
+    mark_llm_rerank_failed(paper)
+    return None
+
+
+def _count_tokens(resp: dict[str, Any], usage: TokenUsage | None = None) -> None:
+    for message in resp.get("messages", []):
+        metadata = getattr(message, "usage_metadata", None)
+        if metadata:
+            input_tokens = metadata.get("input_tokens", 0)
+            output_tokens = metadata.get("output_tokens", 0)
+            tracer.count("llm.input_tokens", input_tokens)
+            tracer.count("llm.output_tokens", output_tokens)
+            if usage is not None:
+                usage.add(input_tokens, output_tokens)
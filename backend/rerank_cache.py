@@ -0,0 +1,148 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from typing import Any
+
+
+def text_hash(*parts: str) -> str:
+    digest = hashlib.sha256()
+    for part in parts:
+        digest.update(part.encode("utf-8"))
+        digest.update(b"\0")
+    return digest.hexdigest()[:16]
+
+
+class RerankCache:
+    """SQLite store of normalized LLM rerank verdicts.
+
+    Entries are keyed on (arxiv_id, overview hash, prompt hash, model) so a change
+    to any of them is a miss. Expired rows are dropped on read and on `prune`;
+    `max_entries` keeps only the most recently written rows.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        ttl_seconds: float | None = None,
+        max_entries: int | None = None,
+    ):
+        self.path = path
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        if path != ":memory:":
+            os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS verdicts (
+                arxiv_id TEXT NOT NULL,
+                overview_hash TEXT NOT NULL,
+                prompt_hash TEXT NOT NULL,
+                model TEXT NOT NULL,
+                verdict TEXT NOT NULL,
+                created_at REAL NOT NULL,
+                PRIMARY KEY (arxiv_id, overview_hash, prompt_hash, model)
+            )
+            """
+        )
+        self._conn.execute(
+            "CREATE INDEX IF NOT EXISTS verdicts_created_at ON verdicts (created_at)"
+        )
+        self._conn.commit()
+
+    @classmethod
+    def from_config(cls, cache_cfg: dict[str, Any]) -> "RerankCache | None":
+        if not cache_cfg or not cache_cfg.get("enabled", True):
+            return None
+        ttl_hours = cache_cfg.get("ttl_hours")
+        return cls(
+            cache_cfg.get("path", "data/cache/llm_rerank.sqlite"),
+            ttl_seconds=ttl_hours * 3600 if ttl_hours else None,
+            max_entries=cache_cfg.get("max_entries"),
+        )
+
+    def get(
+        self, arxiv_id: str, overview_hash: str, prompt_hash: str, model: str
+    ) -> dict[str, Any] | None:
+        key = (arxiv_id, overview_hash, prompt_hash, model)
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT verdict, created_at FROM verdicts WHERE arxiv_id=? AND overview_hash=? "
+                "AND prompt_hash=? AND model=?",
+                key,
+            ).fetchone()
+            if row is not None and self._expired(row[1]):
+                self._conn.execute(
+                    "DELETE FROM verdicts WHERE arxiv_id=? AND overview_hash=? "
+                    "AND prompt_hash=? AND model=?",
+                    key,
+                )
+                self._conn.commit()
+                row = None
+            if row is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+        return json.loads(row[0])
+
+    def put(
+        self,
+        arxiv_id: str,
+        overview_hash: str,
+        prompt_hash: str,
+        model: str,
+        verdict: dict[str, Any],
+    ) -> None:
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO verdicts VALUES (?, ?, ?, ?, ?, ?)",
+                (
+                    arxiv_id,
+                    overview_hash,
+                    prompt_hash,
+                    model,
+                    json.dumps(verdict, ensure_ascii=False),
+                    time.time(),
+                ),
+            )
+            self._conn.commit()
+
+    def prune(self) -> int:
+        removed = 0
+        with self._lock:
+            if self.ttl_seconds:
+                cur = self._conn.execute(
+                    "DELETE FROM verdicts WHERE created_at < ?",
+                    (time.time() - self.ttl_seconds,),
+                )
+                removed += cur.rowcount
+            if self.max_entries:
+                cur = self._conn.execute(
+                    "DELETE FROM verdicts WHERE rowid NOT IN "
+                    "(SELECT rowid FROM verdicts ORDER BY created_at DESC LIMIT ?)",
+                    (int(self.max_entries),),
+                )
+                removed += cur.rowcount
+            self._conn.commit()
+        return removed
+
+    def stats(self) -> dict[str, int]:
+        with self._lock:
+            (size,) = self._conn.execute("SELECT COUNT(*) FROM verdicts").fetchone()
+        return {"hits": self.hits, "misses": self.misses, "entries": size}
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+    def _expired(self, created_at: float) -> bool:
+        return bool(self.ttl_seconds) and time.time() - created_at > self.ttl_seconds
@@ -1,6 +1,8 @@
 from __future__ import annotations
 
+import atexit
 import importlib
+import threading
 from dataclasses import dataclass
 from typing import Any, Callable
 
@@ -11,6 +13,7 @@ class BackendSpec:
     module: str
     function: str
     conda_env: str | None = None
+    session: str | None = None
 
 
 _BACKENDS: dict[str, BackendSpec] = {
@@ -19,9 +22,13 @@ _BACKENDS: dict[str, BackendSpec] = {
         module="backend.langchain_rerank",
         function="langchain_llm_rerank",
         conda_env="lc",
+        session="RerankSession",
     ),
 }
 
+_SESSIONS: dict[tuple[str, tuple], Any] = {}
+_SESSIONS_LOCK = threading.Lock()
+
 
 def get_backend_spec(name: str) -> BackendSpec:
     key = (name or "").strip().lower()
@@ -40,3 +47,33 @@ def load_backend(name: str) -> tuple[Callable[..., Any], BackendSpec]:
 
 def list_backends() -> list[str]:
     return sorted(_BACKENDS)
+
+
+def get_session(name: str, **options: Any) -> Any:
+    """Process-wide session for a backend, created on first use and reused afterwards.
+
+    Sessions are keyed on the backend and `options` (e.g. `cfg_path`), so repeated
+    calls with the same arguments share one config, LLM client and agent.
+    """
+    spec = get_backend_spec(name)
+    if spec.session is None:
+        raise ValueError(f"LLM rerank backend {spec.name} has no session support")
+    key = (spec.name, tuple(sorted(options.items())))
+    with _SESSIONS_LOCK:
+        session = _SESSIONS.get(key)
+        if session is None:
+            module = importlib.import_module(spec.module)
+            session = getattr(module, spec.session)(**options)
+            if not _SESSIONS:
+                # Closing flushes and prunes the session caches; the CLI exits through SystemExit.
+                atexit.register(close_sessions)
+            _SESSIONS[key] = session
+    return session
+
+
+def close_sessions() -> None:
+    with _SESSIONS_LOCK:
+        sessions = list(_SESSIONS.values())
+        _SESSIONS.clear()
+    for session in sessions:
+        session.close()
@@ -0,0 +1,179 @@
+from __future__ import annotations
+
+import logging
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from dataclasses import dataclass
+from typing import Any
+
+from utils.paper import ArxivPaper
+from utils.tracing import tracer
+from backend.rerank_utils import mark_llm_rerank_failed, mark_llm_rerank_skipped
+
+
+@dataclass(frozen=True)
+class RerankBudget:
+    deadline_s: float | None = None  # wall clock, counted from scheduler creation
+    max_tokens: int | None = None  # input + output tokens
+    max_cost: float | None = None  # in the currency of the config's `pricing`
+
+    @property
+    def unlimited(self) -> bool:
+        return not (self.deadline_s or self.max_tokens or self.max_cost)
+
+
+class TokenUsage:
+    """Thread-safe running total of provider-reported token usage."""
+
+    def __init__(self):
+        self.input_tokens = 0
+        self.output_tokens = 0
+        self._lock = threading.Lock()
+
+    def add(self, input_tokens: int, output_tokens: int) -> None:
+        with self._lock:
+            self.input_tokens += input_tokens
+            self.output_tokens += output_tokens
+
+    def snapshot(self) -> tuple[int, int]:
+        with self._lock:
+            return self.input_tokens, self.output_tokens
+
+
+class RerankScheduler:
+    """Runs a rerank session under a wall-clock deadline and a token/cost budget.
+
+    Cached verdicts are applied first. The rest are dispatched in chunks (one
+    batched prompt, or one paper when batching is off) in descending embedding score,
+    and dispatch stops as soon as the next chunk would miss the deadline or overrun
+    the budget, so the best candidates are judged first. Papers never dispatched are
+    marked skipped (not LLM-scored) rather than failed. A call in flight at the
+    deadline may overrun it by at most the session's `call_timeout_s`.
+
+    One scheduler covers one run: its clock, spend, reservations and search-tool
+    budget are shared by every `run` call, including concurrent ones (streaming,
+    multiple profiles).
+    """
+
+    # Output tokens assumed per verdict before any call has reported usage.
+    output_tokens_per_paper = 200
+
+    def __init__(self, session: Any, budget: RerankBudget, max_in_flight: int | None = None):
+        self.session = session
+        self.budget = budget
+        self.max_in_flight = max_in_flight or session.max_in_flight
+        self.started = time.monotonic()
+        self.skipped = 0
+        self.search_budget = session.new_search_budget()
+        self._usage_start = session.usage.snapshot()
+        self._reserved = (0, 0)
+        self._estimated_done = (0, 0)
+        self._judged_papers = 0
+        self._chunk_seconds: list[float] = []
+        self._lock = threading.Lock()
+
+    def run(self, papers: list[ArxivPaper], overview_text: str) -> list[ArxivPaper]:
+        if self.budget.unlimited:
+            return self.session.rerank(papers, overview_text, search_budget=self.search_budget)
+        pending = sorted(
+            self.session.apply_cached(papers, overview_text), key=lambda p: p.score or 0.0, reverse=True
+        )
+        size = self.session.chunk_size
+        chunks = [pending[i : i + size] for i in range(0, len(pending), size)]
+        in_flight: dict[Any, tuple[list[ArxivPaper], tuple[int, int]]] = {}
+        with ThreadPoolExecutor(max_workers=max(1, self.max_in_flight)) as pool:
+            while chunks or in_flight:
+                while chunks and len(in_flight) < self.max_in_flight:
+                    reserved = self._reserve(chunks[0], overview_text)
+                    if reserved is None:
+                        self._skip([p for chunk in chunks for p in chunk])
+                        chunks = []
+                        break
+                    chunk = chunks.pop(0)
+                    in_flight[pool.submit(self._run_chunk, chunk, overview_text)] = (chunk, reserved)
+                if not in_flight:
+                    break
+                done, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+                for future in done:
+                    chunk, reserved = in_flight.pop(future)
+                    with self._lock:
+                        self._reserved = (self._reserved[0] - reserved[0], self._reserved[1] - reserved[1])
+                        self._estimated_done = (
+                            self._estimated_done[0] + reserved[0],
+                            self._estimated_done[1] + reserved[1],
+                        )
+                        self._judged_papers += len(chunk)
+                    try:
+                        future.result()
+                    except Exception as exc:
+                        logging.warning("LLM rerank chunk of %s papers failed: %s", len(chunk), exc)
+                        for paper in chunk:
+                            mark_llm_rerank_failed(paper)
+        return papers
+
+    def spent(self) -> tuple[int, int]:
+        now_in, now_out = self.session.usage.snapshot()
+        return now_in - self._usage_start[0], now_out - self._usage_start[1]
+
+    def stats(self) -> dict[str, Any]:
+        spent_in, spent_out = self.spent()
+        stats = {
+            "elapsed_s": round(time.monotonic() - self.started, 3),
+            "input_tokens": spent_in,
+            "output_tokens": spent_out,
+            "cost": round(self.session.cost(spent_in, spent_out), 6),
+            "skipped": self.skipped,
+        }
+        if self.search_budget is not None:
+            stats["search_api"] = self.search_budget.stats()
+        return stats
+
+    def _run_chunk(self, chunk: list[ArxivPaper], overview_text: str) -> None:
+        start = time.monotonic()
+        self.session.rerank(chunk, overview_text, search_budget=self.search_budget)
+        with self._lock:
+            self._chunk_seconds.append(time.monotonic() - start)
+
+    def _reserve(self, chunk: list[ArxivPaper], overview_text: str) -> tuple[int, int] | None:
+        """Reserve the chunk's estimated (input, output) tokens, or None if it would miss the deadline or budget."""
+        with self._lock:
+            if self.budget.deadline_s:
+                elapsed = time.monotonic() - self.started
+                expected = (
+                    sum(self._chunk_seconds) / len(self._chunk_seconds) if self._chunk_seconds else 0.0
+                )
+                if elapsed + expected > self.budget.deadline_s:
+                    logging.info("LLM rerank deadline reached after %.1fs", elapsed)
+                    return None
+            spent_in, spent_out = self.spent()
+            reported = spent_in + spent_out > 0
+            if not reported:
+                # The provider reports no usage (yet): charge finished chunks at their estimates.
+                spent_in, spent_out = self._estimated_done
+            if self._judged_papers and reported:
+                # Observed usage per paper (cache hits inside a chunk make this conservative-low).
+                est_in = int(spent_in / self._judged_papers * len(chunk)) + 1
+                est_out = int(spent_out / self._judged_papers * len(chunk)) + 1
+            else:
+                est_in = self.session.estimate_tokens(chunk, overview_text)
+                est_out = self.output_tokens_per_paper * len(chunk)
+            total_in = spent_in + self._reserved[0] + est_in
+            total_out = spent_out + self._reserved[1] + est_out
+            if self.budget.max_tokens and total_in + total_out > self.budget.max_tokens:
+                logging.info("LLM rerank token budget reached (%s tokens committed)", spent_in + spent_out)
+                return None
+            if self.budget.max_cost and self.session.cost(total_in, total_out) > self.budget.max_cost:
+                logging.info("LLM rerank cost budget reached (%.4f spent)", self.session.cost(spent_in, spent_out))
+                return None
+            self._reserved = (self._reserved[0] + est_in, self._reserved[1] + est_out)
+            return est_in, est_out
+
+    def _skip(self, papers: list[ArxivPaper]) -> None:
+        for paper in papers:
+            mark_llm_rerank_skipped(paper)
+        with self._lock:
+            self.skipped += len(papers)
+        tracer.count("llm.skipped", len(papers))
+        if papers:
+            logging.info("LLM rerank: %s papers left unscored", len(papers))
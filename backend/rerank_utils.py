@@ -58,6 +58,16 @@ def apply_llm_rerank_result(paper: ArxivPaper, normalized: dict[str, Any]) -> No
     paper.llm_rerank_action = normalized["action"]
 
 
+def mark_llm_rerank_skipped(paper: ArxivPaper) -> None:
+    # Not judged (deadline or budget reached): fusion falls back to the embedding score.
+    paper.llm_rerank_skipped = True
+    paper.llm_rerank_failed = False
+    paper.llm_rerank_relevant = None
+    paper.llm_rerank_fit_score = None
+    paper.llm_rerank_reasons = []
+    paper.llm_rerank_action = ""
+
+
 def mark_llm_rerank_failed(paper: ArxivPaper) -> None:
     paper.llm_rerank_failed = True
     paper.llm_rerank_relevant = False
@@ -0,0 +1,304 @@
+from __future__ import annotations
+
+import contextlib
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from concurrent.futures import Future
+from contextvars import ContextVar
+from typing import Any, Iterator
+
+from utils.tracing import tracer
+
+SEARCHAPI_URL = "https://www.searchapi.io/api/v1/search"
+
+
+def normalize_query(query: str) -> str:
+    return " ".join(query.lower().split())
+
+
+class SearchResultCache:
+    """Search results kept in memory and, with a `path`, in SQLite across runs.
+
+    Keys are opaque strings (see `SearchApiClient.cache_key`); entries older than
+    `ttl_seconds` are treated as misses and dropped.
+    """
+
+    def __init__(self, path: str | None = None, ttl_seconds: float | None = None):
+        self.path = path
+        self.ttl_seconds = ttl_seconds
+        self._memory: dict[str, tuple[float, list[dict[str, Any]]]] = {}
+        # Separate locks, so memory lookups never wait behind a SQLite read or commit.
+        self._lock = threading.Lock()
+        self._db_lock = threading.Lock()
+        self._conn = None
+        if path:
+            if path != ":memory:":
+                os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+            self._conn = sqlite3.connect(path, check_same_thread=False)
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS search_results (
+                    key TEXT PRIMARY KEY,
+                    results TEXT NOT NULL,
+                    created_at REAL NOT NULL
+                )
+                """
+            )
+            self._conn.commit()
+
+    def get(self, key: str, memory_only: bool = False) -> list[dict[str, Any]] | None:
+        """Cached results for `key`; `memory_only` skips SQLite (no disk I/O)."""
+        with self._lock:
+            entry = self._memory.get(key)
+        if entry is None and not memory_only:
+            with self._db_lock:
+                row = (
+                    self._conn.execute(
+                        "SELECT created_at, results FROM search_results WHERE key=?", (key,)
+                    ).fetchone()
+                    if self._conn is not None
+                    else None
+                )
+            if row is not None:
+                entry = (row[0], json.loads(row[1]))
+                with self._lock:
+                    self._memory.setdefault(key, entry)
+        if entry is None:
+            return None
+        if self._expired(entry[0]):
+            with self._lock:
+                self._memory.pop(key, None)
+            if not memory_only:
+                with self._db_lock:
+                    if self._conn is not None:
+                        self._conn.execute("DELETE FROM search_results WHERE key=?", (key,))
+                        self._conn.commit()
+            return None
+        return entry[1]
+
+    def put(self, key: str, results: list[dict[str, Any]]) -> None:
+        created_at = time.time()
+        with self._lock:
+            self._memory[key] = (created_at, results)
+        with self._db_lock:
+            if self._conn is not None:
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO search_results VALUES (?, ?, ?)",
+                    (key, json.dumps(results, ensure_ascii=False), created_at),
+                )
+                self._conn.commit()
+
+    def prune(self) -> int:
+        if not self.ttl_seconds:
+            return 0
+        with self._db_lock:
+            if self._conn is None:
+                return 0
+            cur = self._conn.execute(
+                "DELETE FROM search_results WHERE created_at < ?",
+                (time.time() - self.ttl_seconds,),
+            )
+            self._conn.commit()
+        return cur.rowcount
+
+    def close(self) -> None:
+        with self._db_lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+    def _expired(self, created_at: float) -> bool:
+        return bool(self.ttl_seconds) and time.time() - created_at > self.ttl_seconds
+
+
+class SearchBudget:
+    """Outbound-call allowance and per-run counters for one rerank run.
+
+    Owned by whoever defines the run (the rerank scheduler, or a single `rerank`
+    call) and shared by all of its threads, so concurrent runs never reset or drain
+    each other's budget.
+    """
+
+    def __init__(self, max_calls: int | None = None):
+        self.max_calls = max_calls
+        self.calls = 0
+        self.hits = 0
+        self.shared = 0
+        self.over_budget = 0
+        self._lock = threading.Lock()
+
+    def take(self) -> bool:
+        """Reserve one outbound call; False (and counted) once `max_calls` are spent."""
+        with self._lock:
+            if self.max_calls is not None and self.calls >= self.max_calls:
+                self.over_budget += 1
+                return False
+            self.calls += 1
+            return True
+
+    def record(self, counter: str) -> None:
+        with self._lock:
+            setattr(self, counter, getattr(self, counter) + 1)
+
+    def stats(self) -> dict[str, int]:
+        with self._lock:
+            return {"calls": self.calls, "hits": self.hits, "shared": self.shared, "over_budget": self.over_budget}
+
+
+_RUN_BUDGET: ContextVar[SearchBudget | None] = ContextVar("search_budget", default=None)
+
+
+@contextlib.contextmanager
+def use_search_budget(budget: SearchBudget | None) -> Iterator[SearchBudget | None]:
+    """Charge `SearchApiClient.search` calls made in this context (and contexts copied from it) to `budget`."""
+    token = _RUN_BUDGET.set(budget)
+    try:
+        yield budget
+    finally:
+        _RUN_BUDGET.reset(token)
+
+
+class SearchApiClient:
+    """SearchApi.io client shared by every `search_api` tool call of a rerank session.
+
+    One pooled `requests.Session` serves all calls. Results are cached on the
+    normalized query, engine and `max_results`, and concurrent identical queries wait
+    on a single outbound request. Outbound requests are charged to the current run's
+    `SearchBudget` (`use_search_budget`; cache hits are free), falling back to a
+    client-wide one outside a run. `base_url` can point at a local stand-in server.
+    """
+
+    def __init__(
+        self,
+        api_key: str,
+        engine: str = "google",
+        max_results: int = 5,
+        max_snippet_length: int | None = None,
+        base_url: str = SEARCHAPI_URL,
+        timeout: float = 20.0,
+        max_calls: int | None = None,
+        cache: SearchResultCache | None = None,
+    ):
+        self.api_key = api_key
+        self.engine = engine
+        self.max_results = max_results
+        self.max_snippet_length = max_snippet_length
+        self.base_url = base_url
+        self.timeout = timeout
+        self.max_calls = max_calls
+        self.cache = cache or SearchResultCache()
+        self._default_budget = self.new_budget()
+        # requests is imported here so importing the budget helpers stays cheap.
+        import requests
+
+        self._session = requests.Session()
+        self._inflight: dict[str, Future] = {}
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_config(cls, tool_cfg: dict[str, Any]) -> "SearchApiClient":
+        cache_cfg = tool_cfg.get("cache", {})
+        ttl_hours = cache_cfg.get("ttl_hours")
+        cache = SearchResultCache(
+            cache_cfg.get("path", "data/cache/search_api.sqlite") if cache_cfg.get("enabled", True) else None,
+            ttl_seconds=ttl_hours * 3600 if ttl_hours else None,
+        )
+        return cls(
+            tool_cfg["api_key"],
+            engine=tool_cfg.get("engine", "google"),
+            max_results=tool_cfg.get("max_results", 5),
+            max_snippet_length=tool_cfg.get("max_snippet_length"),
+            base_url=tool_cfg.get("base_url", SEARCHAPI_URL),
+            timeout=tool_cfg.get("timeout", 20.0),
+            max_calls=tool_cfg.get("max_calls_per_run"),
+            cache=cache,
+        )
+
+    def cache_key(self, query: str) -> str:
+        raw = json.dumps([normalize_query(query), self.engine, self.max_results])
+        return hashlib.sha256(raw.encode("utf-8")).hexdigest()[:24]
+
+    def new_budget(self) -> SearchBudget:
+        """A fresh per-run budget of `max_calls` outbound requests."""
+        return SearchBudget(self.max_calls)
+
+    def search(self, query: str, budget: SearchBudget | None = None) -> list[dict[str, Any]] | None:
+        """Results for `query`, or None when the run's search budget is spent."""
+        budget = budget or _RUN_BUDGET.get() or self._default_budget
+        key = self.cache_key(query)
+        # SQLite is read and written outside `_lock`, which only guards the in-flight table.
+        results = self.cache.get(key)
+        if results is None:
+            with self._lock:
+                # A leader may have finished since the lookup above; its results are in memory by now.
+                results = self.cache.get(key, memory_only=True)
+                if results is None:
+                    future = self._inflight.get(key)
+                    leader = future is None
+                    if leader:
+                        if not budget.take():
+                            tracer.count("search_api.over_budget")
+                            return None
+                        future = Future()
+                        self._inflight[key] = future
+                    else:
+                        budget.record("shared")
+        if results is not None:
+            budget.record("hits")
+            tracer.count("search_api.cache_hits")
+            return self._truncate(results)
+        if not leader:
+            return self._truncate(future.result())
+        try:
+            results = self._fetch(query)
+            self.cache.put(key, results)
+            future.set_result(results)
+        except Exception as exc:
+            future.set_exception(exc)
+            raise
+        finally:
+            with self._lock:
+                self._inflight.pop(key, None)
+        return self._truncate(results)
+
+    def close(self) -> None:
+        self.cache.prune()
+        self.cache.close()
+        self._session.close()
+
+    def _fetch(self, query: str) -> list[dict[str, Any]]:
+        tracer.count("search_api.calls")
+        with tracer.span("search_api.call", query=query):
+            resp = self._session.get(
+                self.base_url,
+                params={"engine": self.engine, "q": query, "num": self.max_results},
+                headers={"Authorization": f"Bearer {self.api_key}"},
+                timeout=self.timeout,
+            )
+            resp.raise_for_status()
+            data = resp.json()
+        results = []
+        answer = data.get("answer_box") or {}
+        if answer.get("answer") or answer.get("snippet"):
+            results.append(
+                {
+                    "title": answer.get("title", ""),
+                    "link": answer.get("link", ""),
+                    "snippet": answer.get("answer") or answer.get("snippet"),
+                }
+            )
+        for item in data.get("organic_results", []):
+            results.append(
+                {"title": item.get("title", ""), "link": item.get("link", ""), "snippet": item.get("snippet", "")}
+            )
+        return results[: self.max_results]
+
+    def _truncate(self, results: list[dict[str, Any]]) -> list[dict[str, Any]]:
+        if not self.max_snippet_length:
+            return results
+        return [{**r, "snippet": r["snippet"][: self.max_snippet_length]} for r in results]
@@ -0,0 +1,100 @@
+"""Recall and latency of the IVF corpus index against the exact scoring paths.
+
+Run: python -m benchmarks.bench_ann_index --corpus 20000 --candidates 500
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import time
+
+import numpy as np
+
+from utils.ann_index import IVFIndex, knn_decay_scores, l2_normalize, time_decay_weights
+
+
+def _clustered(rng: np.random.Generator, n: int, dim: int, centers: np.ndarray) -> np.ndarray:
+    labels = rng.integers(0, len(centers), size=n)
+    return l2_normalize(centers[labels] + 0.35 * rng.standard_normal((n, dim)).astype(np.float32))
+
+
+def _overlap(a: np.ndarray, b: np.ndarray, n: int) -> float:
+    top_a = set(np.argsort(-a)[:n].tolist())
+    top_b = set(np.argsort(-b)[:n].tolist())
+    return len(top_a & top_b) / max(1, n)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--corpus", type=int, default=20_000)
+    parser.add_argument("--candidates", type=int, default=500)
+    parser.add_argument("--dim", type=int, default=384)
+    parser.add_argument("--k", type=int, default=32)
+    parser.add_argument("--n_probe", type=int, nargs="+", default=[4, 8, 16, 32])
+    parser.add_argument("--top_n", type=int, default=50)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(args.seed)
+    centers = rng.standard_normal((64, args.dim)).astype(np.float32)
+    corpus = _clustered(rng, args.corpus, args.dim, centers)
+    candidates = _clustered(rng, args.candidates, args.dim, centers)
+    weights = time_decay_weights(args.corpus)
+
+    start = time.perf_counter()
+    dense = (candidates @ corpus.T) @ weights * 10
+    dense_s = time.perf_counter() - start
+
+    start = time.perf_counter()
+    profile = (corpus.T @ weights)
+    centroid = (candidates @ profile) * 10
+    centroid_s = time.perf_counter() - start
+
+    index = IVFIndex(args.dim)
+    start = time.perf_counter()
+    index.add(corpus)
+    if not index.is_trained:
+        index.train()
+    build_s = time.perf_counter() - start
+
+    start = time.perf_counter()
+    exact_sims, exact_ids = index.search(candidates, args.k, exact=True)
+    exact_knn_s = time.perf_counter() - start
+    exact_knn = knn_decay_scores(exact_sims, exact_ids, weights)
+
+    report = {
+        "corpus": args.corpus,
+        "candidates": args.candidates,
+        "dim": args.dim,
+        "k": args.k,
+        "dense_matrix_s": dense_s,
+        "weighted_profile_s": centroid_s,
+        "weighted_profile_max_abs_diff": float(np.abs(dense - centroid).max()),
+        "index_build_s": build_s,
+        "n_lists": int(len(index.centroids)),
+        "exact_knn_s": exact_knn_s,
+        "probes": [],
+    }
+    for n_probe in args.n_probe:
+        index.n_probe = n_probe
+        start = time.perf_counter()
+        sims, ids = index.search(candidates, args.k)
+        search_s = time.perf_counter() - start
+        scores = knn_decay_scores(sims, ids, weights)
+        recall = np.mean(
+            [len(set(a.tolist()) & set(b.tolist())) / args.k for a, b in zip(ids, exact_ids)]
+        )
+        report["probes"].append(
+            {
+                "n_probe": n_probe,
+                "search_s": search_s,
+                f"neighbour_recall@{args.k}": float(recall),
+                f"top{args.top_n}_overlap_vs_exact_knn": _overlap(scores, exact_knn, args.top_n),
+                f"top{args.top_n}_overlap_vs_dense": _overlap(scores, dense, args.top_n),
+            }
+        )
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,115 @@
+"""Embedding throughput: input-order vs length-bucketed batches, and scaling with threads and worker processes.
+
+Run:     python -m benchmarks.bench_encoding --texts 4000 --threads 1 2 4 --workers 1 2 4
+Offline: python -m benchmarks.bench_encoding --encoder fake
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import random
+import time
+
+import numpy as np
+
+from benchmarks.fixtures import hashing_encoder_loader
+from utils.encoder import (
+    DEFAULT_EMBEDDING_MODEL,
+    ENGINES,
+    EncoderPool,
+    encode_batched,
+    get_encoder,
+    set_num_threads,
+)
+
+_VOCAB = (
+    "we propose a method for robot learning with diffusion policies transformer model "
+    "benchmark results show improved sample efficiency across tasks in simulation and real "
+    "world experiments the approach scales to large datasets and outperforms prior baselines"
+).split()
+
+
+def _abstracts(n: int, seed: int) -> list[str]:
+    # Abstract lengths on arXiv are skewed: mostly 100-250 words with a long tail.
+    rng = random.Random(seed)
+    lengths = [min(600, max(20, int(rng.lognormvariate(5.0, 0.45)))) for _ in range(n)]
+    return [" ".join(rng.choice(_VOCAB) for _ in range(words)) for words in lengths]
+
+
+def _timed(fn) -> tuple[float, np.ndarray]:
+    start = time.perf_counter()
+    out = fn()
+    return time.perf_counter() - start, out
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--texts", type=int, default=4000)
+    parser.add_argument("--batch_size", type=int, default=32)
+    parser.add_argument("--max_batch_chars", type=int, default=32_000)
+    parser.add_argument("--threads", type=int, nargs="+", default=[1, 2, 4])
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4])
+    parser.add_argument("--model", default=DEFAULT_EMBEDDING_MODEL)
+    parser.add_argument("--engine", choices=ENGINES, default="torch")
+    parser.add_argument("--encoder", choices=["model", "fake"], default="model")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", default=None)
+    args = parser.parse_args()
+
+    texts = _abstracts(args.texts, args.seed)
+    fake = args.encoder == "fake"
+    loader = hashing_encoder_loader if fake else None
+    encoder = (loader or get_encoder)(args.model, "cpu", args.engine)
+    encoder.encode(texts[: args.batch_size])  # warm-up
+    report: dict = {
+        "texts": len(texts),
+        "mean_chars": round(sum(map(len, texts)) / len(texts), 1),
+        "cpu_count": os.cpu_count(),
+        "model": "fake" if fake else args.model,
+        "engine": args.engine,
+        "batch_size": args.batch_size,
+    }
+
+    def naive() -> np.ndarray:
+        size = args.batch_size
+        return np.concatenate([encoder.encode(texts[i : i + size]) for i in range(0, len(texts), size)])
+
+    naive_s, reference = _timed(naive)
+    bucketed_s, bucketed = _timed(lambda: encode_batched(encoder, texts, args.batch_size, args.max_batch_chars))
+    report["input_order"] = {"seconds": round(naive_s, 3), "texts_per_s": round(len(texts) / naive_s, 1)}
+    report["bucketed"] = {
+        "seconds": round(bucketed_s, 3),
+        "texts_per_s": round(len(texts) / bucketed_s, 1),
+        "max_abs_diff": float(np.abs(reference - bucketed).max()),
+    }
+
+    report["threads"] = {}
+    if not fake and args.engine != "onnx":
+        for threads in args.threads:
+            set_num_threads(threads)
+            seconds, _ = _timed(lambda: encode_batched(encoder, texts, args.batch_size, args.max_batch_chars))
+            report["threads"][threads] = {"seconds": round(seconds, 3), "texts_per_s": round(len(texts) / seconds, 1)}
+
+    report["workers"] = {}
+    for workers in args.workers:
+        pool = EncoderPool(args.model, args.engine, workers, num_threads=1, loader=loader)
+        try:
+            pool.encode(texts[: args.batch_size * workers], args.batch_size)  # start workers, load models
+            seconds, pooled = _timed(lambda: pool.encode(texts, args.batch_size, args.max_batch_chars))
+        finally:
+            pool.close()
+        report["workers"][workers] = {
+            "seconds": round(seconds, 3),
+            "texts_per_s": round(len(texts) / seconds, 1),
+            "max_abs_diff": float(np.abs(reference - pooled).max()),
+        }
+
+    print(json.dumps(report, indent=2))
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
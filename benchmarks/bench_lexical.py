@@ -0,0 +1,85 @@
+"""BM25 prefilter: scoring throughput, and recall of the embedding top-k versus encode fraction.
+
+Run:     python -m benchmarks.bench_lexical --papers 20000 --top_k 50
+Offline: python -m benchmarks.bench_lexical --encoder fake
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import random
+import time
+
+import numpy as np
+
+from benchmarks.fixtures import hashing_encoder_loader
+from utils.ann_index import l2_normalize
+from utils.encoder import DEFAULT_EMBEDDING_MODEL, ENGINES, encode_batched, get_encoder
+from utils.lexical import bm25_scores, recall_report
+
+_TOPICS = {
+    "locomotion": "legged locomotion quadruped gait terrain sim-to-real policy reinforcement humanoid balance",
+    "manipulation": "grasping dexterous manipulation tactile object pose gripper imitation demonstrations",
+    "vision": "segmentation detection image backbone convolutional features pixel annotation",
+    "language": "language model tokens instruction tuning reasoning prompt benchmark alignment",
+    "graphs": "graph neural network message passing node edge molecular property prediction",
+    "theory": "convergence bound theorem convex optimization gradient regret complexity",
+}
+_FILLER = "we study a setting with results showing improved performance over prior baselines across experiments".split()
+
+
+def _abstracts(n: int, rng: random.Random) -> list[str]:
+    topics = [words.split() for words in _TOPICS.values()]
+    texts = []
+    for _ in range(n):
+        # Each abstract mixes one or two topics with generic filler, like real cross-listed papers.
+        mix = rng.sample(topics, rng.choice((1, 1, 2)))
+        words = [rng.choice(rng.choice(mix)) if rng.random() < 0.35 else rng.choice(_FILLER) for _ in range(160)]
+        texts.append(" ".join(words))
+    return texts
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--papers", type=int, default=20_000)
+    parser.add_argument("--top_k", type=int, default=50)
+    parser.add_argument("--margin", type=float, default=0.25)
+    parser.add_argument("--model", default=DEFAULT_EMBEDDING_MODEL)
+    parser.add_argument("--engine", choices=ENGINES, default="torch")
+    parser.add_argument("--encoder", choices=["model", "fake"], default="model")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    texts = _abstracts(args.papers, rng)
+    overview = f"{_TOPICS['locomotion']} {_TOPICS['manipulation']} robot learning from demonstrations"
+
+    start = time.perf_counter()
+    lexical = bm25_scores(texts, [overview])[:, 0]
+    lexical_s = time.perf_counter() - start
+
+    loader = hashing_encoder_loader if args.encoder == "fake" else get_encoder
+    encoder = loader(args.model, "cpu", args.engine)
+    start = time.perf_counter()
+    vectors = l2_normalize(np.asarray(encode_batched(encoder, texts), dtype=np.float32))
+    embed_s = time.perf_counter() - start
+    profile = l2_normalize(np.asarray(encoder.encode([overview]), dtype=np.float32))[0]
+    embedding = vectors @ profile
+
+    sizes = [args.top_k * factor for factor in (1, 2, 3, 5, 10, 20, 50) if args.top_k * factor < args.papers]
+    report = recall_report(lexical, embedding, args.top_k, sizes, args.margin)
+    report.update(
+        {
+            "model": "fake" if args.encoder == "fake" else args.model,
+            "lexical_s": round(lexical_s, 3),
+            "lexical_docs_per_s": round(args.papers / lexical_s, 1),
+            "embed_s": round(embed_s, 3),
+        }
+    )
+    for row in report["sizes"]:
+        row["est_speedup"] = round(embed_s / (embed_s * row["encode_fraction"] + lexical_s), 2)
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
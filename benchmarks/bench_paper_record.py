@@ -0,0 +1,73 @@
+"""Memory per paper and serialization throughput of ArxivPaper on a synthetic backfill.
+
+Run: python -m benchmarks.bench_paper_record --papers 100000
+"""
+from __future__ import annotations
+
+import argparse
+import gc
+import json
+import pickle
+import time
+import tracemalloc
+
+from benchmarks.fixtures import synthetic_results
+from utils.paper import ArxivPaper
+
+
+def _timed(label: str, fn, n: int, report: dict) -> object:
+    start = time.perf_counter()
+    out = fn()
+    seconds = time.perf_counter() - start
+    report[label] = {"seconds": seconds, "papers_per_s": n / seconds if seconds else None}
+    return out
+
+
+def _measure_bytes(build) -> tuple[object, int]:
+    gc.collect()
+    tracemalloc.start()
+    objects = build()
+    current, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return objects, current
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--papers", type=int, default=100_000)
+    args = parser.parse_args()
+    n = args.papers
+
+    results, result_bytes = _measure_bytes(lambda: synthetic_results(n))
+    report: dict = {"papers": n, "arxiv_result_bytes_per_paper": result_bytes / n}
+
+    papers = _timed("from_result", lambda: [ArxivPaper.from_result(r) for r in results], n, report)
+    del results
+    gc.collect()
+    dicts = [p.to_dict() for p in papers]
+    serialized = [p.to_json() for p in papers]
+    del papers
+    # Rebuild from JSON so every string is owned by the new records, as after a cache load.
+    papers, paper_bytes = _measure_bytes(lambda: [ArxivPaper.from_json(s) for s in serialized])
+    del serialized
+    report["arxiv_paper_bytes_per_paper"] = paper_bytes / n
+
+    _timed("to_dict", lambda: [p.to_dict() for p in papers], n, report)
+    _timed("from_dict", lambda: [ArxivPaper.from_dict(d) for d in dicts], n, report)
+    lines = _timed("to_json", lambda: [p.to_json() for p in papers], n, report)
+    _timed("from_json", lambda: [ArxivPaper.from_json(line) for line in lines], n, report)
+    blob = _timed("pickle_dumps", lambda: pickle.dumps(papers, protocol=pickle.HIGHEST_PROTOCOL), n, report)
+    _timed("pickle_loads", lambda: pickle.loads(blob), n, report)
+    report["pickle_bytes_per_paper"] = len(blob) / n
+    try:
+        packed = _timed("to_msgpack", lambda: [p.to_msgpack() for p in papers], n, report)
+        _timed("from_msgpack", lambda: [ArxivPaper.from_msgpack(b) for b in packed], n, report)
+        report["msgpack_bytes_per_paper"] = sum(map(len, packed)) / n
+    except ImportError:
+        report["msgpack"] = "not installed"
+    report["json_bytes_per_paper"] = sum(map(len, lines)) / n
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
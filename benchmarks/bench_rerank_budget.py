@@ -0,0 +1,109 @@
+"""LLM rerank budgets: how many papers `RerankScheduler` dispatches under a token or cost cap.
+
+Run: python -m benchmarks.bench_rerank_budget --papers 50 --max_tokens 5000
+
+Drives `RerankScheduler` over `FakeAgent`, with and without provider-reported
+usage, one and several chunks in flight. Checks that dispatch stops before the
+candidates run out, that reported spend stays within the cap, and that without
+usage reports the cap still holds at the prompt estimates; exits non-zero if a check fails.
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import tempfile
+from types import SimpleNamespace
+
+from backend import langchain_rerank
+from backend.rerank_scheduler import RerankBudget, RerankScheduler
+from benchmarks.fixtures import FakeAgent, synthetic_results
+from benchmarks.run_pipeline import _llm_config
+from utils.paper import ArxivPaper
+
+
+def _papers(n: int, seed: int) -> list[ArxivPaper]:
+    papers = [ArxivPaper.from_result(result) for result in synthetic_results(n, seed=seed)]
+    for rank, paper in enumerate(papers):
+        paper.score = float(n - rank)
+    return papers
+
+
+def _estimate_cap(session, papers: list[ArxivPaper], overview_text: str, budget: RerankBudget) -> int:
+    """Papers that fit the budget when each is charged its pre-usage estimate, in dispatch order."""
+    spent_in = spent_out = 0
+    for count, paper in enumerate(papers):
+        spent_in += session.estimate_tokens([paper], overview_text)
+        spent_out += RerankScheduler.output_tokens_per_paper
+        if budget.max_tokens and spent_in + spent_out > budget.max_tokens:
+            return count
+        if budget.max_cost and session.cost(spent_in, spent_out) > budget.max_cost:
+            return count
+    return len(papers)
+
+
+def _run_case(cfg_path: str, args, budget: RerankBudget, in_flight: int, report_usage: bool) -> dict:
+    agent = FakeAgent(latency_s=args.latency, report_usage=report_usage, seed=args.seed)
+    langchain_rerank._build_langchain_agent = lambda cfg, **kwargs: agent
+    session = langchain_rerank.RerankSession(cfg_path)
+    papers = _papers(args.papers, args.seed)
+    scheduler = RerankScheduler(session, budget, max_in_flight=in_flight)
+    scheduler.run(papers, args.overview)
+    stats = scheduler.stats()
+    return {
+        "in_flight": in_flight,
+        "report_usage": report_usage,
+        "dispatched": sum(not p.llm_rerank_skipped for p in papers),
+        "estimate_cap": _estimate_cap(session, papers, args.overview, budget),
+        **stats,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--papers", type=int, default=50)
+    parser.add_argument("--max_tokens", type=int, default=5000)
+    parser.add_argument("--in_flight", type=int, nargs="+", default=[1, 8])
+    parser.add_argument("--latency", type=float, default=0.01, help="Fake LLM call latency, seconds")
+    parser.add_argument("--overview", type=str, default="Robot learning from demonstration and sim-to-real transfer.")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    langchain_rerank._build_llm = lambda llm_cfg: None
+    report: dict = {"papers": args.papers, "max_tokens": args.max_tokens, "cases": []}
+    checks: dict[str, bool] = {}
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        cfg_path = _llm_config(SimpleNamespace(llm_concurrency=max(args.in_flight), llm_batch_size=1), tmp_dir)
+        pricing = langchain_rerank.RerankSession(cfg_path)
+        budgets = {
+            "tokens": RerankBudget(max_tokens=args.max_tokens),
+            # The same cap expressed as the cost of `max_tokens` input tokens.
+            "cost": RerankBudget(max_cost=pricing.cost(args.max_tokens, 0)),
+        }
+        for kind, budget in budgets.items():
+            if kind == "cost" and not budget.max_cost:
+                continue
+            for report_usage in (True, False):
+                for in_flight in args.in_flight:
+                    case = {"budget": kind, **_run_case(cfg_path, args, budget, in_flight, report_usage)}
+                    report["cases"].append(case)
+                    name = f"{kind}_{'usage' if report_usage else 'no_usage'}_in_flight_{in_flight}"
+                    checks[f"{name}_stops_dispatch"] = case["dispatched"] < args.papers
+                    if report_usage:
+                        spent = (
+                            case["input_tokens"] + case["output_tokens"]
+                            if kind == "tokens"
+                            else pricing.cost(case["input_tokens"], case["output_tokens"])
+                        )
+                        checks[f"{name}_spend_within_cap"] = spent <= (budget.max_tokens or budget.max_cost)
+                    else:
+                        checks[f"{name}_within_estimate_cap"] = case["dispatched"] <= case["estimate_cap"]
+
+    report["checks"] = checks
+    print(json.dumps(report, indent=2))
+    failed = [name for name, ok in checks.items() if not ok]
+    if failed:
+        raise SystemExit(f"Failed checks: {', '.join(failed)}")
+
+
+if __name__ == "__main__":
+    main()
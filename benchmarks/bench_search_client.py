@@ -0,0 +1,135 @@
+"""Search tool client against a local server: cache hits, single-flight dedup and the per-run call budget.
+
+Run: python -m benchmarks.bench_search_client --queries 200 --threads 8
+
+Drives `SearchApiClient` against `FakeSearchServer` and checks each behavior by the
+requests the server actually received; exits non-zero if a check fails.
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from backend.search_client import SearchApiClient, SearchResultCache, use_search_budget
+from benchmarks.fixtures import FakeSearchServer
+
+
+def _client(server: FakeSearchServer, cache_path: str, max_calls: int | None = None) -> SearchApiClient:
+    return SearchApiClient(
+        "bench", base_url=server.base_url, max_calls=max_calls, cache=SearchResultCache(cache_path)
+    )
+
+
+def _timed_searches(client: SearchApiClient, queries: list[str], threads: int, budget=None) -> tuple[float, list]:
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=threads) as pool:
+        results = list(pool.map(lambda query: client.search(query, budget), queries))
+    return time.perf_counter() - start, results
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--queries", type=int, default=200, help="Distinct queries per pass")
+    parser.add_argument("--threads", type=int, default=8)
+    parser.add_argument("--duplicates", type=int, default=32, help="Concurrent callers of one query")
+    parser.add_argument("--max_calls", type=int, default=40)
+    parser.add_argument("--latency", type=float, default=0.05, help="Server latency per request, seconds")
+    args = parser.parse_args()
+
+    server = FakeSearchServer(latency_s=args.latency)
+    tmp_dir = tempfile.mkdtemp(prefix="bench_search_client_")
+    cache_path = os.path.join(tmp_dir, "search_api.sqlite")
+    queries = [f"query term {i}" for i in range(args.queries)]
+    report: dict = {"queries": args.queries, "threads": args.threads, "latency_s": args.latency}
+    checks: dict[str, bool] = {}
+    try:
+        # Cold pass fetches every query once; the warm pass is served from memory.
+        client = _client(server, cache_path)
+        budget = client.new_budget()
+        cold_s, _ = _timed_searches(client, queries, args.threads, budget)
+        sent = len(server.queries)
+        # Same queries with different case and spacing share cache entries.
+        warm_s, _ = _timed_searches(client, [f"  {q.upper()} " for q in queries], args.threads, budget)
+        client.close()
+        report["cache"] = {
+            "cold_s": round(cold_s, 3),
+            "warm_s": round(warm_s, 4),
+            "warm_hits_per_s": round(args.queries / max(warm_s, 1e-9), 1),
+            **budget.stats(),
+        }
+        checks["cold_pass_fetches_each_query_once"] = sent == args.queries
+        checks["warm_pass_is_all_hits"] = len(server.queries) == sent and budget.hits == args.queries
+
+        # A new client (next process) reads the same results back from SQLite.
+        client = _client(server, cache_path)
+        budget = client.new_budget()
+        disk_s, _ = _timed_searches(client, queries, args.threads, budget)
+        client.close()
+        report["sqlite"] = {"seconds": round(disk_s, 4), "hits_per_s": round(args.queries / max(disk_s, 1e-9), 1)}
+        checks["sqlite_hits_across_clients"] = len(server.queries) == sent and budget.hits == args.queries
+
+        # Concurrent identical queries wait on one outbound request.
+        client = _client(server, ":memory:")
+        budget = client.new_budget()
+        barrier = threading.Barrier(args.duplicates)
+        before = len(server.queries)
+
+        def _duplicate(_: int):
+            barrier.wait()
+            return client.search("single flight query", budget)
+
+        start = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=args.duplicates) as pool:
+            results = list(pool.map(_duplicate, range(args.duplicates)))
+        report["single_flight"] = {
+            "callers": args.duplicates,
+            "seconds": round(time.perf_counter() - start, 3),
+            "requests_sent": len(server.queries) - before,
+            **budget.stats(),
+        }
+        checks["single_flight_sends_one_request"] = len(server.queries) - before == 1
+        checks["single_flight_callers_share_results"] = bool(results[0]) and all(r == results[0] for r in results)
+        client.close()
+
+        # Each run gets its own `max_calls`, even when two runs overlap on one client.
+        client = _client(server, ":memory:", max_calls=args.max_calls)
+        before = len(server.queries)
+        runs = [client.new_budget(), client.new_budget()]
+
+        def _run(index: int) -> list:
+            with use_search_budget(runs[index]):
+                return [client.search(f"budget run {index} query {i}") for i in range(args.max_calls * 2)]
+
+        with ThreadPoolExecutor(max_workers=2) as pool:
+            outcomes = list(pool.map(_run, range(2)))
+        report["budget"] = {
+            "max_calls": args.max_calls,
+            "requested_per_run": args.max_calls * 2,
+            "requests_sent": len(server.queries) - before,
+            "runs": [budget.stats() for budget in runs],
+        }
+        checks["budget_caps_each_run"] = all(
+            budget.calls == args.max_calls and budget.over_budget == args.max_calls for budget in runs
+        )
+        checks["budget_over_cap_returns_none"] = all(
+            sum(result is None for result in outcome) == args.max_calls for outcome in outcomes
+        )
+        checks["budget_requests_sent"] = len(server.queries) - before == 2 * args.max_calls
+        client.close()
+    finally:
+        server.close()
+
+    report["checks"] = checks
+    print(json.dumps(report, indent=2))
+    failed = [name for name, ok in checks.items() if not ok]
+    if failed:
+        raise SystemExit(f"Failed checks: {', '.join(failed)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,125 @@
+"""Build throughput, size and query latency of the FTS5 search index on synthetic abstracts.
+
+Run: python -m benchmarks.bench_search_index --docs 500000 --queries 200
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import random
+import statistics
+import string
+import tempfile
+import time
+
+from utils.paper import ArxivPaper
+from utils.search_index import SearchIndex
+
+_TOPICS = (
+    "diffusion locomotion manipulation legged humanoid policy transformer retrieval graph "
+    "quantum protein speech reinforcement planning benchmark segmentation"
+).split()
+
+
+def _vocabulary(rng: random.Random, size: int) -> list[str]:
+    words = set(_TOPICS)
+    while len(words) < size:
+        words.add("".join(rng.choice(string.ascii_lowercase) for _ in range(rng.randint(3, 11))))
+    return sorted(words)
+
+
+def _papers(start: int, count: int, vocab: list[str], weights: list[float], rng: random.Random) -> list[ArxivPaper]:
+    papers = []
+    for i in range(start, start + count):
+        words = rng.choices(vocab, weights=weights, k=170)
+        papers.append(
+            ArxivPaper(
+                arxiv_id=f"{2000 + i // 100000}.{i % 100000:05d}",
+                url=f"https://arxiv.org/abs/{i}",
+                title=" ".join(rng.choices(vocab, weights=weights, k=9)),
+                summary=" ".join(words),
+                authors=[f"Author {rng.randint(0, 50000)}" for _ in range(4)],
+                categories=rng.sample(["cs.RO", "cs.LG", "cs.AI", "cs.CV", "cs.CL"], 2),
+            )
+        )
+    return papers
+
+
+def _latency(index: SearchIndex, queries: list[str], **kwargs) -> dict[str, float]:
+    samples = []
+    for query in queries:
+        start = time.perf_counter()
+        index.search(query, **kwargs)
+        samples.append(time.perf_counter() - start)
+    samples.sort()
+    return {
+        "p50_ms": round(statistics.median(samples) * 1000, 3),
+        "p95_ms": round(samples[int(0.95 * (len(samples) - 1))] * 1000, 3),
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--docs", type=int, default=500_000)
+    parser.add_argument("--chunk", type=int, default=10_000)
+    parser.add_argument("--vocab", type=int, default=30_000)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--path", default=None, help="Index file (default: a temporary file)")
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    vocab = _vocabulary(rng, args.vocab)
+    weights = [1.0 / (rank + 1) for rank in range(len(vocab))]  # Zipf-like term frequencies
+    rng.shuffle(weights)
+    tmp_dir = tempfile.mkdtemp(prefix="arxivlens_search_")
+    path = args.path or os.path.join(tmp_dir, "search.sqlite")
+    index = SearchIndex(path)
+
+    build_s = 0.0
+    for start in range(0, args.docs, args.chunk):
+        papers = _papers(start, min(args.chunk, args.docs - start), vocab, weights, rng)
+        t0 = time.perf_counter()
+        index.add_papers(papers)
+        build_s += time.perf_counter() - t0
+    t0 = time.perf_counter()
+    index.optimize()
+    optimize_s = time.perf_counter() - t0
+    recommended = _papers(0, min(1000, args.docs), vocab, weights, random.Random(args.seed))
+    for paper in recommended:
+        paper.llm_rerank_reasons = [f"Relevant to {rng.choice(_TOPICS)} work"]
+    index.add_recommendations(recommended, "2026-01-01")
+    t0 = time.perf_counter()
+    unchanged = index.add_papers(recommended)
+    readd_s = time.perf_counter() - t0
+
+    common = sorted(vocab, key=lambda w: -weights[vocab.index(w)])[:50]
+    rare = rng.sample(vocab, 50)
+    pick = lambda pool: [rng.choice(pool) for _ in range(args.queries)]  # noqa: E731
+    query_sets = {
+        "common_term": pick(common),
+        "rare_term": pick(rare),
+        "two_terms": [f"{a} {b}" for a, b in zip(pick(common), pick(rare))],
+        "topic_phrase": [f'"{a} {b}"' for a, b in zip(pick(_TOPICS), pick(_TOPICS))],
+        "prefix": [f"{w[:3]}*" for w in pick(common)],
+        "title_column": [f"title:{w}" for w in pick(rare)],
+    }
+    report = {
+        "docs": len(index),
+        "build_s": round(build_s, 2),
+        "docs_per_s": round(args.docs / build_s, 1) if build_s else None,
+        "optimize_s": round(optimize_s, 2),
+        "readd_unchanged_1000_ms": round(readd_s * 1000, 2),
+        "readd_rows_written": unchanged,
+        "db_mb": round(sum(os.path.getsize(path + s) for s in ("", "-wal") if os.path.exists(path + s)) / 2**20, 1),
+        "queries": {name: _latency(index, queries) for name, queries in query_sets.items()},
+        "recommended_only": _latency(index, query_sets["common_term"], recommended_only=True),
+        "deep_page": _latency(index, query_sets["common_term"], offset=1000),
+    }
+    index.close()
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,46 @@
+"""Compare two `benchmarks.run_pipeline` result files stage by stage.
+
+Run: python -m benchmarks.compare base.json new.json --threshold 0.10
+Exits with status 1 when any stage's p50 slowed down by more than the threshold.
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import sys
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("base")
+    parser.add_argument("new")
+    parser.add_argument("--threshold", type=float, default=0.10, help="Allowed relative p50 slowdown")
+    args = parser.parse_args()
+
+    with open(args.base, "r", encoding="utf-8") as f:
+        base = json.load(f)
+    with open(args.new, "r", encoding="utf-8") as f:
+        new = json.load(f)
+
+    print(f"base {base.get('commit')}  ->  new {new.get('commit')}")
+    print(f"{'stage':<14}{'base p50':>12}{'new p50':>12}{'ratio':>9}{'base RSS':>11}{'new RSS':>10}")
+    regressions = []
+    for stage, new_stats in new["stages"].items():
+        base_stats = base["stages"].get(stage)
+        if base_stats is None:
+            print(f"{stage:<14}{'-':>12}{new_stats['p50_s']:>12.4f}")
+            continue
+        ratio = new_stats["p50_s"] / base_stats["p50_s"] if base_stats["p50_s"] else float("inf")
+        flag = ""
+        if ratio > 1 + args.threshold:
+            regressions.append(stage)
+            flag = "  REGRESSION"
+        print(
+            f"{stage:<14}{base_stats['p50_s']:>12.4f}{new_stats['p50_s']:>12.4f}{ratio:>9.2f}"
+            f"{base_stats['peak_rss_mb']:>11.1f}{new_stats['peak_rss_mb']:>10.1f}{flag}"
+        )
+    sys.exit(1 if regressions else 0)
+
+
+if __name__ == "__main__":
+    main()
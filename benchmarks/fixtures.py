@@ -0,0 +1,271 @@
+"""Offline fixtures: synthetic arXiv feeds and results, a hashing encoder, a fake LangChain agent and a stand-in search server."""
+from __future__ import annotations
+
+import datetime
+import hashlib
+import http.server
+import json
+import random
+import re
+import threading
+import time
+from types import SimpleNamespace
+from typing import Any
+from urllib.parse import parse_qs, urlparse
+from xml.sax.saxutils import escape
+
+import arxiv
+import numpy as np
+
+_WORDS = (
+    "robot learning diffusion policy legged locomotion manipulation reinforcement "
+    "transformer vision language model benchmark dataset sim-to-real control planning "
+    "graph neural network optimization convergence theorem protein retrieval speech"
+).split()
+
+
+def _paper_fields(i: int, rng: random.Random) -> dict[str, Any]:
+    base = datetime.datetime(2025, 1, 1, tzinfo=datetime.timezone.utc)
+    # Abstracts vary between roughly 300 and 2000 characters, like real arXiv abstracts.
+    n_words = rng.randint(45, 280)
+    summary = " ".join(rng.choice(_WORDS) for _ in range(n_words)).capitalize() + "."
+    short_id = f"25{(i // 100000) % 100:02d}.{i % 100000:05d}v1"
+    return {
+        "short_id": short_id,
+        "published": base + datetime.timedelta(minutes=i),
+        "title": " ".join(rng.choice(_WORDS) for _ in range(rng.randint(6, 14))).title(),
+        "authors": [f"Author {rng.randint(0, 5000)}" for _ in range(rng.randint(1, 8))],
+        "summary": summary,
+        "categories": rng.sample(["cs.RO", "cs.LG", "cs.AI", "cs.CV", "cs.CL"], rng.randint(1, 3)),
+    }
+
+
+def synthetic_results(n: int, seed: int = 0) -> list[arxiv.Result]:
+    rng = random.Random(seed)
+    results = []
+    for i in range(n):
+        fields = _paper_fields(i, rng)
+        results.append(
+            arxiv.Result(
+                entry_id=f"http://arxiv.org/abs/{fields['short_id']}",
+                updated=fields["published"],
+                published=fields["published"],
+                title=fields["title"],
+                authors=[arxiv.Result.Author(name) for name in fields["authors"]],
+                summary=fields["summary"],
+                primary_category=fields["categories"][0],
+                categories=fields["categories"],
+                links=[
+                    arxiv.Result.Link(
+                        f"http://arxiv.org/pdf/{fields['short_id']}", title="pdf", rel="related"
+                    )
+                ],
+            )
+        )
+    return results
+
+
+def synthetic_rss_feed(n: int, seed: int = 0, category: str = "cs.RO") -> str:
+    """Atom document shaped like `https://rss.arxiv.org/atom/<category>`."""
+    rng = random.Random(seed)
+    entries = []
+    for i in range(n):
+        fields = _paper_fields(i, rng)
+        paper_id = fields["short_id"].rsplit("v", 1)[0]
+        entries.append(
+            f"""<entry>
+  <id>oai:arXiv.org:{paper_id}</id>
+  <title>{escape(fields["title"])}</title>
+  <summary>{escape(fields["summary"])}</summary>
+  <published>{fields["published"].strftime("%Y-%m-%dT%H:%M:%SZ")}</published>
+  <arxiv:announce_type>{"new" if i % 4 else "cross"}</arxiv:announce_type>
+</entry>"""
+        )
+    return (
+        '<?xml version="1.0" encoding="utf-8"?>\n'
+        '<feed xmlns="http://www.w3.org/2005/Atom" xmlns:arxiv="http://arxiv.org/schemas/atom">\n'
+        f"<title>{category} updates on arXiv.org</title>\n" + "\n".join(entries) + "\n</feed>\n"
+    )
+
+
+def synthetic_api_feed(n: int, seed: int = 0) -> str:
+    """Atom document shaped like an `export.arxiv.org/api/query?id_list=...` response."""
+    rng = random.Random(seed)
+    entries = []
+    for i in range(n):
+        fields = _paper_fields(i, rng)
+        stamp = fields["published"].strftime("%Y-%m-%dT%H:%M:%SZ")
+        authors = "".join(f"<author><name>{escape(a)}</name></author>" for a in fields["authors"])
+        categories = "".join(f'<category term="{c}"/>' for c in fields["categories"])
+        entries.append(
+            f"""<entry>
+  <id>http://arxiv.org/abs/{fields["short_id"]}</id>
+  <updated>{stamp}</updated>
+  <published>{stamp}</published>
+  <title>{escape(fields["title"])}</title>
+  <summary>{escape(fields["summary"])}</summary>
+  {authors}
+  <link href="http://arxiv.org/abs/{fields["short_id"]}" rel="alternate" type="text/html"/>
+  <link title="pdf" href="http://arxiv.org/pdf/{fields["short_id"]}" rel="related" type="application/pdf"/>
+  <arxiv:primary_category term="{fields["categories"][0]}"/>
+  {categories}
+</entry>"""
+        )
+    return (
+        '<?xml version="1.0" encoding="UTF-8"?>\n'
+        '<feed xmlns="http://www.w3.org/2005/Atom" xmlns:opensearch="http://a9.com/-/spec/opensearch/1.1/" '
+        'xmlns:arxiv="http://arxiv.org/schemas/atom">\n'
+        f"<title>arXiv Query</title><opensearch:totalResults>{n}</opensearch:totalResults>"
+        "<opensearch:startIndex>0</opensearch:startIndex>"
+        f"<opensearch:itemsPerPage>{n}</opensearch:itemsPerPage>\n" + "\n".join(entries) + "\n</feed>\n"
+    )
+
+
+def parse_api_feed(document: str) -> list[arxiv.Result]:
+    """Parse an API response with the installed arxiv package's own parser."""
+    feed_module = getattr(arxiv, "_feed", None)
+    if feed_module is not None:
+        return list(feed_module.parse(document.encode("utf-8")).results)
+    import feedparser
+
+    return [arxiv.Result._from_feed_entry(entry) for entry in feedparser.parse(document).entries]
+
+
+class HashingEncoder:
+    """Deterministic stand-in for SentenceTransformer when the model is unavailable."""
+
+    def __init__(self, dim: int = 384):
+        self.dim = dim
+
+    def encode(self, texts: list[str], batch_size: int = 32) -> np.ndarray:
+        out = np.zeros((len(texts), self.dim), dtype=np.float32)
+        for row, text in enumerate(texts):
+            for token in text.lower().split():
+                digest = hashlib.blake2b(token.encode(), digest_size=8).digest()
+                out[row, int.from_bytes(digest, "little") % self.dim] += 1.0
+        return out
+
+
+def hashing_encoder_loader(model: str, device: str | None = None, engine: str | None = None) -> HashingEncoder:
+    """`EncoderPool` loader for offline runs (module-level, so worker processes can import it)."""
+    return HashingEncoder()
+
+
+class FakeAgent:
+    """Stands in for the agent returned by `create_agent`.
+
+    `invoke` sleeps for a latency drawn around `latency_s` and then either raises
+    (`error_rate`), returns no structured response (`empty_rate`), or returns a
+    verdict. Batched prompts (papers headed by `[arxiv_id]`) get one verdict per
+    paper under `verdicts`. Calls that do not raise carry a message with
+    `usage_metadata` (prompt characters / 4 in, `output_tokens_per_paper` per
+    verdict out) unless `report_usage` is False. Call latencies are recorded in
+    `latencies`.
+    """
+
+    output_tokens_per_paper = 150
+
+    def __init__(
+        self,
+        latency_s: float = 0.2,
+        jitter: float = 0.5,
+        error_rate: float = 0.0,
+        empty_rate: float = 0.0,
+        report_usage: bool = True,
+        seed: int = 0,
+    ):
+        self.latency_s = latency_s
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.empty_rate = empty_rate
+        self.report_usage = report_usage
+        self.latencies: list[float] = []
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+
+    def invoke(self, payload: dict[str, Any]) -> dict[str, Any]:
+        with self._lock:
+            roll = self._rng.random()
+            delay = self.latency_s * (1 + self._rng.uniform(-self.jitter, self.jitter))
+            fit = round(self._rng.uniform(0, 10), 1)
+        start = time.perf_counter()
+        time.sleep(max(0.0, delay))
+        with self._lock:
+            self.latencies.append(time.perf_counter() - start)
+        if roll < self.error_rate:
+            raise RuntimeError("fake agent: simulated provider error")
+        prompt = payload["messages"][-1]["content"]
+        batch_ids = re.findall(r"^\[(\S+)\]$", prompt, re.MULTILINE)
+        usage = {
+            "input_tokens": len(prompt) // 4,
+            "output_tokens": self.output_tokens_per_paper * max(1, len(batch_ids)),
+        }
+        messages = [SimpleNamespace(usage_metadata=usage)] if self.report_usage else []
+        if roll < self.error_rate + self.empty_rate:
+            return {"messages": messages}
+        if batch_ids:
+            return {
+                "messages": messages,
+                "structured_response": {
+                    "verdicts": [{"arxiv_id": i, **_fake_verdict(fit)} for i in batch_ids]
+                },
+            }
+        return {
+            "messages": messages,
+            "structured_response": _fake_verdict(fit),
+        }
+
+
+def _fake_verdict(fit: float) -> dict[str, Any]:
+    return {
+        "relevant": fit >= 5,
+        "fit_score": fit,
+        "reasons": ["Synthetic reason one.", "Synthetic reason two."],
+        "action": "shortlist" if fit >= 7 else "maybe_read",
+        "used_search": False,
+    }
+
+
+class FakeSearchServer:
+    """Local stand-in for the SearchApi.io endpoint (`tools.search_api.base_url`).
+
+    Answers `GET /api/v1/search?q=...&num=...` with `organic_results` after
+    `latency_s`; every received query is appended to `queries`.
+    """
+
+    def __init__(self, latency_s: float = 0.05):
+        self.latency_s = latency_s
+        self.queries: list[str] = []
+        server = self
+
+        class Handler(http.server.BaseHTTPRequestHandler):
+            def do_GET(self) -> None:
+                params = parse_qs(urlparse(self.path).query)
+                query = params.get("q", [""])[0]
+                server.queries.append(query)
+                time.sleep(server.latency_s)
+                num = int(params.get("num", ["5"])[0])
+                body = json.dumps(
+                    {
+                        "organic_results": [
+                            {"title": f"{query} ({i})", "link": f"https://example.org/{i}", "snippet": f"About {query}. " * 10}
+                            for i in range(num)
+                        ]
+                    }
+                ).encode("utf-8")
+                self.send_response(200)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format: str, *args) -> None:
+                return
+
+        self._httpd = http.server.ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.base_url = f"http://127.0.0.1:{self._httpd.server_address[1]}/api/v1/search"
+        threading.Thread(target=self._httpd.serve_forever, daemon=True).start()
+
+    def close(self) -> None:
+        self._httpd.shutdown()
+        self._httpd.server_close()
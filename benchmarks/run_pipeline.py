@@ -0,0 +1,236 @@
+"""Offline end-to-end benchmark: fetch parse, embedding, LLM rerank, score fusion, HTML build.
+
+Everything runs without network access: feeds and API responses are synthetic Atom
+documents, the LangChain agent is replaced by `FakeAgent`, and embedding uses the real
+`rerank_paper` on CPU (or a hashing encoder with `--encoder fake`).
+
+Run:     python -m benchmarks.run_pipeline --papers 1000 --output bench.json
+Compare: python -m benchmarks.compare old.json new.json
+"""
+from __future__ import annotations
+
+import argparse
+import datetime
+import json
+import os
+import platform
+import resource
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from types import SimpleNamespace
+from typing import Any, Callable
+
+import numpy as np
+
+from benchmarks.fixtures import FakeAgent, HashingEncoder, parse_api_feed, synthetic_api_feed, synthetic_rss_feed
+
+SCHEMA_VERSION = 1
+
+
+def _reset_peak_rss() -> bool:
+    # Linux: writing "5" to clear_refs resets VmHWM so each stage gets its own peak.
+    try:
+        with open("/proc/self/clear_refs", "w") as f:
+            f.write("5")
+        return True
+    except OSError:
+        return False
+
+
+def _peak_rss_mb() -> float:
+    try:
+        with open("/proc/self/status") as f:
+            for line in f:
+                if line.startswith("VmHWM:"):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+
+def _percentile(values: list[float], q: float) -> float:
+    return float(np.percentile(values, q)) if values else 0.0
+
+
+def _run_stage(
+    name: str,
+    items: int,
+    repeats: int,
+    fn: Callable[[], Any],
+    report: dict,
+    setup: Callable[[], Any] | None = None,
+) -> Any:
+    """Time `fn` `repeats` times; `setup` runs untimed before each repeat."""
+    durations: list[float] = []
+    peak_is_per_stage = _reset_peak_rss()
+    result = None
+    for _ in range(repeats):
+        if setup is not None:
+            setup()
+        start = time.perf_counter()
+        result = fn()
+        durations.append(time.perf_counter() - start)
+    median = statistics.median(durations)
+    report[name] = {
+        "items": items,
+        "runs": repeats,
+        "p50_s": _percentile(durations, 50),
+        "p95_s": _percentile(durations, 95),
+        "mean_s": statistics.fmean(durations),
+        "throughput_per_s": items / median if median else None,
+        "peak_rss_mb": _peak_rss_mb(),
+        "peak_rss_scope": "stage" if peak_is_per_stage else "process",
+    }
+    print(f"{name:<14} p50={report[name]['p50_s']:.4f}s items/s={report[name]['throughput_per_s'] or 0:.1f}", file=sys.stderr)
+    return result
+
+
+def _clear_llm_fields(papers: list) -> None:
+    for paper in papers:
+        paper.llm_rerank_relevant = None
+        paper.llm_rerank_fit_score = None
+        paper.llm_rerank_reasons = None
+        paper.llm_rerank_action = None
+        paper.llm_rerank_failed = False
+        paper.llm_rerank_skipped = False
+
+
+def _git_commit() -> str | None:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def _llm_config(args: argparse.Namespace, tmp_dir: str) -> str:
+    with open("data/langchain_rerank.json", "r", encoding="utf-8") as f:
+        cfg = json.load(f)
+    for key in ("system_path", "template_path", "batch_template_path"):
+        if key in cfg["prompt"]:
+            cfg["prompt"][key] = os.path.abspath(cfg["prompt"][key])
+    cfg["cache"] = {"enabled": False}
+    cfg["concurrency"] = {"max_in_flight": args.llm_concurrency}
+    cfg["batching"] = {**cfg.get("batching", {}), "enabled": args.llm_batch_size > 1, "max_papers": args.llm_batch_size}
+    path = os.path.join(tmp_dir, "langchain_rerank.json")
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(cfg, f)
+    return path
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--papers", type=int, default=1000, help="Candidate papers (100 to 100k)")
+    parser.add_argument("--top_retrieve", type=int, default=50)
+    parser.add_argument("--repeats", type=int, default=3)
+    parser.add_argument("--encoder", choices=["real", "fake"], default="real")
+    parser.add_argument(
+        "--engine", choices=["torch", "torch-int8", "onnx"], default="torch", help="Embedding engine (real encoder)"
+    )
+    parser.add_argument("--llm_latency", type=float, default=0.2, help="Mean fake LLM call latency (s)")
+    parser.add_argument("--llm_error_rate", type=float, default=0.02)
+    parser.add_argument("--llm_empty_rate", type=float, default=0.02)
+    parser.add_argument("--llm_concurrency", type=int, default=8)
+    parser.add_argument("--llm_batch_size", type=int, default=1, help="Papers per LLM call (1 = unbatched)")
+    parser.add_argument("--overview_path", type=str, default="data/overview.md")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", type=str, default=None, help="Write JSON results here")
+    args = parser.parse_args()
+
+    import backend.langchain_rerank as langchain_rerank
+    import utils.recommender as recommender
+    from main import finalize_ranking, load_overview_as_corpus
+    from utils.paper import ArxivPaper
+    from utils.web_display import build_site
+
+    if args.encoder == "fake":
+        fake_encoder = HashingEncoder()
+        recommender.get_encoder = lambda model, device=None, engine=None: fake_encoder
+
+    stages: dict[str, Any] = {}
+    rss_doc = synthetic_rss_feed(args.papers, seed=args.seed)
+    api_doc = synthetic_api_feed(args.papers, seed=args.seed)
+
+    def fetch_parse() -> list[ArxivPaper]:
+        import feedparser
+
+        feed = feedparser.parse(rss_doc)
+        ids = [e.id.removeprefix("oai:arXiv.org:") for e in feed.entries if e.get("arxiv_announce_type") == "new"]
+        if not ids:
+            raise RuntimeError("Synthetic RSS feed has no 'new' entries to parse.")
+        return [ArxivPaper.from_result(r) for r in parse_api_feed(api_doc)]
+
+    papers = _run_stage("fetch_parse", args.papers, args.repeats, fetch_parse, stages)
+
+    corpus, overview_text = load_overview_as_corpus(args.overview_path)
+    ranked = _run_stage(
+        "embedding",
+        len(papers),
+        args.repeats,
+        lambda: recommender.rerank_paper(papers, corpus, engine=args.engine),
+        stages,
+    )
+    top = ranked[: args.top_retrieve]
+
+    agent = FakeAgent(
+        latency_s=args.llm_latency,
+        error_rate=args.llm_error_rate,
+        empty_rate=args.llm_empty_rate,
+        seed=args.seed,
+    )
+    langchain_rerank._build_llm = lambda llm_cfg: None
+    langchain_rerank._build_langchain_agent = lambda cfg, **kwargs: agent
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        cfg_path = _llm_config(args, tmp_dir)
+        _run_stage(
+            "llm_rerank",
+            len(top),
+            args.repeats,
+            lambda: langchain_rerank.langchain_llm_rerank(overview_text, top, cfg_path=cfg_path),
+            stages,
+            # Every repeat judges fresh papers; otherwise `failed` and the verdicts carry over.
+            setup=lambda: _clear_llm_fields(top),
+        )
+    stages["llm_rerank"].update(
+        {
+            "call_p50_s": _percentile(agent.latencies, 50),
+            "call_p95_s": _percentile(agent.latencies, 95),
+            "calls": len(agent.latencies),
+            "failed": sum(1 for p in top if p.llm_rerank_failed),
+        }
+    )
+
+    fusion_args = SimpleNamespace(top_retrieve=args.top_retrieve, enable_llm_rerank=True)
+    display = _run_stage(
+        "score_fusion",
+        len(top),
+        args.repeats,
+        lambda: finalize_ranking(ranked, overview_text, fusion_args, llm_rerank_done=True),
+        stages,
+    )
+    _run_stage("html_build", len(display), args.repeats, lambda: build_site(display), stages)
+
+    report = {
+        "schema": SCHEMA_VERSION,
+        "commit": _git_commit(),
+        "timestamp": datetime.datetime.now(datetime.timezone.utc).isoformat(),
+        "python": platform.python_version(),
+        "machine": platform.machine(),
+        "cpu_count": os.cpu_count(),
+        "config": vars(args),
+        "stages": stages,
+    }
+    text = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(text + "\n")
+    print(text)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,15 +1,35 @@
 import argparse
+import importlib
+import json
 import logging
 import os
 import random
+import re
+import time
 from datetime import datetime, timezone
 
 from dotenv import load_dotenv
 
-from backend.rerank_registry import load_backend
-from utils.arxiv_fetcher import get_arxiv_paper
-from utils.recommender import rerank_paper
-from utils.web_display import serve_papers
+from backend.rerank_registry import get_backend_spec, get_session
+from utils.tracing import tracer
+
+# Heavy stage modules (arxiv/feedparser, numpy, torch via the encoder) are imported
+# only when their stage runs, so --help and argument errors return immediately.
+_IMPORT_TIMES: dict[str, float] = {}
+
+
+def _lazy_import(module_name: str):
+    start = time.perf_counter()
+    module = importlib.import_module(module_name)
+    _IMPORT_TIMES.setdefault(module_name, time.perf_counter() - start)
+    return module
+
+
+def _print_import_report(startup_seconds: float) -> None:
+    print(f"Startup (imports + argument parsing): {startup_seconds:.3f}s")
+    for name, seconds in sorted(_IMPORT_TIMES.items(), key=lambda kv: kv[1], reverse=True):
+        print(f"  import {name:<28} {seconds:.3f}s")
+    print("For a per-module breakdown run: python -X importtime main.py ... 2> importtime.log")
 
 
 def _str2bool(value: str | bool) -> bool:
@@ -50,6 +70,41 @@ def load_overview_as_corpus(overview_path: str) -> tuple[list[dict], str]:
     return corpus, overview_text
 
 
+_PROFILE_NAME = re.compile(r"[A-Za-z0-9][A-Za-z0-9._-]*")
+
+
+def load_profiles(batch_path: str) -> dict[str, str]:
+    """Map profile name -> overview path from a directory of `*.md` files or a JSON manifest.
+
+    Manifest format: `{"profiles": [{"name": "alice", "overview_path": "alice.md"}, ...]}`;
+    relative paths are resolved against the manifest's directory. Names that are not safe as
+    a single path component raise `ValueError`.
+    """
+    if os.path.isdir(batch_path):
+        names = sorted(f for f in os.listdir(batch_path) if f.endswith(".md"))
+        profiles = {os.path.splitext(f)[0]: os.path.join(batch_path, f) for f in names}
+    else:
+        with open(batch_path, "r", encoding="utf-8") as file:
+            manifest = json.load(file)
+        base_dir = os.path.dirname(batch_path)
+        profiles = {}
+        for entry in manifest.get("profiles", []):
+            path = entry["overview_path"]
+            if not os.path.isabs(path):
+                path = os.path.join(base_dir, path)
+            profiles[entry["name"]] = path
+    if not profiles:
+        raise ValueError(f"No overview profiles found in {batch_path}")
+    for name in profiles:
+        # Names become directory names under --output_dir and --archive_dir.
+        if not _PROFILE_NAME.fullmatch(name):
+            raise ValueError(
+                f"Invalid profile name {name!r} in {batch_path}: use letters, digits, '.', '_' or '-', "
+                "starting with a letter or digit."
+            )
+    return profiles
+
+
 def normalize_scores(scores: list[float]) -> list[float]:
     if not scores:
         return []
@@ -67,12 +122,13 @@ def format_paper_line(paper, rank: int) -> str:
         if paper.llm_rerank_fit_score is not None
         else 0.0
     )
+    llm = "n/a" if paper.llm_rerank_skipped else f"{fit_score:.1f}"
     final_score = paper.final_score if paper.final_score is not None else 0.0
     categories = ", ".join(paper.categories) if paper.categories else "n/a"
     published = paper.published_date or "n/a"
     reasons = paper.llm_rerank_reasons or []
     lines = [
-        f"{rank}. final={final_score:.3f} embed={embed_score:.3f} llm={fit_score:.1f}",
+        f"{rank}. final={final_score:.3f} embed={embed_score:.3f} llm={llm}",
         f"   published: {published} | categories: {categories}",
         f"   title: {paper.title}",
         f"   url: {paper.url}",
@@ -85,6 +141,215 @@ def format_paper_line(paper, rank: int) -> str:
     return "\n".join(lines)
 
 
+def make_encode_options(args):
+    encoder = _lazy_import("utils.encoder")
+    return encoder.EncodeOptions(
+        batch_size=args.encode_batch_size,
+        num_threads=args.encode_threads or None,
+        workers=args.encode_workers,
+    )
+
+
+def make_llm_scheduler(args):
+    """Deadline/budget scheduler over the shared rerank session; one per pipeline run."""
+    backend = (args.llm_rerank_backend or "ollama").strip().lower()
+    spec = get_backend_spec(backend)
+    if spec.name != "langchain":
+        raise ValueError(f"Unsupported LLM rerank backend: {backend}")
+    # The session outlives the run, so batch profiles and daemon refreshes reuse
+    # the config, LLM client and agents.
+    options = {"call_timeout_s": args.llm_call_timeout} if args.llm_call_timeout else {}
+    session = get_session(spec.name, **options)
+    rerank_scheduler = _lazy_import("backend.rerank_scheduler")
+    budget = rerank_scheduler.RerankBudget(
+        deadline_s=args.llm_deadline or None,
+        max_tokens=args.llm_token_budget or None,
+        max_cost=args.llm_cost_budget or None,
+    )
+    return rerank_scheduler.RerankScheduler(session, budget)
+
+
+def open_search_index(args):
+    if not args.search_index_path:
+        return None
+    return _lazy_import("utils.search_index").SearchIndex(args.search_index_path)
+
+
+def index_papers(search_index, papers: list, args=None, profile: str = "") -> None:
+    """Add fetched papers to the search index; with `args`, record them as that day's recommendations for `profile`."""
+    if search_index is None or not papers:
+        return
+    if args is None:
+        search_index.add_papers(papers)
+    else:
+        day = args.archive_day or datetime.now(timezone.utc).date().isoformat()
+        search_index.add_recommendations(papers, day, profile=profile)
+
+
+def archive_papers(papers: list, archive_dir: str, args) -> None:
+    archive = _lazy_import("utils.archive").StaticArchive(archive_dir)
+    with tracer.span("archive", stage=True, papers=len(papers)):
+        archive.add_run(papers, day=args.archive_day)
+
+
+def make_deduplicator(args):
+    dedup = _lazy_import("utils.dedup")
+    return dedup.Deduplicator(dedup.DedupOptions(threshold=args.dedup_threshold))
+
+
+def dedup_candidates(candidates: list, args, deduplicator=None) -> list:
+    """Apply `--dedup` between fetch and rerank; pass a `Deduplicator` to dedup across streamed batches."""
+    if not args.dedup or not candidates:
+        return candidates
+    deduplicator = deduplicator or make_deduplicator(args)
+    reported = len(deduplicator.skipped)
+    with tracer.span("dedup", stage=True, candidates=len(candidates)):
+        kept = deduplicator.add(candidates)
+    for item in deduplicator.skipped[reported:]:
+        logging.info(
+            "Dedup: skipped %s (%s duplicate of %s, similarity %.2f): %s",
+            item["arxiv_id"],
+            item["reason"],
+            item["duplicate_of"],
+            item["similarity"],
+            item["title"],
+        )
+    if len(kept) < len(candidates):
+        logging.info("Dedup kept %s of %s candidates", len(kept), len(candidates))
+    return kept
+
+
+def prefilter_candidates(candidates: list, overview_texts: list[str], args) -> list:
+    """Apply `--lexical_prefilter` ahead of the embedding stage; a no-op when it is 0."""
+    if not args.lexical_prefilter or not candidates:
+        return candidates
+    lexical = _lazy_import("utils.lexical")
+    with tracer.span("lexical_prefilter", stage=True, candidates=len(candidates)):
+        kept = lexical.lexical_prefilter(candidates, overview_texts, args.lexical_prefilter, args.lexical_margin)
+    logging.info("Lexical prefilter kept %s of %s candidates", len(kept), len(candidates))
+    return kept
+
+
+def run_backfill(args, corpora: dict[str, list[dict]], paper_store, search_index) -> dict:
+    """`--backfill_from`: page through past submissions, streaming each chunk into the stores and embedding cache."""
+    backfill = _lazy_import("utils.backfill")
+    start = datetime.fromisoformat(args.backfill_from).date()
+    end = datetime.fromisoformat(args.backfill_to).date() if args.backfill_to else datetime.now(timezone.utc).date()
+    checkpoint = args.backfill_checkpoint or os.path.join(
+        "data", "cache", f"backfill-{re.sub(r'[^A-Za-z0-9._-]+', '_', args.arxiv_query)}.json"
+    )
+    scorer = None
+    if args.embedding_cache_dir:
+        scorer = _lazy_import("utils.recommender").ProfileScorer(
+            corpora,
+            cache_dir=args.embedding_cache_dir,
+            corpus_top_k=args.corpus_top_k or None,
+            engine=args.embedding_engine,
+            encode_options=make_encode_options(args),
+        )
+    else:
+        logging.warning("No --embedding_cache_dir: backfilled papers are stored but not embedded.")
+
+    def on_chunk(papers: list) -> None:
+        if search_index is not None:
+            search_index.add_papers(papers)
+        if scorer is not None:
+            scorer.embed([paper.summary for paper in papers])
+            # Persist the new vectors before the checkpoint moves past this page.
+            if scorer.store is not None:
+                scorer.store.flush()
+
+    runner = backfill.Backfill(
+        args.arxiv_query,
+        checkpoint,
+        store=paper_store,
+        options=backfill.BackfillOptions(window_days=args.backfill_window_days, page_size=args.backfill_page_size),
+    )
+    logging.info("Backfilling %s from %s to %s (checkpoint %s)", args.arxiv_query, start, end, checkpoint)
+    try:
+        with tracer.span("backfill", stage=True):
+            totals = runner.run(start, end, on_chunk=on_chunk)
+    finally:
+        if scorer is not None:
+            scorer.close()
+    if search_index is not None and totals["papers"]:
+        search_index.optimize()
+    logging.info("Backfill finished: %s", totals)
+    return totals
+
+
+def run_llm_rerank(papers: list, overview_text: str, scheduler) -> None:
+    logging.info("Running LLM rerank on %s papers", len(papers))
+    with tracer.span("llm_rerank", stage=True, papers=len(papers)):
+        scheduler.run(papers, overview_text)
+    logging.info("LLM rerank spend: %s", scheduler.stats())
+
+
+# Fit score assumed for papers the LLM budget left unjudged: the middle of the 0-10
+# scale, neither rewarding nor penalizing them against judged papers.
+SKIPPED_FIT_PRIOR = 5.0
+
+
+def finalize_ranking(
+    ranked: list, overview_text: str, args, llm_rerank_done: bool = False, scheduler=None
+) -> list:
+    """Normalize embedding scores over `top_retrieve`, run LLM rerank if enabled, fuse and sort.
+
+    `llm_rerank_done` skips the LLM call when the papers were already judged (streaming mode).
+    Papers the scheduler left unscored are not filtered and are fused with a neutral fit of
+    `SKIPPED_FIT_PRIOR`, so their final score is on the same scale as judged papers'.
+    """
+    top_retrieve = ranked[: max(0, args.top_retrieve)]
+    if not top_retrieve:
+        return []
+
+    embed_scores = [paper.score or 0.0 for paper in top_retrieve]
+    normalized_scores = normalize_scores(embed_scores)
+    for paper, norm_score in zip(top_retrieve, normalized_scores):
+        paper.final_score = norm_score
+
+    if args.enable_llm_rerank:
+        if not llm_rerank_done:
+            run_llm_rerank(top_retrieve, overview_text, scheduler or make_llm_scheduler(args))
+        for paper, norm_score in zip(top_retrieve, normalized_scores):
+            if paper.llm_rerank_skipped:
+                fit_score = SKIPPED_FIT_PRIOR
+            else:
+                fit_score = paper.llm_rerank_fit_score or 0.0
+            paper.final_score = 0.6 * norm_score + 0.4 * (fit_score / 10.0)
+        top_retrieve = [p for p in top_retrieve if p.llm_rerank_relevant or p.llm_rerank_skipped]
+
+    top_retrieve = sorted(
+        top_retrieve, key=lambda p: p.final_score or 0.0, reverse=True
+    )
+    return top_retrieve or ranked[: args.top_retrieve]
+
+
+def _make_emitter(output_format: str):
+    """Event sink for streaming output: NDJSON lines on stdout, or short text lines."""
+
+    def emit(event: dict) -> None:
+        if output_format == "ndjson":
+            print(json.dumps(event, ensure_ascii=False), flush=True)
+        elif event["event"] == "embedded":
+            logging.info("Embedded %s candidates so far", event["total"])
+        elif event["event"] == "verdict":
+            paper = event["paper"]
+            print(
+                f"[{event['elapsed']:.1f}s] llm={paper['llm_rerank_fit_score'] or 0.0:.1f} "
+                f"{paper['llm_rerank_action'] or '-'} | {paper['title']}\n   url: {paper['url']}",
+                flush=True,
+            )
+
+    return emit
+
+
+def _write_trace(args) -> None:
+    if args.trace_path:
+        tracer.write_chrome_trace(args.trace_path)
+        logging.info("Wrote trace to %s", args.trace_path)
+
+
 def _current_conda_env() -> str:
     env = os.environ.get("CONDA_DEFAULT_ENV")
     if env:
@@ -96,10 +361,23 @@ def _current_conda_env() -> str:
 
 
 if __name__ == "__main__":
+    _started = time.perf_counter()
     load_dotenv(override=True)
     os.environ["TOKENIZERS_PARALLELISM"] = "false"
 
     add_argument("--overview_path", type=str, help="Path to overview.md", default="overview.md")
+    add_argument(
+        "--overview_batch",
+        type=str,
+        help="Directory of overview .md files or JSON manifest; scores all profiles in one run",
+        default=None,
+    )
+    add_argument(
+        "--output_dir",
+        type=str,
+        help="Output directory for batch mode (one subdirectory per profile)",
+        default="output",
+    )
     add_argument(
         "--arxiv_query",
         type=str,
@@ -167,15 +445,249 @@ if __name__ == "__main__":
         help="Port for web server",
         default=8080,
     )
+    add_argument(
+        "--fetch_batch_size",
+        type=int,
+        help="arXiv ids per API request",
+        default=100,
+    )
+    add_argument(
+        "--fetch_concurrency",
+        type=int,
+        help="Max arXiv API batches in flight (still paced to one request per 3s)",
+        default=4,
+    )
+    add_argument(
+        "--paper_store_path",
+        type=str,
+        help="SQLite path for the local arXiv metadata store (empty to disable)",
+        default="data/cache/papers.sqlite",
+    )
+    add_argument(
+        "--embedding_cache_dir",
+        type=str,
+        help="Directory for the on-disk embedding cache (empty to disable)",
+        default="data/cache/embeddings",
+    )
     add_argument("--seed", type=int, help="Random seed", default=None)
+    add_argument(
+        "--corpus_top_k",
+        type=int,
+        help="Score candidates against their top-k corpus neighbours via an IVF index (0 = exact)",
+        default=0,
+    )
+    add_argument(
+        "--stream",
+        type=_str2bool,
+        help="Stream fetch -> embed -> LLM rerank and print verdicts as they arrive",
+        default=False,
+    )
+    add_argument(
+        "--output_format",
+        type=str,
+        choices=["text", "ndjson"],
+        help="text (CLI + web page) or ndjson (JSON events on stdout, no web server)",
+        default="text",
+    )
+    add_argument(
+        "--daemon",
+        type=_str2bool,
+        help="Run as a long-lived service with JSON endpoints and periodic refresh",
+        default=False,
+    )
+    add_argument(
+        "--refresh_interval",
+        type=float,
+        help="Daemon refresh interval in minutes (0 = only on POST /runs)",
+        default=0,
+    )
+    add_argument(
+        "--prewarm_encoder",
+        type=_str2bool,
+        help="Load the embedding model in the background while fetching",
+        default=True,
+    )
+    add_argument(
+        "--embedding_engine",
+        type=str,
+        choices=["torch", "torch-int8", "onnx"],
+        help="Embedding inference engine: torch (fp32), torch-int8 (quantized, CPU) or onnx (ONNX Runtime, CPU)",
+        default="torch",
+    )
+    add_argument(
+        "--encode_batch_size",
+        type=int,
+        help="Texts per embedding batch; inputs are grouped by length before batching",
+        default=32,
+    )
+    add_argument(
+        "--encode_threads",
+        type=int,
+        help="Torch threads for embedding (per worker with --encode_workers; 0 = torch default)",
+        default=0,
+    )
+    add_argument(
+        "--encode_workers",
+        type=int,
+        help="Encode large inputs (2000+ texts, e.g. backfills) in this many worker processes (0 = in-process)",
+        default=0,
+    )
+    add_argument(
+        "--backfill_from",
+        type=str,
+        help="Backfill submissions since this YYYY-MM-DD into the paper store, search index and embeddings, then exit",
+        default=None,
+    )
+    add_argument(
+        "--backfill_to",
+        type=str,
+        help="Last submission day to backfill, YYYY-MM-DD (default: today UTC)",
+        default=None,
+    )
+    add_argument(
+        "--backfill_window_days",
+        type=int,
+        help="Days per backfill window (one checkpointed API query each)",
+        default=7,
+    )
+    add_argument(
+        "--backfill_page_size",
+        type=int,
+        help="Papers per backfill API page; also the chunk size stored and embedded at a time",
+        default=500,
+    )
+    add_argument(
+        "--backfill_checkpoint",
+        type=str,
+        help="Backfill checkpoint file (default: data/cache/backfill-<query>.json)",
+        default="",
+    )
+    add_argument(
+        "--dedup",
+        type=_str2bool,
+        help="Drop repeated candidates (same arXiv id, or near-identical abstract) before reranking",
+        default=True,
+    )
+    add_argument(
+        "--dedup_threshold",
+        type=float,
+        help=(
+            "Estimated Jaccard similarity of abstract word sets at which a paper counts as a near-duplicate; "
+            "0.5 catches versions with ~30%% of words rewritten, same-topic papers stay below ~0.3"
+        ),
+        default=0.5,
+    )
+    add_argument(
+        "--lexical_prefilter",
+        type=int,
+        help="Embed only the top M candidates by BM25 against the overview, plus --lexical_margin (0 = embed all)",
+        default=0,
+    )
+    add_argument(
+        "--lexical_margin",
+        type=float,
+        help="Extra fraction of --lexical_prefilter kept as a safety margin",
+        default=0.25,
+    )
+    parser.add_argument(
+        "--lexical_report",
+        action="store_true",
+        help="Report BM25 prefilter recall against the full embedding ranking for a range of M, print JSON and exit",
+    )
+    add_argument(
+        "--search_index_path",
+        type=str,
+        help="SQLite FTS5 index of fetched and recommended papers, served at /search (e.g. data/cache/search.sqlite); empty disables",
+        default="",
+    )
+    add_argument(
+        "--archive_dir",
+        type=str,
+        help="Also add each run to a persistent static archive here (one page per day); empty disables",
+        default="",
+    )
+    add_argument(
+        "--archive_day",
+        type=str,
+        help="Archive the run under this YYYY-MM-DD instead of today (UTC)",
+        default=None,
+    )
+    parser.add_argument(
+        "--serve_archive",
+        action="store_true",
+        help="Serve --archive_dir without running the pipeline",
+    )
+    parser.add_argument(
+        "--verify_engine",
+        action="store_true",
+        help="Compare --embedding_engine with fp32 torch on today's candidates, print a JSON report and exit",
+    )
+    add_argument(
+        "--llm_deadline",
+        type=float,
+        help="Wall-clock seconds for LLM rerank; unjudged papers keep their embedding score (0 = none)",
+        default=0,
+    )
+    add_argument(
+        "--llm_token_budget",
+        type=int,
+        help="Max LLM input+output tokens per run (0 = none)",
+        default=0,
+    )
+    add_argument(
+        "--llm_cost_budget",
+        type=float,
+        help="Max LLM cost per run, priced by `pricing` in the rerank config (0 = none)",
+        default=0,
+    )
+    add_argument(
+        "--llm_call_timeout",
+        type=float,
+        help="Per-request LLM timeout in seconds (0 = provider client default)",
+        default=0,
+    )
+    add_argument(
+        "--trace_path",
+        type=str,
+        help="Write a Chrome trace (chrome://tracing / Perfetto) of the run to this file",
+        default=None,
+    )
+    add_argument(
+        "--profile",
+        type=_str2bool,
+        help="Write cProfile and tracemalloc reports for each pipeline stage",
+        default=False,
+    )
+    add_argument(
+        "--profile_dir",
+        type=str,
+        help="Directory for --profile reports",
+        default="profile",
+    )
+    parser.add_argument(
+        "--import_report",
+        action="store_true",
+        help="Print how long startup and each lazily imported stage module took",
+    )
     parser.add_argument("--debug", action="store_true", help="Debug mode")
     args = parser.parse_args()
+    startup_seconds = time.perf_counter() - _started
 
     logging.basicConfig(
         level=logging.DEBUG if args.debug else logging.INFO,
         format="%(asctime)s - %(levelname)s - %(message)s",
     )
     logging.getLogger("arxiv").setLevel(logging.WARNING)
+    if args.profile:
+        tracer.profile_dir = args.profile_dir
+
+    if args.serve_archive:
+        if not args.archive_dir:
+            raise ValueError("--serve_archive needs --archive_dir.")
+        _lazy_import("utils.web_display").serve_directory(
+            args.archive_dir, port=args.port, search_index=open_search_index(args)
+        )
+        raise SystemExit(0)
 
     if args.seed is not None:
         random.seed(args.seed)
@@ -189,56 +701,235 @@ if __name__ == "__main__":
     if not args.arxiv_query:
         raise ValueError("Missing ARXIV_QUERY. Set --arxiv_query or ARXIV_QUERY env.")
 
-    logging.info("Loading overview from %s", args.overview_path)
-    corpus, overview_text = load_overview_as_corpus(args.overview_path)
+    if args.overview_batch:
+        profile_paths = load_profiles(args.overview_batch)
+    else:
+        profile_paths = {"overview": args.overview_path}
+    profiles: dict[str, tuple[list[dict], str]] = {}
+    for name, path in profile_paths.items():
+        logging.info("Loading overview from %s", path)
+        profiles[name] = load_overview_as_corpus(path)
+
+    if args.prewarm_encoder:
+        _lazy_import("utils.encoder").warm_up_in_background(engine=args.embedding_engine)
 
     logging.info("Retrieving arXiv papers for query: %s", args.arxiv_query)
-    candidates = get_arxiv_paper(query=args.arxiv_query, debug=args.debug)
-    if not candidates:
-        logging.info("No candidates retrieved.")
+    arxiv_fetcher = _lazy_import("utils.arxiv_fetcher")
+    paper_store = None
+    if args.paper_store_path:
+        paper_store = _lazy_import("utils.paper_store").PaperStore(args.paper_store_path)
+    search_index = open_search_index(args)
+    fetch_kwargs = dict(
+        query=args.arxiv_query,
+        debug=args.debug,
+        store=paper_store,
+        options=arxiv_fetcher.FetchOptions(
+            batch_size=args.fetch_batch_size,
+            max_concurrent_batches=args.fetch_concurrency,
+        ),
+    )
+    if args.backfill_from:
+        run_backfill(args, {name: corpus for name, (corpus, _) in profiles.items()}, paper_store, search_index)
+        if args.import_report:
+            _print_import_report(startup_seconds)
+        _write_trace(args)
         raise SystemExit(0)
 
-    logging.info("Reranking %s candidates with embedding model", len(candidates))
-    ranked = rerank_paper(candidates, corpus)
-    top_retrieve = ranked[: max(0, args.top_retrieve)]
-    if not top_retrieve:
-        logging.info("No papers left after embedding rerank.")
+    recommender = _lazy_import("utils.recommender")
+    web_display = _lazy_import("utils.web_display")
+    emit = _make_emitter(args.output_format)
+
+    if args.overview_batch:
+        if args.stream:
+            logging.warning("--stream is ignored in batch mode.")
+        with tracer.span("fetch", stage=True):
+            candidates = arxiv_fetcher.get_arxiv_paper(**fetch_kwargs)
+        if not candidates:
+            logging.info("No candidates retrieved.")
+            raise SystemExit(0)
+        index_papers(search_index, candidates)
+        candidates = dedup_candidates(candidates, args)
+        candidates = prefilter_candidates(candidates, [text for _, text in profiles.values()], args)
+        logging.info(
+            "Reranking %s candidates against %s profiles with embedding model",
+            len(candidates),
+            len(profiles),
+        )
+        with tracer.span("embed", stage=True, candidates=len(candidates)):
+            profile_scores = recommender.score_profiles(
+                candidates,
+                {name: corpus for name, (corpus, _) in profiles.items()},
+                cache_dir=args.embedding_cache_dir or None,
+                corpus_top_k=args.corpus_top_k or None,
+                engine=args.embedding_engine,
+                encode_options=make_encode_options(args),
+            )
+        # Shared fetch + encode above; LLM rerank and output run per profile, with one
+        # LLM deadline/budget across all profiles.
+        llm_scheduler = make_llm_scheduler(args) if args.enable_llm_rerank else None
+        counts: dict[str, int] = {}
+        for name, (_, overview_text) in profiles.items():
+            logging.info("Profile %s", name)
+            ranked = recommender.rank_by_scores(
+                candidates, profile_scores[name], copy_papers=True
+            )
+            display_papers = finalize_ranking(ranked, overview_text, args, scheduler=llm_scheduler)
+            profile_dir = os.path.join(args.output_dir, name)
+            with tracer.span("html_build", stage=True, profile=name):
+                web_display.write_papers_html(display_papers, profile_dir)
+            with open(os.path.join(profile_dir, "results.txt"), "w", encoding="utf-8") as file:
+                for idx, paper in enumerate(display_papers, start=1):
+                    file.write(format_paper_line(paper, idx) + "\n\n")
+            index_papers(search_index, display_papers, args, profile=name)
+            if args.archive_dir:
+                archive_papers(display_papers, os.path.join(args.archive_dir, name), args)
+            counts[name] = len(display_papers)
+            logging.info("Wrote %s papers for %s to %s", len(display_papers), name, profile_dir)
+        web_display.write_profile_index(counts, args.output_dir)
+
+        if args.import_report:
+            _print_import_report(startup_seconds)
+        _write_trace(args)
+
+        web_display.serve_directory(args.output_dir, port=args.port, search_index=search_index)
         raise SystemExit(0)
 
-    embed_scores = [paper.score or 0.0 for paper in top_retrieve]
-    normalized_scores = normalize_scores(embed_scores)
-    for paper, norm_score in zip(top_retrieve, normalized_scores):
-        paper.final_score = norm_score
+    corpus, overview_text = profiles["overview"]
+    if args.verify_engine:
+        candidates = arxiv_fetcher.get_arxiv_paper(**fetch_kwargs)
+        report = recommender.verify_engine(
+            candidates, corpus, args.embedding_engine, top_k=args.top_retrieve
+        )
+        print(json.dumps(report, indent=2))
+        raise SystemExit(0)
+    if args.lexical_report:
+        candidates = dedup_candidates(arxiv_fetcher.get_arxiv_paper(**fetch_kwargs), args)
+        report = recommender.verify_prefilter(
+            candidates,
+            corpus,
+            overview_text,
+            engine=args.embedding_engine,
+            top_k=args.top_retrieve,
+            margin=args.lexical_margin,
+            sizes=[args.lexical_prefilter] if args.lexical_prefilter else None,
+            encode_options=make_encode_options(args),
+        )
+        print(json.dumps(report, indent=2))
+        raise SystemExit(0)
+    if args.daemon:
+        # Long-running mode: the encoder stays resident between runs and each refresh
+        # swaps in a new ranking without blocking readers of the JSON API.
+        def run_once() -> list:
+            candidates = arxiv_fetcher.get_arxiv_paper(**fetch_kwargs)
+            if not candidates:
+                return []
+            index_papers(search_index, candidates)
+            candidates = dedup_candidates(candidates, args)
+            candidates = prefilter_candidates(candidates, [overview_text], args)
+            ranked = recommender.rerank_paper(
+                candidates,
+                corpus,
+                cache_dir=args.embedding_cache_dir or None,
+                corpus_top_k=args.corpus_top_k or None,
+                engine=args.embedding_engine,
+                encode_options=make_encode_options(args),
+            )
+            display_papers = finalize_ranking(ranked, overview_text, args)
+            index_papers(search_index, display_papers, args)
+            return display_papers
+
+        service = _lazy_import("utils.service").PaperService(
+            run_once,
+            refresh_interval_s=args.refresh_interval * 60 if args.refresh_interval else None,
+            search_index=search_index,
+        )
+        service.serve_forever(port=args.port)
+        raise SystemExit(0)
 
-    if args.enable_llm_rerank:
-        backend = (args.llm_rerank_backend or "ollama").strip().lower()
-        handler, spec = load_backend(backend)
-        logging.info("Running LLM rerank via %s", backend)
-        if spec.name == "langchain":
-            handler(
-                overview_text,
-                top_retrieve,
-                model=args.ollama_model,
-                base_url=args.ollama_base_url,
+    if args.stream:
+        if args.lexical_prefilter:
+            logging.warning("--lexical_prefilter is ignored with --stream.")
+        pipeline = _lazy_import("utils.pipeline")
+        scorer = recommender.ProfileScorer(
+            {"overview": corpus},
+            cache_dir=args.embedding_cache_dir or None,
+            corpus_top_k=args.corpus_top_k or None,
+            engine=args.embedding_engine,
+            encode_options=make_encode_options(args),
+        )
+        try:
+            llm_scheduler = make_llm_scheduler(args) if args.enable_llm_rerank else None
+            ranker = pipeline.StreamingRanker(
+                lambda batch: scorer.score(batch)["overview"],
+                top_k=args.top_retrieve,
+                emit=emit,
+                llm_rerank=(
+                    (lambda papers: run_llm_rerank(papers, overview_text, llm_scheduler))
+                    if llm_scheduler
+                    else None
+                ),
             )
-        else:
-            raise ValueError(f"Unsupported LLM rerank backend: {backend}")
-        for paper, norm_score in zip(top_retrieve, normalized_scores):
-            fit_score = paper.llm_rerank_fit_score or 0.0
-            paper.final_score = 0.6 * norm_score + 0.4 * (fit_score / 10.0)
-        top_retrieve = [p for p in top_retrieve if p.llm_rerank_relevant]
+            # Fetch, embedding and LLM calls overlap here, so they share one stage span.
+            deduplicator = make_deduplicator(args) if args.dedup else None
+            with tracer.span("stream", stage=True):
+                for batch in arxiv_fetcher.iter_arxiv_paper_batches(**fetch_kwargs):
+                    index_papers(search_index, batch)
+                    ranker.add_batch(dedup_candidates(batch, args, deduplicator))
+                ranked = ranker.finish()
+        finally:
+            scorer.close()
+        if not ranked:
+            logging.info("No candidates retrieved.")
+            raise SystemExit(0)
+        display_papers = finalize_ranking(ranked, overview_text, args, llm_rerank_done=True)
+    else:
+        with tracer.span("fetch", stage=True):
+            candidates = arxiv_fetcher.get_arxiv_paper(**fetch_kwargs)
+        if not candidates:
+            logging.info("No candidates retrieved.")
+            raise SystemExit(0)
+        index_papers(search_index, candidates)
+        candidates = dedup_candidates(candidates, args)
+        candidates = prefilter_candidates(candidates, [overview_text], args)
+        logging.info("Reranking %s candidates with embedding model", len(candidates))
+        with tracer.span("embed", stage=True, candidates=len(candidates)):
+            ranked = recommender.rerank_paper(
+                candidates,
+                corpus,
+                cache_dir=args.embedding_cache_dir or None,
+                corpus_top_k=args.corpus_top_k or None,
+                engine=args.embedding_engine,
+                encode_options=make_encode_options(args),
+            )
+        display_papers = finalize_ranking(ranked, overview_text, args)
 
-    top_retrieve = sorted(
-        top_retrieve, key=lambda p: p.final_score or 0.0, reverse=True
-    )
-    display_papers = top_retrieve or ranked[: args.top_retrieve]
     if not display_papers:
         logging.info("No papers to display.")
         raise SystemExit(0)
+    index_papers(search_index, display_papers, args)
+    if args.archive_dir:
+        archive_papers(display_papers, args.archive_dir, args)
+
+    if args.output_format == "ndjson":
+        paper_record = _lazy_import("utils.pipeline").paper_record
+        for idx, paper in enumerate(display_papers, start=1):
+            emit({"event": "final", "paper": paper_record(paper, idx)})
+        emit({"event": "done", "count": len(display_papers)})
+        if args.import_report:
+            _print_import_report(startup_seconds)
+        _write_trace(args)
+        raise SystemExit(0)
 
     logging.info("Printing %s papers", len(display_papers))
     for idx, paper in enumerate(display_papers, start=1):
         print(format_paper_line(paper, idx))
         print("")
 
-    serve_papers(display_papers,port=args.port)
+    if args.import_report:
+        _print_import_report(startup_seconds)
+    _write_trace(args)
+
+    if args.archive_dir:
+        web_display.serve_directory(args.archive_dir, port=args.port, search_index=search_index)
+    else:
+        web_display.serve_papers(display_papers, port=args.port, search_index=search_index)
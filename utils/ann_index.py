@@ -0,0 +1,177 @@
+from __future__ import annotations
+
+import os
+
+import numpy as np
+
+
+def l2_normalize(vectors: np.ndarray) -> np.ndarray:
+    vectors = np.asarray(vectors, dtype=np.float32)
+    if vectors.ndim == 1:
+        vectors = vectors[None, :]
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    return vectors / np.clip(norms, 1e-12, None)
+
+
+def time_decay_weights(n: int) -> np.ndarray:
+    """`w_j = 1 / (1 + log10(j + 1))` for corpus items ordered newest first, normalized to sum 1."""
+    weights = 1 / (1 + np.log10(np.arange(n) + 1))
+    return weights / weights.sum()
+
+
+class IVFIndex:
+    """Inverted-file cosine index in NumPy.
+
+    Vectors are L2-normalized and assigned to the nearest of `n_lists` spherical k-means
+    centroids; a query scans only its `n_probe` closest lists. Vectors added after
+    training are assigned to the existing centroids, so inserts are O(n_lists * dim).
+    Until `min_train_size` vectors exist the index answers by brute force.
+    """
+
+    def __init__(
+        self,
+        dim: int,
+        n_lists: int | None = None,
+        n_probe: int = 8,
+        min_train_size: int = 2048,
+        seed: int = 0,
+    ):
+        self.dim = dim
+        self.n_lists = n_lists
+        self.n_probe = n_probe
+        self.min_train_size = min_train_size
+        self._rng = np.random.default_rng(seed)
+        self._vectors = np.zeros((0, dim), dtype=np.float32)
+        self._size = 0
+        self.centroids: np.ndarray | None = None
+        self._lists: list[list[int]] = []
+        self._list_arrays: list[np.ndarray] | None = None
+
+    def __len__(self) -> int:
+        return self._size
+
+    @property
+    def vectors(self) -> np.ndarray:
+        return self._vectors[: self._size]
+
+    @property
+    def is_trained(self) -> bool:
+        return self.centroids is not None
+
+    def train(self, vectors: np.ndarray | None = None, n_iter: int = 15, sample_size: int = 50_000) -> None:
+        data = self.vectors if vectors is None else l2_normalize(vectors)
+        if len(data) == 0:
+            return
+        n_lists = self.n_lists or int(np.clip(np.sqrt(len(data)), 1, 4096))
+        n_lists = min(n_lists, len(data))
+        if len(data) > sample_size:
+            data = data[self._rng.choice(len(data), sample_size, replace=False)]
+        centroids = data[self._rng.choice(len(data), n_lists, replace=False)].copy()
+        for _ in range(n_iter):
+            assign = np.argmax(data @ centroids.T, axis=1)
+            sums = np.zeros_like(centroids)
+            np.add.at(sums, assign, data)
+            counts = np.bincount(assign, minlength=n_lists)
+            empty = counts == 0
+            if empty.any():
+                # Re-seed empty lists from random points so no centroid is wasted.
+                sums[empty] = data[self._rng.choice(len(data), int(empty.sum()))]
+            centroids = l2_normalize(sums)
+        self.centroids = centroids
+        self._lists = [[] for _ in range(n_lists)]
+        if self._size:
+            self._assign(np.arange(self._size))
+
+    def _assign(self, ids: np.ndarray) -> None:
+        assign = np.argmax(self._vectors[ids] @ self.centroids.T, axis=1)
+        for vector_id, list_id in zip(ids.tolist(), assign.tolist()):
+            self._lists[list_id].append(vector_id)
+        self._list_arrays = None
+
+    def add(self, vectors: np.ndarray) -> np.ndarray:
+        """Append vectors and return their ids (consecutive, starting at the current size)."""
+        vectors = l2_normalize(vectors)
+        needed = self._size + len(vectors)
+        if needed > len(self._vectors):
+            grown = np.zeros((max(needed, 2 * len(self._vectors)), self.dim), dtype=np.float32)
+            grown[: self._size] = self.vectors
+            self._vectors = grown
+        ids = np.arange(self._size, needed)
+        self._vectors[ids] = vectors
+        self._size = needed
+        if self.is_trained:
+            self._assign(ids)
+        elif self._size >= self.min_train_size:
+            self.train()
+        return ids
+
+    def save(self, path: str, **extra: np.ndarray) -> None:
+        """Write vectors, centroids and lists (plus `extra` arrays) to an `.npz` file, atomically."""
+        trained = self.is_trained
+        arrays = {
+            "vectors": self.vectors,
+            "centroids": self.centroids if trained else np.zeros((0, self.dim), dtype=np.float32),
+            "list_sizes": np.array([len(ids) for ids in self._lists], dtype=np.int64),
+            "list_ids": np.array([i for ids in self._lists for i in ids], dtype=np.int64),
+            "params": np.array([self.n_lists or 0, self.n_probe, self.min_train_size], dtype=np.int64),
+        }
+        tmp_path = path + ".tmp"
+        with open(tmp_path, "wb") as f:
+            np.savez(f, **arrays, **{f"extra_{name}": value for name, value in extra.items()})
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, path: str) -> tuple["IVFIndex", dict[str, np.ndarray]]:
+        """An index written by `save`, and its `extra` arrays."""
+        with np.load(path) as data:
+            n_lists, n_probe, min_train_size = data["params"].tolist()
+            vectors = data["vectors"]
+            index = cls(vectors.shape[1], n_lists=n_lists or None, n_probe=n_probe, min_train_size=min_train_size)
+            index._vectors = vectors.astype(np.float32)
+            index._size = len(vectors)
+            if len(data["centroids"]):
+                index.centroids = data["centroids"]
+                bounds = np.cumsum(data["list_sizes"])[:-1]
+                index._lists = [ids.tolist() for ids in np.split(data["list_ids"], bounds)]
+            extra = {name[len("extra_") :]: data[name] for name in data.files if name.startswith("extra_")}
+        return index, extra
+
+    def search(self, queries: np.ndarray, k: int, exact: bool = False) -> tuple[np.ndarray, np.ndarray]:
+        """Top-`k` cosine neighbours per query as `(similarities, ids)`; missing slots hold id -1."""
+        queries = l2_normalize(queries)
+        k = min(k, self._size)
+        sims_out = np.full((len(queries), k), -np.inf, dtype=np.float32)
+        ids_out = np.full((len(queries), k), -1, dtype=np.int64)
+        if k == 0:
+            return sims_out, ids_out
+        if exact or not self.is_trained:
+            sims = queries @ self.vectors.T
+            top = np.argpartition(-sims, k - 1, axis=1)[:, :k]
+            top_sims = np.take_along_axis(sims, top, axis=1)
+            order = np.argsort(-top_sims, axis=1)
+            return np.take_along_axis(top_sims, order, axis=1), np.take_along_axis(top, order, axis=1)
+        if self._list_arrays is None:
+            self._list_arrays = [np.asarray(ids, dtype=np.int64) for ids in self._lists]
+        n_probe = min(self.n_probe, len(self._list_arrays))
+        probes = np.argpartition(-(queries @ self.centroids.T), n_probe - 1, axis=1)[:, :n_probe]
+        for row, query in enumerate(queries):
+            cand = np.concatenate([self._list_arrays[p] for p in probes[row]])
+            if len(cand) == 0:
+                continue
+            sims = self._vectors[cand] @ query
+            take = min(k, len(cand))
+            top = np.argpartition(-sims, take - 1)[:take]
+            top = top[np.argsort(-sims[top])]
+            sims_out[row, :take] = sims[top]
+            ids_out[row, :take] = cand[top]
+        return sims_out, ids_out
+
+
+def knn_decay_scores(
+    sims: np.ndarray, ids: np.ndarray, weights: np.ndarray
+) -> np.ndarray:
+    """`10 * sum_j(sim_ij * w_j) / sum_j(w_j)` over each candidate's retrieved neighbours."""
+    valid = ids >= 0
+    w = np.where(valid, weights[np.where(valid, ids, 0)], 0.0)
+    s = np.where(valid, sims, 0.0)
+    return 10 * (s * w).sum(axis=1) / np.clip(w.sum(axis=1), 1e-12, None)
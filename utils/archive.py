@@ -0,0 +1,213 @@
+from __future__ import annotations
+
+import datetime
+import hashlib
+import html
+import json
+import logging
+import os
+from pathlib import Path
+from typing import Any, Iterable
+
+from utils.tracing import tracer
+from utils.web_display import Asset, _reasons, _row, build_site, make_asset, write_asset
+
+MANIFEST = "manifest.json"
+
+
+def _page(title: str, body: str) -> str:
+    return f"""<!doctype html>
+<html lang="en">
+  <head>
+    <meta charset="utf-8" />
+    <meta name="viewport" content="width=device-width, initial-scale=1" />
+    <title>{html.escape(title)}</title>
+    <style>
+      body {{ margin: 40px auto; max-width: 900px; padding: 0 24px; color: #1f1e1c; background: #f6f1e8;
+        font-family: "Iowan Old Style", "Palatino", "Book Antiqua", "Georgia", serif; line-height: 1.5; }}
+      a {{ color: #2f6d6a; }}
+      .muted {{ color: #5e5a55; }}
+    </style>
+  </head>
+  <body>
+    {body}
+  </body>
+</html>
+"""
+
+
+def _html_asset(title: str, body: str) -> Asset:
+    return make_asset(_page(title, body).encode("utf-8"), "text/html; charset=utf-8")
+
+
+def _today() -> str:
+    return datetime.datetime.now(datetime.timezone.utc).date().isoformat()
+
+
+def _category_slug(category: str) -> str:
+    return "".join(ch if ch.isalnum() or ch in ".-_" else "_" for ch in category) or "_"
+
+
+class StaticArchive:
+    """Persistent static site of daily results: one page per day, an index and per-category listings.
+
+    Layout under `root`:
+    - `index.html`: every archived day, newest first, with its paper count.
+    - `days/<day>/`: that day's results page (`web_display.build_site`).
+    - `categories/index.html`, `categories/<cat>/index.html`: the days listing that category.
+    - `categories/<cat>/<day>.html`: that day's papers in the category.
+
+    `manifest.json` keeps a content hash per day and per written file. `add_run`
+    skips a day whose results are unchanged, and writes only files whose content
+    changed, so appending a day costs O(new papers + days), not a re-render of
+    the whole history.
+    """
+
+    def __init__(self, root: str | Path):
+        self.root = Path(root)
+        self.manifest: dict[str, Any] = {"days": {}, "files": {}}
+        path = self.root / MANIFEST
+        if path.exists():
+            with open(path, "r", encoding="utf-8") as f:
+                self.manifest = json.load(f)
+
+    def add_run(self, papers: Iterable[object], day: str | None = None) -> dict[str, Any]:
+        """Archive `papers` (ranked) as `day` (`YYYY-MM-DD`, default today UTC), replacing an earlier run of that day."""
+        day = datetime.date.fromisoformat(day).isoformat() if day else _today()
+        papers = list(papers)
+        digest = self._digest(papers)
+        stats = {"day": day, "papers": len(papers), "changed": False, "written": 0, "unchanged": 0}
+        previous = self.manifest["days"].get(day)
+        if previous is not None and previous["hash"] == digest and (self.root / "days" / day / "index.html").exists():
+            logging.info("Archive: %s unchanged, nothing to write.", day)
+            return stats
+
+        with tracer.span("archive.add_run", day=day, papers=len(papers)):
+            stats["changed"] = True
+            by_category: dict[str, list[tuple[int, object]]] = {}
+            for rank, paper in enumerate(papers, start=1):
+                for category in getattr(paper, "categories", None) or []:
+                    by_category.setdefault(category, []).append((rank, paper))
+
+            day_dir = f"days/{day}"
+            site = build_site(papers)
+            self._remove_stale(day_dir, {f"{day_dir}/{rel}" for rel in site})
+            for rel, asset in site.items():
+                self._write(f"{day_dir}/{rel}", asset, stats)
+
+            old_categories = set(previous["categories"]) if previous else set()
+            for category in old_categories - set(by_category):
+                self._delete(f"categories/{_category_slug(category)}/{day}.html")
+            for category, entries in by_category.items():
+                self._write(
+                    f"categories/{_category_slug(category)}/{day}.html",
+                    self._category_day_page(category, day, entries),
+                    stats,
+                )
+
+            self.manifest["days"][day] = {
+                "hash": digest,
+                "count": len(papers),
+                "categories": {category: len(entries) for category, entries in by_category.items()},
+            }
+            for category in old_categories | set(by_category):
+                self._write(f"categories/{_category_slug(category)}/index.html", self._category_index(category), stats)
+            self._write("categories/index.html", self._categories_page(), stats)
+            self._write("index.html", self._index_page(), stats)
+            self._save_manifest()
+        logging.info("Archive: %s written (%s files, %s unchanged).", day, stats["written"], stats["unchanged"])
+        return stats
+
+    def days(self) -> list[str]:
+        return sorted(self.manifest["days"], reverse=True)
+
+    def _digest(self, papers: list[object]) -> str:
+        records = [
+            [_row(paper, rank), getattr(paper, "summary", "") or "", _reasons(paper)]
+            for rank, paper in enumerate(papers, start=1)
+        ]
+        categories = [getattr(paper, "categories", None) or [] for paper in papers]
+        raw = json.dumps([records, categories], ensure_ascii=False, sort_keys=True).encode("utf-8")
+        return hashlib.sha256(raw).hexdigest()
+
+    def _write(self, rel_path: str, asset: Asset, stats: dict[str, Any]) -> None:
+        path = self.root / rel_path
+        if self.manifest["files"].get(rel_path) == asset.etag and path.exists():
+            stats["unchanged"] += 1
+            return
+        write_asset(path, asset)
+        self.manifest["files"][rel_path] = asset.etag
+        stats["written"] += 1
+
+    def _delete(self, rel_path: str) -> None:
+        self.manifest["files"].pop(rel_path, None)
+        path = self.root / rel_path
+        for stale in (path, path.with_name(path.name + ".gz"), path.with_name(path.name + ".br")):
+            stale.unlink(missing_ok=True)
+
+    def _remove_stale(self, prefix: str, keep: set[str]) -> None:
+        for rel_path in [p for p in self.manifest["files"] if p.startswith(prefix + "/") and p not in keep]:
+            self._delete(rel_path)
+
+    def _save_manifest(self) -> None:
+        self.root.mkdir(parents=True, exist_ok=True)
+        path = self.root / MANIFEST
+        tmp_path = str(path) + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(self.manifest, f, sort_keys=True)
+        os.replace(tmp_path, path)
+
+    def _index_page(self) -> Asset:
+        items = "".join(
+            f'<li><a href="days/{day}/index.html">{day}</a> '
+            f'<span class="muted">({self.manifest["days"][day]["count"]} papers)</span></li>'
+            for day in self.days()
+        )
+        body = (
+            '<h1>ArxivLens archive</h1><p><a href="categories/index.html">By category</a></p>'
+            f'<ul>{items or "<li>No runs archived yet.</li>"}</ul>'
+        )
+        return _html_asset("ArxivLens archive", body)
+
+    def _categories_page(self) -> Asset:
+        totals: dict[str, int] = {}
+        for info in self.manifest["days"].values():
+            for category, count in info["categories"].items():
+                totals[category] = totals.get(category, 0) + count
+        items = "".join(
+            f'<li><a href="{_category_slug(c)}/index.html">{html.escape(c)}</a> '
+            f'<span class="muted">({totals[c]} papers)</span></li>'
+            for c in sorted(totals)
+        )
+        body = f'<p><a href="../index.html">Archive</a></p><h1>Categories</h1><ul>{items}</ul>'
+        return _html_asset("ArxivLens categories", body)
+
+    def _category_index(self, category: str) -> Asset:
+        items = "".join(
+            f'<li><a href="{day}.html">{day}</a> '
+            f'<span class="muted">({self.manifest["days"][day]["categories"][category]} papers)</span></li>'
+            for day in self.days()
+            if category in self.manifest["days"][day]["categories"]
+        )
+        name = html.escape(category)
+        body = f'<p><a href="../index.html">Categories</a></p><h1>{name}</h1><ul>{items or "<li>No papers.</li>"}</ul>'
+        return _html_asset(f"ArxivLens {category}", body)
+
+    def _category_day_page(self, category: str, day: str, entries: list[tuple[int, object]]) -> Asset:
+        items = []
+        for rank, paper in entries:
+            url = getattr(paper, "url", "") or ""
+            href = html.escape(url) if url.startswith(("http://", "https://")) else "#"
+            reasons = _reasons(paper)
+            items.append(
+                f'<li><a href="{href}" target="_blank" rel="noopener">'
+                f'{html.escape(getattr(paper, "title", "") or "")}</a> '
+                f'<span class="muted">#{rank}</span><br /><span class="muted">{html.escape(reasons[0])}</span></li>'
+            )
+        body = (
+            f'<p><a href="index.html">{html.escape(category)}</a> &middot; '
+            f'<a href="../../days/{day}/index.html">Full results for {day}</a></p>'
+            f"<h1>{html.escape(category)} &middot; {day}</h1><ol>{''.join(items)}</ol>"
+        )
+        return _html_asset(f"ArxivLens {category} {day}", body)
+
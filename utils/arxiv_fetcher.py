@@ -1,10 +1,51 @@
 import arxiv
 import datetime
 import logging
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from dataclasses import dataclass
+from typing import Callable, Iterator
+from zoneinfo import ZoneInfo, ZoneInfoNotFoundError
+
 import feedparser
 from tqdm import tqdm
 
 from utils.paper import ArxivPaper
+from utils.paper_store import PaperStore, arxiv_id_version, normalize_arxiv_id
+from utils.rate_limit import TokenBucket
+from utils.tracing import tracer
+
+
+@dataclass(frozen=True)
+class FetchOptions:
+    batch_size: int = 100
+    max_concurrent_batches: int = 4
+    # arXiv API guidance: at most one request every three seconds.
+    requests_per_second: float = 1 / 3
+    max_retries: int = 5
+    backoff_seconds: float = 3.0
+
+
+try:
+    # arXiv's mailing cycle, and so the RSS feeds' day, follows US Eastern time.
+    _ARXIV_TZ: datetime.tzinfo = ZoneInfo("America/New_York")
+except ZoneInfoNotFoundError:  # no tz database, e.g. Windows without tzdata
+    _ARXIV_TZ = datetime.timezone(datetime.timedelta(hours=-5))
+
+_SCHEDULERS: dict[float, TokenBucket] = {}
+_SCHEDULERS_LOCK = threading.Lock()
+
+
+def _api_scheduler(requests_per_second: float) -> TokenBucket:
+    """Process-wide politeness gate, shared by every fetch running at the same rate."""
+    with _SCHEDULERS_LOCK:
+        bucket = _SCHEDULERS.get(requests_per_second)
+        if bucket is None:
+            bucket = TokenBucket(requests_per_second, capacity=1)
+            _SCHEDULERS[requests_per_second] = bucket
+        return bucket
 
 
 def _entry_datetime(entry) -> datetime.datetime | None:
@@ -14,6 +55,21 @@ def _entry_datetime(entry) -> datetime.datetime | None:
     return datetime.datetime(*parsed[:6], tzinfo=datetime.timezone.utc)
 
 
+def _announcement_day(moment: datetime.datetime | None = None) -> str:
+    """arXiv's (US Eastern) calendar day of `moment`, default now."""
+    moment = moment or datetime.datetime.now(datetime.timezone.utc)
+    return moment.astimezone(_ARXIV_TZ).date().isoformat()
+
+
+def _feed_day(feed) -> str | None:
+    """The announcement day a feed reports: its own stamp, else its newest entry."""
+    parsed = feed.feed.get("published_parsed") or feed.feed.get("updated_parsed")
+    if parsed:
+        return _announcement_day(datetime.datetime(*parsed[:6], tzinfo=datetime.timezone.utc))
+    stamps = [stamp for stamp in map(_entry_datetime, feed.entries) if stamp]
+    return _announcement_day(max(stamps)) if stamps else None
+
+
 def _latest_two_days_entry_ids(feed) -> list[str]:
     entries_with_dt: list[tuple[datetime.datetime, str]] = []
     for entry in feed.entries:
@@ -63,7 +119,7 @@ def _search_latest_two_days_papers(
     latest_date: datetime.date | None = None
     allowed_dates: set[datetime.date] = set()
     for result in client.results(search):
-        paper = ArxivPaper(result)
+        paper = ArxivPaper.from_result(result)
         published = paper.published
         if published is None:
             continue
@@ -78,47 +134,259 @@ def _search_latest_two_days_papers(
     return recent
 
 
-def get_arxiv_paper(query: str, debug: bool = False) -> list[ArxivPaper]:
-    client = arxiv.Client(num_retries=10, delay_seconds=1)
-    feed = feedparser.parse(f"https://rss.arxiv.org/atom/{query}")
-    if "Feed error for query" in feed.feed.title:
-        raise ValueError(f"Invalid ARXIV_QUERY: {query}.")
+def _query_categories(query: str) -> list[str]:
+    return list(dict.fromkeys(part for part in query.strip().split("+") if part))
 
-    if debug:
-        search = arxiv.Search(query="cat:cs.AI", sort_by=arxiv.SortCriterion.SubmittedDate)
-        papers: list[ArxivPaper] = []
-        for result in client.results(search):
-            papers.append(ArxivPaper(result))
-            if len(papers) == 5:
-                break
-        return papers
 
-    papers: list[ArxivPaper] = []
-    all_paper_ids = [
+def _category_feed_ids(category: str) -> tuple[list[str], str | None]:
+    """Announced ids (with version suffix when the feed has one) and the feed's announcement day."""
+    with tracer.span("fetch.rss", category=category) as span:
+        feed = feedparser.parse(f"https://rss.arxiv.org/atom/{category}")
+        span["entries"] = len(feed.entries)
+    if "Feed error for query" in feed.feed.get("title", ""):
+        raise ValueError(f"Invalid ARXIV_QUERY: {category}.")
+    paper_ids = [
         entry.id.removeprefix("oai:arXiv.org:")
         for entry in feed.entries
-        if entry.arxiv_announce_type == "new"
+        if entry.get("arxiv_announce_type") == "new"
     ]
-    if not all_paper_ids:
-        fallback_ids = _latest_two_days_entry_ids(feed)
-        if fallback_ids:
+    if not paper_ids:
+        paper_ids = _latest_two_days_entry_ids(feed)
+        if paper_ids:
             logging.info(
-                "No new arXiv papers found in RSS; falling back to latest two days (%s items).",
-                len(fallback_ids),
+                "No new arXiv papers found in RSS for %s; falling back to latest two days (%s items).",
+                category,
+                len(paper_ids),
             )
-            all_paper_ids = fallback_ids
-        else:
-            logging.info(
-                "No new arXiv papers found in RSS; falling back to API search for latest two days."
+    return paper_ids, _feed_day(feed)
+
+
+def _with_retries(fetch: Callable[[int], list[ArxivPaper]], what: str, options: FetchOptions) -> list[ArxivPaper]:
+    """Run `fetch(attempt)`, one paced API request, with exponential backoff; `what` names it in warnings."""
+    scheduler = _api_scheduler(options.requests_per_second)
+    for attempt in range(options.max_retries + 1):
+        scheduler.acquire()
+        try:
+            papers = fetch(attempt)
+            tracer.count("fetch.papers", len(papers))
+            return papers
+        except Exception as exc:
+            if attempt == options.max_retries:
+                tracer.count("fetch.failures")
+                raise
+            tracer.count("fetch.retries")
+            delay = options.backoff_seconds * (2**attempt) * random.uniform(0.5, 1.5)
+            logging.warning(
+                "arXiv %s failed (%s); retry %s/%s in %.1fs",
+                what,
+                exc,
+                attempt + 1,
+                options.max_retries,
+                delay,
             )
-            fallback_papers = _search_latest_two_days_papers(client, query)
-            if fallback_papers:
-                return fallback_papers
-    bar = tqdm(total=len(all_paper_ids), desc="Retrieving arXiv papers")
-    for i in range(0, len(all_paper_ids), 20):
-        search = arxiv.Search(id_list=all_paper_ids[i : i + 20])
-        batch = [ArxivPaper(p) for p in client.results(search)]
-        papers.extend(batch)
-        bar.update(len(batch))
-    bar.close()
+            time.sleep(delay)
+    return []
+
+
+def _fetch_batch(paper_ids: list[str], options: FetchOptions) -> list[ArxivPaper]:
+    # A fresh client per batch: arxiv.Client's own throttling is not thread-safe, so
+    # pacing and retries are handled here through the shared scheduler instead.
+    client = arxiv.Client(page_size=len(paper_ids), delay_seconds=0, num_retries=0)
+
+    def fetch(attempt: int) -> list[ArxivPaper]:
+        with tracer.span("fetch.batch", size=len(paper_ids), attempt=attempt):
+            search = arxiv.Search(id_list=paper_ids, max_results=len(paper_ids))
+            return [ArxivPaper.from_result(p) for p in client.results(search)]
+
+    return _with_retries(fetch, f"batch of {len(paper_ids)} ids", options)
+
+
+def fetch_submitted_page(
+    query: str,
+    start: datetime.date,
+    end: datetime.date,
+    offset: int,
+    page_size: int,
+    options: FetchOptions | None = None,
+) -> list[ArxivPaper]:
+    """One page of `query` papers first submitted in `[start, end]` (UTC days), oldest first.
+
+    Submission dates never change, so `offset` paging over a past window is stable.
+    """
+    options = options or FetchOptions()
+    api_query = _normalize_query_for_api(query)
+    window = f"submittedDate:[{start:%Y%m%d}0000 TO {end:%Y%m%d}2359]"
+    search = arxiv.Search(
+        query=f"({api_query}) AND {window}" if api_query else window,
+        sort_by=arxiv.SortCriterion.SubmittedDate,
+        sort_order=arxiv.SortOrder.Ascending,
+        max_results=offset + page_size,
+    )
+    client = arxiv.Client(page_size=page_size, delay_seconds=0, num_retries=0)
+
+    def fetch(attempt: int) -> list[ArxivPaper]:
+        with tracer.span("fetch.page", window=f"{start}..{end}", offset=offset, attempt=attempt):
+            return [ArxivPaper.from_result(p) for p in client.results(search, offset=offset)]
+
+    return _with_retries(fetch, f"page {start}..{end} @{offset}", options)
+
+
+def _iter_fetch_batches(
+    paper_ids: list[str], options: FetchOptions
+) -> Iterator[tuple[int, list[ArxivPaper]]]:
+    """Yield `(batch_index, papers)` in completion order while later batches are in flight."""
+    batch_size = max(1, options.batch_size)
+    batches = [paper_ids[i : i + batch_size] for i in range(0, len(paper_ids), batch_size)]
+    if not batches:
+        return
+    bar = tqdm(total=len(paper_ids), desc="Retrieving arXiv papers")
+    workers = max(1, min(options.max_concurrent_batches, len(batches)))
+    try:
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            futures = {pool.submit(_fetch_batch, batch, options): idx for idx, batch in enumerate(batches)}
+            for future in as_completed(futures):
+                batch = future.result()
+                bar.update(len(batch))
+                yield futures[future], batch
+    finally:
+        bar.close()
+
+
+def _fetch_by_ids(paper_ids: list[str], options: FetchOptions) -> list[ArxivPaper]:
+    results: dict[int, list[ArxivPaper]] = dict(_iter_fetch_batches(paper_ids, options))
+    return [paper for idx in sorted(results) for paper in results[idx]]
+
+
+def _category_ids(
+    categories: list[str], day: str, store: PaperStore | None
+) -> dict[str, list[str]]:
+    listings: dict[str, list[str]] = {}
+    to_fetch: list[str] = []
+    for category in categories:
+        stored = store.get_listing(category, day) if store is not None else None
+        if stored is None:
+            to_fetch.append(category)
+        else:
+            logging.info("Using stored %s listing for %s (%s ids).", category, day, len(stored))
+            listings[category] = stored
+    if to_fetch:
+        with ThreadPoolExecutor(max_workers=min(8, len(to_fetch))) as pool:
+            feeds = pool.map(_category_feed_ids, to_fetch)
+            for category, (ids, feed_day) in zip(to_fetch, feeds):
+                listings[category] = ids
+                if store is not None and ids:
+                    # Saved under the day the feed announced, not the day it was read:
+                    # a feed that has not rolled over yet is fetched again on the next run.
+                    if feed_day and feed_day != day:
+                        logging.info("%s feed is still on %s's announcements.", category, feed_day)
+                    store.put_listing(category, feed_day or day, ids)
+    return listings
+
+
+def _candidate_ids(query: str, store: PaperStore | None) -> list[str]:
+    """Announced ids of `query` in feed order, one per paper, with the newest version seen."""
+    # Multi-category queries are assembled from one feed per category so that
+    # overlapping queries (cs.AI+cs.LG, cs.LG+cs.RO) share cached listings.
+    categories = _query_categories(query)
+    listings = _category_ids(categories, _announcement_day(), store)
+    candidates: dict[str, str] = {}
+    for category in categories:
+        for paper_id in listings[category]:
+            key = normalize_arxiv_id(paper_id)
+            if key not in candidates or (arxiv_id_version(paper_id) or 0) > (arxiv_id_version(candidates[key]) or 0):
+                candidates[key] = paper_id
+    return list(candidates.values())
+
+
+def _debug_papers(client: arxiv.Client) -> list[ArxivPaper]:
+    search = arxiv.Search(query="cat:cs.AI", sort_by=arxiv.SortCriterion.SubmittedDate)
+    papers: list[ArxivPaper] = []
+    for result in client.results(search):
+        papers.append(ArxivPaper.from_result(result))
+        if len(papers) == 5:
+            break
     return papers
+
+
+def _fallback_papers(
+    client: arxiv.Client, query: str, store: PaperStore | None
+) -> list[ArxivPaper]:
+    logging.info(
+        "No new arXiv papers found in RSS; falling back to API search for latest two days."
+    )
+    fallback_papers = _search_latest_two_days_papers(client, query)
+    if store is not None and fallback_papers:
+        store.put_many(fallback_papers)
+    return fallback_papers
+
+
+def _split_cached(
+    all_paper_ids: list[str], store: PaperStore
+) -> tuple[list[ArxivPaper], list[str]]:
+    missing_ids = store.missing(all_paper_ids)
+    logging.info(
+        "Paper store: %s of %s papers cached, fetching %s.",
+        len(all_paper_ids) - len(missing_ids),
+        len(all_paper_ids),
+        len(missing_ids),
+    )
+    missing = set(missing_ids)
+    cached_ids = (i for i in map(normalize_arxiv_id, all_paper_ids) if i not in missing)
+    return store.get_many(cached_ids), missing_ids
+
+
+def get_arxiv_paper(
+    query: str,
+    debug: bool = False,
+    store: PaperStore | None = None,
+    options: FetchOptions | None = None,
+) -> list[ArxivPaper]:
+    options = options or FetchOptions()
+    client = arxiv.Client(num_retries=10, delay_seconds=1)
+    all_paper_ids = _candidate_ids(query, store)
+    if debug:
+        return _debug_papers(client)
+    if not all_paper_ids:
+        return _fallback_papers(client, query, store)
+    if store is None:
+        return _fetch_by_ids([normalize_arxiv_id(i) for i in all_paper_ids], options)
+
+    cached, missing_ids = _split_cached(all_paper_ids, store)
+    fetched = _fetch_by_ids(missing_ids, options) if missing_ids else []
+    if fetched:
+        store.put_many(fetched)
+    by_id = {p.arxiv_id: p for p in cached}
+    by_id.update((p.arxiv_id, p) for p in fetched)
+    order = map(normalize_arxiv_id, all_paper_ids)
+    return [by_id[paper_id] for paper_id in order if paper_id in by_id]
+
+
+def iter_arxiv_paper_batches(
+    query: str,
+    debug: bool = False,
+    store: PaperStore | None = None,
+    options: FetchOptions | None = None,
+) -> Iterator[list[ArxivPaper]]:
+    """Streaming variant of `get_arxiv_paper`: stored papers first, then each API batch as it lands.
+
+    Batches arrive in completion order, not RSS order.
+    """
+    options = options or FetchOptions()
+    client = arxiv.Client(num_retries=10, delay_seconds=1)
+    all_paper_ids = _candidate_ids(query, store)
+    if debug:
+        yield _debug_papers(client)
+        return
+    if not all_paper_ids:
+        yield _fallback_papers(client, query, store)
+        return
+
+    missing_ids = [normalize_arxiv_id(i) for i in all_paper_ids]
+    if store is not None:
+        cached, missing_ids = _split_cached(all_paper_ids, store)
+        if cached:
+            yield cached
+    for _, batch in _iter_fetch_batches(missing_ids, options):
+        if store is not None and batch:
+            store.put_many(batch)
+        yield batch
@@ -0,0 +1,164 @@
+from __future__ import annotations
+
+import datetime
+import json
+import logging
+import os
+import time
+from dataclasses import dataclass, field
+from typing import Any, Callable
+
+from utils.arxiv_fetcher import FetchOptions, fetch_submitted_page
+from utils.paper import ArxivPaper
+from utils.paper_store import PaperStore
+from utils.tracing import tracer
+
+# The arXiv API stops serving results past this offset; smaller windows keep under it.
+MAX_WINDOW_RESULTS = 10_000
+
+
+@dataclass(frozen=True)
+class BackfillOptions:
+    window_days: int = 7
+    # Papers per API page, and so per chunk held in memory and handed to `on_chunk`.
+    page_size: int = 500
+    fetch: FetchOptions = field(default_factory=FetchOptions)
+
+
+def date_windows(start: datetime.date, end: datetime.date, days: int) -> list[tuple[datetime.date, datetime.date]]:
+    """Consecutive inclusive `[first, last]` day ranges covering `start..end`, oldest first."""
+    if end < start:
+        raise ValueError(f"Backfill end {end} is before start {start}.")
+    step = datetime.timedelta(days=max(1, days))
+    windows = []
+    first = start
+    while first <= end:
+        last = min(end, first + step - datetime.timedelta(days=1))
+        windows.append((first, last))
+        first = last + datetime.timedelta(days=1)
+    return windows
+
+
+class Backfill:
+    """Resumable fetch of every `query` paper submitted in a date range, window by window.
+
+    Each window is paged through the arXiv API oldest first. Every page is written to
+    the paper store and passed to `on_chunk` (e.g. embedding into the cache), and only
+    then recorded in the checkpoint, so an interrupted run resumes at the first page
+    not fully processed: at most one page is fetched twice, and nothing is held in
+    memory beyond the current page.
+
+    A window is marked done once fully paged and in the past; done windows are skipped
+    on later runs. The checkpoint (JSON, replaced atomically) records the query and
+    maps `"<first>..<last>"` to `{"offset", "papers", "seconds", "done"}`.
+    """
+
+    def __init__(
+        self,
+        query: str,
+        checkpoint_path: str,
+        store: PaperStore | None = None,
+        options: BackfillOptions | None = None,
+    ):
+        self.query = query
+        self.checkpoint_path = checkpoint_path
+        self.store = store
+        self.options = options or BackfillOptions()
+        self.state: dict[str, Any] = {"query": query, "windows": {}}
+        if os.path.exists(checkpoint_path):
+            with open(checkpoint_path, "r", encoding="utf-8") as f:
+                self.state = json.load(f)
+            if self.state.get("query") != query:
+                raise ValueError(
+                    f"Checkpoint {checkpoint_path} belongs to query {self.state.get('query')!r}, not {query!r}."
+                )
+
+    def run(
+        self,
+        start: datetime.date,
+        end: datetime.date,
+        on_chunk: Callable[[list[ArxivPaper]], None] | None = None,
+        on_window: Callable[[dict[str, Any]], None] | None = None,
+    ) -> dict[str, Any]:
+        """Backfill `start..end`; `on_window(stats)` runs after each window, before it is marked done."""
+        windows = date_windows(start, end, self.options.window_days)
+        totals = {"windows": len(windows), "skipped": 0, "papers": 0, "seconds": 0.0}
+        for number, (first, last) in enumerate(windows, start=1):
+            key = f"{first}..{last}"
+            entry = self.state["windows"].setdefault(key, {"offset": 0, "papers": 0, "seconds": 0.0, "done": False})
+            if entry["done"]:
+                totals["skipped"] += 1
+                continue
+            started = time.perf_counter()
+            with tracer.span("backfill.window", window=key, offset=entry["offset"]):
+                fetched = self._window(first, last, entry, on_chunk)
+            seconds = time.perf_counter() - started
+            stats = {
+                "window": key,
+                "papers": entry["papers"],
+                "fetched": fetched,
+                "seconds": round(seconds, 2),
+                "papers_per_s": round(fetched / max(seconds, 1e-9), 1),
+            }
+            if on_window:
+                on_window(stats)
+            # Papers can still be submitted on today's date: that window stays open and the
+            # next run continues from its offset (pages are oldest first, so new ones append).
+            entry["done"] = last < datetime.datetime.now(datetime.timezone.utc).date()
+            self._save()
+            totals["papers"] += fetched
+            totals["seconds"] += seconds
+            logging.info(
+                "Backfill %s/%s %s: %s papers (%s fetched now) in %.1fs, %.1f papers/s",
+                number,
+                len(windows),
+                key,
+                stats["papers"],
+                fetched,
+                seconds,
+                stats["papers_per_s"],
+            )
+        totals["seconds"] = round(totals["seconds"], 2)
+        totals["papers_per_s"] = round(totals["papers"] / max(totals["seconds"], 1e-9), 1)
+        return totals
+
+    def _window(
+        self,
+        first: datetime.date,
+        last: datetime.date,
+        entry: dict[str, Any],
+        on_chunk: Callable[[list[ArxivPaper]], None] | None,
+    ) -> int:
+        page_size = self.options.page_size
+        fetched = 0
+        while True:
+            started = time.perf_counter()
+            papers = fetch_submitted_page(self.query, first, last, entry["offset"], page_size, self.options.fetch)
+            if papers:
+                if self.store is not None:
+                    self.store.put_many(papers)
+                if on_chunk:
+                    on_chunk(papers)
+            tracer.count("backfill.papers", len(papers))
+            fetched += len(papers)
+            entry["offset"] += len(papers)
+            entry["papers"] += len(papers)
+            entry["seconds"] += time.perf_counter() - started
+            self._save()
+            if len(papers) < page_size:
+                return fetched
+            if entry["offset"] >= MAX_WINDOW_RESULTS:
+                logging.warning(
+                    "Backfill window %s..%s has over %s papers; use a smaller window to get the rest.",
+                    first,
+                    last,
+                    MAX_WINDOW_RESULTS,
+                )
+                return fetched
+
+    def _save(self) -> None:
+        os.makedirs(os.path.dirname(os.path.abspath(self.checkpoint_path)), exist_ok=True)
+        tmp_path = self.checkpoint_path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(self.state, f, indent=1, sort_keys=True)
+        os.replace(tmp_path, self.checkpoint_path)
@@ -0,0 +1,198 @@
+from __future__ import annotations
+
+import re
+import zlib
+from dataclasses import dataclass
+from typing import Any, Iterable
+
+import numpy as np
+
+from utils.paper import ArxivPaper
+from utils.paper_store import normalize_arxiv_id
+from utils.tracing import tracer
+
+_WORD = re.compile(r"[a-z0-9]+")
+_MASK32 = np.uint64(0xFFFFFFFF)
+_SHIFT = np.uint64(32)
+
+
+@dataclass(frozen=True)
+class DedupOptions:
+    # Estimated Jaccard similarity of abstract shingle sets at which a paper is a near-duplicate.
+    # Word sets (shingle_words=1) keep a rewritten version (sentences added or dropped, 30% of
+    # words changed) above 0.5, while distinct papers on the same topic stay below ~0.3;
+    # 3-word shingles drop such a rewrite to ~0.15, indistinguishable from unrelated papers.
+    threshold: float = 0.5
+    num_perm: int = 128
+    # LSH bands of num_perm / bands rows. 32 x 4 makes pairs at J=0.6 candidates with
+    # p~0.99 and same-topic abstracts (J~0.25) with p~0.12.
+    bands: int = 32
+    shingle_words: int = 1
+    seed: int = 1
+
+
+def paper_key(arxiv_id: str) -> str:
+    """Version-free, prefix-free id: `arXiv:2401.00001v2` and `2401.00001` are the same paper."""
+    paper_id = arxiv_id.strip()
+    paper_id = re.sub(r"^(?:https?://arxiv\.org/(?:abs|pdf)/|arxiv:)", "", paper_id, flags=re.IGNORECASE)
+    return normalize_arxiv_id(paper_id.removesuffix(".pdf")).lower()
+
+
+def _shingle_hashes(text: str, size: int, word_hashes: dict[str, int]) -> np.ndarray:
+    words = _WORD.findall(text.lower())
+    if not words:
+        return np.zeros(0, dtype=np.uint64)
+    # crc32 keeps signatures stable across runs; memoized, since abstracts share most words.
+    values = list(map(word_hashes.get, words))
+    if None in values:
+        for i, value in enumerate(values):
+            if value is None:
+                values[i] = word_hashes[words[i]] = zlib.crc32(words[i].encode())
+    hashes = np.array(values, dtype=np.uint64)
+    size = min(size, len(hashes))
+    # Word k-gram hash from the word hashes, kept to 32 bits.
+    shingles = np.zeros(len(hashes) - size + 1, dtype=np.uint64)
+    with np.errstate(over="ignore"):
+        for offset in range(size):
+            shingles = (shingles * np.uint64(0x100000001B3)) ^ hashes[offset : offset + len(shingles)]
+    return np.unique((shingles ^ (shingles >> _SHIFT)) & _MASK32)
+
+
+class Deduplicator:
+    """Drops repeated candidates before the expensive stages: exact and near-duplicate.
+
+    Exact: papers with the same `paper_key` collapse to one, keeping the newest version
+    (`updated`) at the first occurrence's position and the union of categories
+    (cross-listings). Near: MinHash signatures over word shingles of the abstract, banded
+    LSH to find candidate pairs, then a signature-agreement check against
+    `options.threshold`; the later paper is dropped. Cost is linear in the number of
+    papers plus candidate pairs.
+
+    State persists across `add` calls, so streaming batches are deduplicated against
+    everything seen so far. Every dropped paper is recorded in `skipped`.
+    """
+
+    def __init__(self, options: DedupOptions | None = None):
+        self.options = options or DedupOptions()
+        if self.options.num_perm % self.options.bands:
+            raise ValueError("num_perm must be a multiple of bands.")
+        rng = np.random.default_rng(self.options.seed)
+        self._a = rng.integers(1, 2**64 - 1, size=self.options.num_perm, dtype=np.uint64) | np.uint64(1)
+        self._b = rng.integers(0, 2**64 - 1, size=self.options.num_perm, dtype=np.uint64)
+        self._rows = self.options.num_perm // self.options.bands
+        self._band_mix = rng.integers(1, 2**64 - 1, size=self._rows, dtype=np.uint64) | np.uint64(1)
+        self._word_hashes: dict[str, int] = {}
+        self._by_key: dict[str, ArxivPaper] = {}
+        self._buckets: list[dict[int, list[int]]] = [{} for _ in range(self.options.bands)]
+        # Kept signatures, one row each; grown by doubling so candidates are compared in one array op.
+        self._signatures = np.zeros((0, self.options.num_perm), dtype=np.uint64)
+        self._owners: list[str] = []
+        self.skipped: list[dict[str, Any]] = []
+
+    def signatures(self, texts: list[str], chunk: int = 256) -> np.ndarray:
+        """MinHash signatures, shape `(len(texts), num_perm)`; texts without words get all-max rows.
+
+        Each permutation is a multiply-shift hash `(a * x + b) >> 32` in wrapping uint64
+        arithmetic; shingles of `chunk` texts are hashed in one array op and reduced per
+        text with `minimum.reduceat`.
+        """
+        out = np.full((len(texts), self.options.num_perm), np.iinfo(np.uint64).max, dtype=np.uint64)
+        for start in range(0, len(texts), chunk):
+            shingles = [
+                _shingle_hashes(text, self.options.shingle_words, self._word_hashes)
+                for text in texts[start : start + chunk]
+            ]
+            rows = [i for i, values in enumerate(shingles) if len(values)]
+            if not rows:
+                continue
+            offsets = np.cumsum([0] + [len(shingles[i]) for i in rows[:-1]])
+            x = np.concatenate([shingles[i] for i in rows])
+            with np.errstate(over="ignore"):
+                values = self._a[:, None] * x[None, :]
+                values += self._b[:, None]
+                values >>= _SHIFT
+            out[start + np.asarray(rows)] = np.minimum.reduceat(values, offsets, axis=1).T
+        return out
+
+    def add(self, papers: Iterable[ArxivPaper]) -> list[ArxivPaper]:
+        """The papers of this batch not seen before (in this batch or earlier), in input order."""
+        with tracer.span("dedup.add") as span:
+            unique = self._exact(list(papers))
+            signatures = self.signatures([paper.summary or "" for paper in unique])
+            empty = (signatures == np.iinfo(np.uint64).max).all(axis=1)
+            # One integer key per LSH band: the band's rows mixed into a single uint64.
+            bands = signatures.reshape(len(unique), self.options.bands, self._rows)
+            with np.errstate(over="ignore"):
+                band_keys = (bands * self._band_mix).sum(axis=2)
+            kept = [
+                paper
+                for i, paper in enumerate(unique)
+                if empty[i] or not self._near(paper, signatures[i], band_keys[i].tolist())
+            ]
+            span["kept"] = len(kept)
+        return kept
+
+    def _exact(self, papers: list[ArxivPaper]) -> list[ArxivPaper]:
+        slots: dict[str, int] = {}
+        batch: list[ArxivPaper] = []
+        for paper in papers:
+            key = paper_key(paper.arxiv_id)
+            first = self._by_key.get(key)
+            if first is None:
+                slots[key] = len(batch)
+                self._by_key[key] = paper
+                batch.append(paper)
+                continue
+            # A newer version replaces the kept paper only while it has not been handed out yet.
+            newer = (
+                key in slots
+                and paper.updated is not None
+                and (first.updated is None or paper.updated > first.updated)
+            )
+            kept, dropped = (paper, first) if newer else (first, paper)
+            kept.categories = list(dict.fromkeys(first.categories + paper.categories))
+            if newer:
+                batch[slots[key]] = self._by_key[key] = kept
+            self._skip(dropped, kept, "exact", 1.0)
+        return batch
+
+    def _near(self, paper: ArxivPaper, signature: np.ndarray, band_keys: list[int]) -> bool:
+        candidates = {index for band, key in enumerate(band_keys) for index in self._buckets[band].get(key, ())}
+        if candidates:
+            indices = np.fromiter(candidates, dtype=np.int64, count=len(candidates))
+            similarities = (self._signatures[indices] == signature).mean(axis=1)
+            top = int(np.argmax(similarities))
+            if similarities[top] >= self.options.threshold:
+                self._skip(paper, self._by_key[self._owners[indices[top]]], "near", float(similarities[top]))
+                return True
+        index = len(self._owners)
+        if index == len(self._signatures):
+            grown = np.zeros((max(64, 2 * index), self.options.num_perm), dtype=np.uint64)
+            grown[:index] = self._signatures
+            self._signatures = grown
+        self._signatures[index] = signature
+        self._owners.append(paper_key(paper.arxiv_id))
+        for band, key in enumerate(band_keys):
+            self._buckets[band].setdefault(key, []).append(index)
+        return False
+
+    def _skip(self, paper: ArxivPaper, kept: ArxivPaper, reason: str, similarity: float) -> None:
+        self.skipped.append(
+            {
+                "arxiv_id": paper.arxiv_id,
+                "title": paper.title,
+                "duplicate_of": kept.arxiv_id,
+                "reason": reason,
+                "similarity": round(similarity, 3),
+            }
+        )
+        tracer.count(f"dedup.{reason}")
+
+
+def dedup_papers(
+    papers: Iterable[ArxivPaper], options: DedupOptions | None = None
+) -> tuple[list[ArxivPaper], list[dict[str, Any]]]:
+    """One-shot `Deduplicator`: `(kept papers in input order, skipped records)`."""
+    deduplicator = Deduplicator(options)
+    kept = deduplicator.add(papers)
+    return kept, deduplicator.skipped
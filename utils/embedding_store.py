@@ -0,0 +1,195 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import re
+import threading
+import time
+from typing import Callable, Sequence
+
+import numpy as np
+
+
+def text_key(text: str) -> str:
+    return hashlib.sha1(text.encode("utf-8")).hexdigest()
+
+
+class EmbeddingStore:
+    """Append-only, memory-mapped embedding cache for one model.
+
+    Layout under `<root>/<model slug>/`:
+    - `vectors.bin`: raw `(rows, dim)` array in `dtype`, read through `np.memmap`.
+    - `index.json`: `{"dim", "dtype", "rows", "keys": {key: [row, last_used]}}`.
+
+    Evicted or replaced rows stay in `vectors.bin` until `compact` rewrites it.
+    """
+
+    def __init__(
+        self,
+        root: str,
+        model: str,
+        dtype: str = "float16",
+        max_entries: int | None = None,
+        max_age_days: float | None = None,
+    ):
+        self.model = model
+        self.dtype = np.dtype(dtype)
+        self.max_entries = max_entries
+        self.max_age_days = max_age_days
+        self.directory = os.path.join(root, re.sub(r"[^A-Za-z0-9._-]+", "__", model))
+        self._vectors_path = os.path.join(self.directory, "vectors.bin")
+        self._index_path = os.path.join(self.directory, "index.json")
+        self._lock = threading.Lock()
+        self._mmap: np.memmap | None = None
+        self.hits = 0
+        self.misses = 0
+        os.makedirs(self.directory, exist_ok=True)
+        self._load_index()
+
+    def __len__(self) -> int:
+        return len(self._keys)
+
+    def _load_index(self) -> None:
+        self.dim: int | None = None
+        self._rows = 0
+        self._keys: dict[str, list] = {}
+        if not os.path.exists(self._index_path):
+            return
+        with open(self._index_path, "r", encoding="utf-8") as f:
+            index = json.load(f)
+        if np.dtype(index.get("dtype")) != self.dtype:
+            # Stored precision changed; start over rather than mix dtypes.
+            return
+        self.dim = index["dim"]
+        self._rows = index["rows"]
+        self._keys = index["keys"]
+        expected = self._rows * (self.dim or 0) * self.dtype.itemsize
+        size = os.path.getsize(self._vectors_path) if os.path.exists(self._vectors_path) else -1
+        if size < expected:
+            self.dim, self._rows, self._keys = None, 0, {}
+        elif size > expected:
+            # Rows appended after the last flush (e.g. a crash before it) are not in the
+            # index; drop them so the next append lands at row `rows`.
+            os.truncate(self._vectors_path, expected)
+
+    def _write_index(self) -> None:
+        tmp_path = self._index_path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(
+                {
+                    "dim": self.dim,
+                    "dtype": self.dtype.name,
+                    "rows": self._rows,
+                    "keys": self._keys,
+                },
+                f,
+            )
+        os.replace(tmp_path, self._index_path)
+
+    def _vectors(self) -> np.memmap | None:
+        if self._rows == 0 or self.dim is None:
+            return None
+        if self._mmap is None or self._mmap.shape[0] != self._rows:
+            self._mmap = np.memmap(
+                self._vectors_path, dtype=self.dtype, mode="r", shape=(self._rows, self.dim)
+            )
+        return self._mmap
+
+    def get_many(self, keys: Sequence[str]) -> tuple[np.ndarray | None, list[int]]:
+        """Return `(vectors, missing)`; rows listed in `missing` are left as zeros."""
+        with self._lock:
+            vectors = self._vectors()
+            now = time.time()
+            missing: list[int] = []
+            out = None if self.dim is None else np.zeros((len(keys), self.dim), dtype=np.float32)
+            for i, key in enumerate(keys):
+                entry = self._keys.get(key)
+                if entry is None or vectors is None or out is None:
+                    missing.append(i)
+                    continue
+                out[i] = vectors[entry[0]]
+                entry[1] = now
+            self.hits += len(keys) - len(missing)
+            self.misses += len(missing)
+        return out, missing
+
+    def put_many(self, keys: Sequence[str], vectors: np.ndarray) -> None:
+        vectors = np.asarray(vectors)
+        if len(keys) == 0:
+            return
+        with self._lock:
+            if self.dim is None:
+                self.dim = int(vectors.shape[1])
+                open(self._vectors_path, "wb").close()
+            elif vectors.shape[1] != self.dim:
+                raise ValueError(
+                    f"Embedding dim {vectors.shape[1]} does not match store dim {self.dim}"
+                )
+            with open(self._vectors_path, "ab") as f:
+                f.write(np.ascontiguousarray(vectors, dtype=self.dtype).tobytes())
+            now = time.time()
+            for offset, key in enumerate(keys):
+                self._keys[key] = [self._rows + offset, now]
+            self._rows += len(keys)
+            self._mmap = None
+
+    def evict(self) -> int:
+        """Drop entries past `max_age_days` or beyond `max_entries` (least recently used first)."""
+        with self._lock:
+            before = len(self._keys)
+            if self.max_age_days:
+                cutoff = time.time() - self.max_age_days * 86400
+                self._keys = {k: v for k, v in self._keys.items() if v[1] >= cutoff}
+            if self.max_entries and len(self._keys) > self.max_entries:
+                keep = sorted(self._keys.items(), key=lambda kv: kv[1][1], reverse=True)
+                self._keys = dict(keep[: self.max_entries])
+            return before - len(self._keys)
+
+    def compact(self) -> None:
+        """Rewrite `vectors.bin` with only the rows still referenced by the index."""
+        with self._lock:
+            vectors = self._vectors()
+            if vectors is None or len(self._keys) == self._rows:
+                return
+            tmp_path = self._vectors_path + ".tmp"
+            with open(tmp_path, "wb") as f:
+                for new_row, entry in enumerate(self._keys.values()):
+                    f.write(np.ascontiguousarray(vectors[entry[0]]).tobytes())
+                    entry[0] = new_row
+            self._mmap = None
+            del vectors
+            os.replace(tmp_path, self._vectors_path)
+            self._rows = len(self._keys)
+
+    def flush(self) -> None:
+        """Apply eviction, compact if more than a quarter of rows are dead, and save the index."""
+        self.evict()
+        if self._rows and len(self._keys) < 0.75 * self._rows:
+            self.compact()
+        with self._lock:
+            self._write_index()
+
+    def encode(
+        self,
+        texts: Sequence[str],
+        encode_fn: Callable[[list[str]], np.ndarray],
+        keys: Sequence[str] | None = None,
+    ) -> np.ndarray:
+        """Look up `texts` by key and send only the misses to `encode_fn`."""
+        keys = list(keys) if keys is not None else [text_key(t) for t in texts]
+        out, missing = self.get_many(keys)
+        if missing:
+            fresh = np.asarray(encode_fn([texts[i] for i in missing]), dtype=np.float32)
+            # Round-trip through the stored dtype so a cold and a warm run score identically.
+            fresh = fresh.astype(self.dtype).astype(np.float32)
+            self.put_many([keys[i] for i in missing], fresh)
+            if out is None:
+                out = np.zeros((len(texts), fresh.shape[1]), dtype=np.float32)
+            out[missing] = fresh
+        if out is None:
+            out = np.zeros((0, 0), dtype=np.float32)
+        return out
+
+    def stats(self) -> dict[str, int]:
+        return {"hits": self.hits, "misses": self.misses, "entries": len(self._keys)}
@@ -0,0 +1,278 @@
+from __future__ import annotations
+
+import logging
+import multiprocessing
+import os
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from typing import Any, Callable
+
+import numpy as np
+
+DEFAULT_EMBEDDING_MODEL = "avsolatorio/GIST-small-Embedding-v0"
+# "torch": SentenceTransformer as loaded (fp32); "torch-int8": dynamically quantized
+# Linear layers (CPU only); "onnx": ONNX Runtime backend of sentence-transformers.
+ENGINES = ("torch", "torch-int8", "onnx")
+DEFAULT_ENGINE = "torch"
+
+_ENCODERS: dict[tuple[str, str, str], Any] = {}
+_LOCK = threading.Lock()
+
+
+@dataclass(frozen=True)
+class EncodeOptions:
+    batch_size: int = 32
+    # Padded-length budget per batch (longest text x batch size, in characters), so
+    # long abstracts go in smaller batches; None = always `batch_size`.
+    max_batch_chars: int | None = 32 * 1000
+    num_threads: int | None = None  # torch intra-op threads (torch engines); None = torch default
+    workers: int = 0  # >1: encode large inputs in that many worker processes
+    min_pool_texts: int = 2000  # inputs smaller than this stay in-process
+
+
+def resolve_device(device: str | None = None) -> str:
+    if device:
+        return device
+    import torch
+
+    return "cuda" if torch.cuda.is_available() else "cpu"
+
+
+def cache_model_key(model: str, engine: str = DEFAULT_ENGINE) -> str:
+    """Embedding-cache identity of `model` run by `engine` (the default engine keeps the bare name)."""
+    return model if engine == DEFAULT_ENGINE else f"{model}@{engine}"
+
+
+def get_encoder(
+    model: str = DEFAULT_EMBEDDING_MODEL, device: str | None = None, engine: str = DEFAULT_ENGINE
+):
+    """Return the process-wide SentenceTransformer for `model` and `engine`, loading it on first use.
+
+    torch and sentence_transformers are imported here rather than at module load,
+    so callers that never encode (cache hits, `--help`) do not pay for them.
+    """
+    if engine not in ENGINES:
+        raise ValueError(f"Unknown embedding engine: {engine}. Supported: {', '.join(ENGINES)}")
+    device = "cpu" if engine != DEFAULT_ENGINE else resolve_device(device)
+    key = (model, device, engine)
+    encoder = _ENCODERS.get(key)
+    if encoder is not None:
+        return encoder
+    with _LOCK:
+        encoder = _ENCODERS.get(key)
+        if encoder is None:
+            start = time.perf_counter()
+            encoder = _load_encoder(model, device, engine)
+            _ENCODERS[key] = encoder
+            logging.info(
+                "Loaded encoder %s (%s) on %s in %.2fs",
+                model,
+                engine,
+                device,
+                time.perf_counter() - start,
+            )
+    return encoder
+
+
+def _load_encoder(model: str, device: str, engine: str):
+    from sentence_transformers import SentenceTransformer
+
+    if engine == "onnx":
+        try:
+            import onnxruntime  # noqa: F401
+        except ImportError as exc:
+            raise ImportError(
+                "The onnx embedding engine requires `pip install sentence-transformers[onnx]`."
+            ) from exc
+        # Exports the model to ONNX on first load when the hub repo has no onnx/ file.
+        return SentenceTransformer(model, device=device, backend="onnx")
+    encoder = SentenceTransformer(model, device=device)
+    if engine == "torch-int8":
+        import torch
+
+        encoder = torch.quantization.quantize_dynamic(encoder, {torch.nn.Linear}, dtype=torch.qint8)
+    return encoder
+
+
+def warm_up(
+    model: str = DEFAULT_EMBEDDING_MODEL, device: str | None = None, engine: str = DEFAULT_ENGINE
+) -> None:
+    """Load `model` and run one tiny batch so the first real encode is not a cold start."""
+    get_encoder(model, device, engine).encode(["warm up"])
+
+
+def warm_up_in_background(
+    model: str = DEFAULT_EMBEDDING_MODEL, device: str | None = None, engine: str = DEFAULT_ENGINE
+) -> threading.Thread:
+    def _run() -> None:
+        try:
+            warm_up(model, device, engine)
+        except Exception as exc:
+            logging.warning("Encoder warm-up failed: %s", exc)
+
+    thread = threading.Thread(target=_run, name="encoder-warm-up", daemon=True)
+    thread.start()
+    return thread
+
+
+def set_num_threads(num_threads: int | None) -> None:
+    if not num_threads:
+        return
+    import torch
+
+    if torch.get_num_threads() != num_threads:
+        torch.set_num_threads(num_threads)
+
+
+def length_batches(
+    texts: list[str], batch_size: int = 32, max_batch_chars: int | None = None
+) -> list[list[int]]:
+    """Indices of `texts` grouped into batches of similar length, shortest first.
+
+    Each batch holds at most `batch_size` texts and, with `max_batch_chars`, at most
+    that many padded characters (longest text x count), so padding stays small and
+    batches of long abstracts shrink instead of blowing up activation memory.
+    """
+    order = sorted(range(len(texts)), key=lambda i: len(texts[i]))
+    batches: list[list[int]] = []
+    current: list[int] = []
+    for i in order:
+        padded = max(1, len(texts[i])) * (len(current) + 1)
+        if current and (len(current) >= batch_size or (max_batch_chars and padded > max_batch_chars)):
+            batches.append(current)
+            current = []
+        current.append(i)
+    if current:
+        batches.append(current)
+    return batches
+
+
+def encode_batched(
+    encoder, texts: list[str], batch_size: int = 32, max_batch_chars: int | None = None
+) -> np.ndarray:
+    """`encoder.encode` over length-bucketed batches; rows come back in input order."""
+    if not texts:
+        return np.zeros((0, 0), dtype=np.float32)
+    out: np.ndarray | None = None
+    for batch in length_batches(texts, batch_size, max_batch_chars):
+        vectors = np.asarray(encoder.encode([texts[i] for i in batch], batch_size=len(batch)), dtype=np.float32)
+        if out is None:
+            out = np.empty((len(texts), vectors.shape[1]), dtype=np.float32)
+        out[batch] = vectors
+    return out
+
+
+_WORKER_ENCODER: Any = None
+
+
+def _worker_init(model: str, engine: str, num_threads: int | None, loader: Callable | None) -> None:
+    global _WORKER_ENCODER
+    if loader is not None:
+        _WORKER_ENCODER = loader(model, "cpu", engine)
+        return
+    if engine != "onnx":
+        set_num_threads(num_threads)
+    _WORKER_ENCODER = get_encoder(model, "cpu", engine)
+
+
+def _worker_encode(texts: list[str], batch_size: int, max_batch_chars: int | None) -> np.ndarray:
+    return encode_batched(_WORKER_ENCODER, texts, batch_size, max_batch_chars)
+
+
+class EncoderPool:
+    """Worker processes, each holding its own CPU encoder, for large encode jobs (backfills).
+
+    Inputs are length-sorted and cut into contiguous chunks so each worker gets
+    similarly sized texts; results are put back in input order. Threads are split
+    evenly across workers unless `num_threads` (per worker) is given. `loader(model,
+    device, engine)` replaces `get_encoder` in the workers (must be picklable).
+    """
+
+    def __init__(
+        self,
+        model: str,
+        engine: str,
+        workers: int,
+        num_threads: int | None = None,
+        loader: Callable | None = None,
+    ):
+        self.workers = workers
+        num_threads = num_threads or max(1, (os.cpu_count() or 1) // workers)
+        # spawn, not fork: the parent may already hold torch/tokenizer threads.
+        self._pool = ProcessPoolExecutor(
+            max_workers=workers,
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=_worker_init,
+            initargs=(model, engine, num_threads, loader),
+        )
+
+    def encode(
+        self, texts: list[str], batch_size: int = 32, max_batch_chars: int | None = None
+    ) -> np.ndarray:
+        if not texts:
+            return np.zeros((0, 0), dtype=np.float32)
+        order = sorted(range(len(texts)), key=lambda i: len(texts[i]))
+        chunk = max(batch_size, -(-len(texts) // (self.workers * 4)))
+        shards = [order[i : i + chunk] for i in range(0, len(order), chunk)]
+        results = self._pool.map(
+            _worker_encode,
+            [[texts[i] for i in shard] for shard in shards],
+            [batch_size] * len(shards),
+            [max_batch_chars] * len(shards),
+        )
+        out: np.ndarray | None = None
+        for shard, vectors in zip(shards, results):
+            if out is None:
+                out = np.empty((len(texts), vectors.shape[1]), dtype=np.float32)
+            out[shard] = vectors
+        return out
+
+    def close(self) -> None:
+        self._pool.shutdown()
+
+
+_POOLS: dict[tuple[str, str, int, int | None], EncoderPool] = {}
+
+
+def get_encoder_pool(model: str, engine: str, workers: int, num_threads: int | None = None) -> EncoderPool:
+    """Process-wide `EncoderPool`, started on first use (workers load the model once)."""
+    key = (model, engine, workers, num_threads)
+    with _LOCK:
+        pool = _POOLS.get(key)
+        if pool is None:
+            pool = EncoderPool(model, engine, workers, num_threads)
+            _POOLS[key] = pool
+    return pool
+
+
+def encode_texts(
+    texts: list[str],
+    model: str = DEFAULT_EMBEDDING_MODEL,
+    engine: str = DEFAULT_ENGINE,
+    options: EncodeOptions | None = None,
+    encoder: Any = None,
+) -> np.ndarray:
+    """Encode with length bucketing, in-process or (large inputs, `workers > 1`) in an `EncoderPool`."""
+    options = options or EncodeOptions()
+    if options.workers > 1 and len(texts) >= options.min_pool_texts:
+        pool = get_encoder_pool(model, engine, options.workers, options.num_threads)
+        return pool.encode(texts, options.batch_size, options.max_batch_chars)
+    if engine != "onnx":
+        set_num_threads(options.num_threads)
+    encoder = encoder if encoder is not None else get_encoder(model, engine=engine)
+    return encode_batched(encoder, texts, options.batch_size, options.max_batch_chars)
+
+
+def loaded_encoders() -> list[tuple[str, str, str]]:
+    return list(_ENCODERS)
+
+
+def cosine_similarity(a: np.ndarray, b: np.ndarray) -> np.ndarray:
+    """Same result as `SentenceTransformer.similarity` with its default cosine function."""
+    a = np.asarray(a, dtype=np.float32)
+    b = np.asarray(b, dtype=np.float32)
+    a = a / np.clip(np.linalg.norm(a, axis=1, keepdims=True), 1e-12, None)
+    b = b / np.clip(np.linalg.norm(b, axis=1, keepdims=True), 1e-12, None)
+    return a @ b.T
@@ -0,0 +1,126 @@
+from __future__ import annotations
+
+import math
+import re
+from typing import Any, Sequence
+
+import numpy as np
+
+from utils.paper import ArxivPaper
+from utils.tracing import tracer
+
+_TOKEN = re.compile(r"[a-z][a-z0-9\-]+")
+_STOPWORDS = frozenset(
+    """
+    a about above after all also an and any are as at be been being both but by can could did do does
+    each for from further had has have having he her here hers him his how i if in into is it its itself
+    just may me more most my no nor not now of on once only or other our ours out over own same she should
+    so some such than that the their theirs them then there these they this those through to too under
+    until up very was we were what when where which while who whom why will with would you your yours
+    paper propose proposed present method methods approach results show using based use used new via
+    """.split()
+)
+
+
+def tokenize(text: str) -> list[str]:
+    return [token for token in _TOKEN.findall(text.lower()) if token not in _STOPWORDS]
+
+
+def bm25_scores(docs: Sequence[str], queries: Sequence[str], k1: float = 1.2, b: float = 0.75) -> np.ndarray:
+    """Okapi BM25 of every doc against every query, shape `(len(docs), len(queries))`.
+
+    Vectorized over a sparse (doc, term, tf) layout that holds only query terms, as no
+    other term contributes to a score. Docs are tokenized once for all queries. Query
+    term frequencies are damped with `log1p`, so a long overview does not let its most
+    repeated words dominate.
+    """
+    query_tokens = [tokenize(query) for query in queries]
+    vocab = {token: i for i, token in enumerate(dict.fromkeys(t for tokens in query_tokens for t in tokens))}
+    n_docs, n_terms = len(docs), len(vocab)
+    scores = np.zeros((n_docs, len(queries)), dtype=np.float32)
+    if not n_docs or not n_terms:
+        return scores
+
+    doc_len = np.empty(n_docs, dtype=np.float64)
+    doc_ids: list[int] = []
+    term_ids: list[int] = []
+    for row, text in enumerate(docs):
+        tokens = tokenize(text)
+        doc_len[row] = len(tokens)
+        hits = [vocab[token] for token in tokens if token in vocab]
+        term_ids += hits
+        doc_ids += [row] * len(hits)
+    if not term_ids:
+        return scores
+
+    pairs, tf = np.unique(
+        np.asarray(doc_ids, dtype=np.int64) * n_terms + np.asarray(term_ids, dtype=np.int64), return_counts=True
+    )
+    doc, term, tf = pairs // n_terms, pairs % n_terms, tf.astype(np.float64)
+    df = np.bincount(term, minlength=n_terms)
+    idf = np.log1p((n_docs - df + 0.5) / (df + 0.5))
+    norm = k1 * (1 - b + b * doc_len[doc] / max(doc_len.mean(), 1e-9))
+    term_score = idf[term] * tf * (k1 + 1) / (tf + norm)
+    for column, tokens in enumerate(query_tokens):
+        if tokens:
+            weight = np.log1p(np.bincount([vocab[token] for token in tokens], minlength=n_terms))
+            scores[:, column] = np.bincount(doc, weights=term_score * weight[term], minlength=n_docs)
+    return scores
+
+
+def prefilter_size(top_m: int, margin: float, total: int) -> int:
+    return min(total, math.ceil(top_m * (1 + margin)))
+
+
+def lexical_prefilter(
+    candidates: list[ArxivPaper], queries: Sequence[str], top_m: int, margin: float = 0.25
+) -> list[ArxivPaper]:
+    """Keep the `top_m * (1 + margin)` best BM25 matches for any of `queries`, in input order.
+
+    With several queries (profiles) a paper is kept if it is in the top slice for at
+    least one of them.
+    """
+    keep_n = prefilter_size(top_m, margin, len(candidates))
+    if keep_n >= len(candidates):
+        return candidates
+    with tracer.span("lexical.prefilter", candidates=len(candidates), keep=keep_n):
+        texts = [f"{paper.title} {paper.summary}" for paper in candidates]
+        keep = np.zeros(len(candidates), dtype=bool)
+        for column in bm25_scores(texts, queries).T:
+            keep[np.argsort(-column, kind="stable")[:keep_n]] = True
+    tracer.count("lexical.dropped", int(len(candidates) - keep.sum()))
+    return [paper for paper, kept in zip(candidates, keep) if kept]
+
+
+def recall_report(
+    lexical: np.ndarray, embedding: np.ndarray, top_k: int, sizes: Sequence[int], margin: float = 0.25
+) -> dict[str, Any]:
+    """How much of the embedding top-`top_k` survives a lexical top-M (+margin) prefilter, per M."""
+    n = len(embedding)
+    k = min(top_k, n)
+    reference = np.argsort(-embedding, kind="stable")[:k]
+    # Rank of each candidate in the lexical order; a reference paper survives a
+    # prefilter of size keep_n iff its lexical rank is below keep_n.
+    lexical_rank = np.empty(n, dtype=np.int64)
+    lexical_rank[np.argsort(-lexical, kind="stable")] = np.arange(n)
+    reference_ranks = lexical_rank[reference]
+    rows = []
+    for top_m in sorted(set(sizes)):
+        keep_n = prefilter_size(top_m, margin, n)
+        rows.append(
+            {
+                "top_m": top_m,
+                "kept": keep_n,
+                "encode_fraction": round(keep_n / n, 4) if n else None,
+                "recall": round(float((reference_ranks < keep_n).mean()), 4) if k else None,
+                "recall_at_10": round(float((reference_ranks[:10] < keep_n).mean()), 4) if k else None,
+            }
+        )
+    return {
+        "candidates": n,
+        "top_k": k,
+        "margin": margin,
+        # Lexical rank needed to keep every reference paper: the smallest lossless prefilter.
+        "full_recall_kept": int(reference_ranks.max()) + 1 if k else 0,
+        "sizes": rows,
+    }
@@ -1,74 +1,203 @@
 from __future__ import annotations
 
-from datetime import datetime, timezone
-from functools import cached_property
-from typing import Optional
+import json
 import re
+import sys
+from datetime import datetime, timezone
+from typing import TYPE_CHECKING, Any, Optional
+
+if TYPE_CHECKING:
+    import arxiv
+
+_METADATA_FIELDS = (
+    "arxiv_id",
+    "url",
+    "title",
+    "summary",
+    "authors",
+    "primary_category",
+    "categories",
+    "published",
+    "updated",
+    "pdf_url",
+    "comment",
+    "journal_ref",
+    "doi",
+)
+_RERANK_FIELDS = (
+    "score",
+    "final_score",
+    "llm_rerank_relevant",
+    "llm_rerank_fit_score",
+    "llm_rerank_reasons",
+    "llm_rerank_action",
+    "llm_rerank_failed",
+    "llm_rerank_skipped",
+)
+
 
-import arxiv
+def _utc(value: Optional[datetime]) -> Optional[datetime]:
+    if value is None:
+        return None
+    if value.tzinfo is None:
+        return value.replace(tzinfo=timezone.utc)
+    return value
+
+
+def _parse_dt(value: Any) -> Optional[datetime]:
+    if not value:
+        return None
+    if isinstance(value, datetime):
+        return _utc(value)
+    return _utc(datetime.fromisoformat(value))
 
 
 class ArxivPaper:
-    def __init__(self, paper: arxiv.Result):
-        self._paper = paper
+    """Plain, picklable paper record with scoring fields.
+
+    Metadata is copied out of `arxiv.Result` once (`from_result`) or loaded from stored
+    data (`from_dict`); every attribute is a plain slot, so access costs nothing and
+    instances can be pickled, cached or sent to worker processes.
+    """
+
+    __slots__ = _METADATA_FIELDS + ("published_date",) + _RERANK_FIELDS
+
+    def __init__(
+        self,
+        arxiv_id: str,
+        url: str,
+        title: str,
+        summary: str,
+        authors: Optional[list[str]] = None,
+        categories: Optional[list[str]] = None,
+        published: Optional[datetime] = None,
+        pdf_url: Optional[str] = None,
+        primary_category: str = "",
+        updated: Optional[datetime] = None,
+        comment: str = "",
+        journal_ref: str = "",
+        doi: str = "",
+    ):
+        self.arxiv_id = arxiv_id
+        self.url = url
+        self.title = title
+        self.summary = summary
+        self.authors: list[str] = list(authors or [])
+        # Category names repeat across every paper; interning keeps one copy per process.
+        self.categories: list[str] = [sys.intern(c) for c in categories or []]
+        self.primary_category = sys.intern(primary_category)
+        self.published: Optional[datetime] = _utc(published)
+        self.updated: Optional[datetime] = _utc(updated)
+        self.published_date: Optional[str] = (
+            self.published.astimezone(timezone.utc).strftime("%Y-%m-%d") if self.published else None
+        )
+        self.pdf_url: Optional[str] = pdf_url or f"https://arxiv.org/pdf/{arxiv_id}.pdf"
+        self.comment = comment
+        self.journal_ref = journal_ref
+        self.doi = doi
         self.score: Optional[float] = None
         self.llm_rerank_relevant: Optional[bool] = None
         self.llm_rerank_fit_score: Optional[float] = None
         self.llm_rerank_reasons: Optional[list[str]] = None
         self.llm_rerank_action: Optional[str] = None
         self.llm_rerank_failed: bool = False
+        self.llm_rerank_skipped: bool = False
         self.final_score: Optional[float] = None
 
-    @property
-    def title(self) -> str:
-        return self._paper.title
-
-    @property
-    def summary(self) -> str:
-        return self._paper.summary
-
-    @property
-    def authors(self) -> list[str]:
-        return [str(a) for a in self._paper.authors]
-
-    @cached_property
-    def arxiv_id(self) -> str:
-        return re.sub(r"v\d+$", "", self._paper.get_short_id())
-
-    @property
-    def url(self) -> str:
-        return self._paper.entry_id
-
-    @property
-    def categories(self) -> list[str]:
-        return list(self._paper.categories or [])
-
-    @property
-    def published(self) -> Optional[datetime]:
-        published = getattr(self._paper, "published", None)
-        if published is None:
-            return None
-        if published.tzinfo is None:
-            return published.replace(tzinfo=timezone.utc)
-        return published
-
-    @property
-    def published_date(self) -> Optional[str]:
-        published = self.published
-        if published is None:
-            return None
-        return published.astimezone(timezone.utc).strftime("%Y-%m-%d")
-
-    @property
-    def pdf_url(self) -> Optional[str]:
-        pdf_url = getattr(self._paper, "pdf_url", None)
-        if pdf_url:
-            return pdf_url
-        if getattr(self._paper, "links", None):
-            for link in self._paper.links:
-                if "pdf" in link.href:
-                    self._paper.pdf_url = link.href
-                    return link.href
-        pdf_url = f"https://arxiv.org/pdf/{self.arxiv_id}.pdf"
-        self._paper.pdf_url = pdf_url
-        return pdf_url
+    def __repr__(self) -> str:
+        return f"ArxivPaper({self.arxiv_id!r}, {self.title!r})"
+
+    @classmethod
+    def from_result(cls, paper: arxiv.Result) -> "ArxivPaper":
+        pdf_url = getattr(paper, "pdf_url", None)
+        if not pdf_url:
+            pdf_url = next(
+                (link.href for link in getattr(paper, "links", None) or [] if "pdf" in link.href),
+                None,
+            )
+        return cls(
+            arxiv_id=re.sub(r"v\d+$", "", paper.get_short_id()),
+            url=paper.entry_id,
+            title=paper.title,
+            summary=paper.summary,
+            authors=[str(a) for a in paper.authors],
+            categories=list(paper.categories or []),
+            published=getattr(paper, "published", None),
+            pdf_url=pdf_url,
+            primary_category=getattr(paper, "primary_category", "") or "",
+            updated=getattr(paper, "updated", None),
+            comment=getattr(paper, "comment", "") or "",
+            journal_ref=getattr(paper, "journal_ref", "") or "",
+            doi=getattr(paper, "doi", "") or "",
+        )
+
+    def to_dict(self, include_rerank: bool = False) -> dict[str, Any]:
+        """JSON-safe dict; `from_dict` rebuilds an equal paper. Datetimes become ISO strings."""
+        data: dict[str, Any] = {
+            "arxiv_id": self.arxiv_id,
+            "entry_id": self.url,
+            "title": self.title,
+            "summary": self.summary,
+            "authors": list(self.authors),
+            "primary_category": self.primary_category,
+            "categories": list(self.categories),
+            "published": self.published.isoformat() if self.published else None,
+            "updated": self.updated.isoformat() if self.updated else None,
+            "pdf_url": self.pdf_url,
+            "comment": self.comment,
+            "journal_ref": self.journal_ref,
+            "doi": self.doi,
+        }
+        if include_rerank:
+            data.update((name, getattr(self, name)) for name in _RERANK_FIELDS)
+        return data
+
+    @classmethod
+    def from_dict(cls, data: dict[str, Any]) -> "ArxivPaper":
+        entry_id = data.get("entry_id") or data.get("url", "")
+        pdf_url = data.get("pdf_url") or next(
+            (link["href"] for link in data.get("links", []) if "pdf" in link.get("href", "")),
+            None,
+        )
+        arxiv_id = data.get("arxiv_id") or re.sub(r"v\d+$", "", entry_id.rsplit("/", 1)[-1])
+        paper = cls(
+            arxiv_id=arxiv_id,
+            url=entry_id,
+            title=data.get("title", ""),
+            summary=data.get("summary", ""),
+            authors=data.get("authors"),
+            categories=data.get("categories"),
+            published=_parse_dt(data.get("published")),
+            pdf_url=pdf_url,
+            primary_category=data.get("primary_category", ""),
+            updated=_parse_dt(data.get("updated")),
+            comment=data.get("comment", ""),
+            journal_ref=data.get("journal_ref", ""),
+            doi=data.get("doi", ""),
+        )
+        for name in _RERANK_FIELDS:
+            if name in data:
+                setattr(paper, name, data[name])
+        return paper
+
+    def to_json(self, include_rerank: bool = False) -> str:
+        return json.dumps(self.to_dict(include_rerank), ensure_ascii=False)
+
+    @classmethod
+    def from_json(cls, text: str | bytes) -> "ArxivPaper":
+        return cls.from_dict(json.loads(text))
+
+    def to_msgpack(self, include_rerank: bool = False) -> bytes:
+        return _msgpack().packb(self.to_dict(include_rerank), use_bin_type=True)
+
+    @classmethod
+    def from_msgpack(cls, payload: bytes) -> "ArxivPaper":
+        return cls.from_dict(_msgpack().unpackb(payload, raw=False))
+
+
+def _msgpack():
+    try:
+        import msgpack
+    except ImportError as exc:
+        raise ImportError("msgpack serialization requires `pip install msgpack`.") from exc
+    return msgpack
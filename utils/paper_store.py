@@ -0,0 +1,141 @@
+from __future__ import annotations
+
+import json
+import os
+import re
+import sqlite3
+import threading
+import time
+from typing import Iterable
+
+from utils.paper import ArxivPaper
+
+
+def normalize_arxiv_id(paper_id: str) -> str:
+    return re.sub(r"v\d+$", "", paper_id.strip().removeprefix("oai:arXiv.org:"))
+
+
+def arxiv_id_version(paper_id: str) -> int | None:
+    """The `vN` suffix of an id or entry URL, None when it has none."""
+    match = re.search(r"v(\d+)$", paper_id.strip())
+    return int(match.group(1)) if match else None
+
+
+class PaperStore:
+    """SQLite store of arXiv metadata plus per-category daily announcement lists.
+
+    `papers` holds one row per arXiv id (latest version seen) with enough fields to
+    rebuild an `ArxivPaper`. `listings` records the ids a category's RSS feed announced
+    on a given announcement day (US Eastern, arXiv's calendar), so multi-category
+    queries reuse single-category pulls and a same-day re-run needs no network access.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+        if path != ":memory:":
+            os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.executescript(
+            """
+            CREATE TABLE IF NOT EXISTS papers (
+                arxiv_id TEXT PRIMARY KEY,
+                version INTEGER NOT NULL,
+                published TEXT,
+                data TEXT NOT NULL,
+                fetched_at REAL NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS papers_published ON papers (published);
+            CREATE TABLE IF NOT EXISTS listings (
+                category TEXT NOT NULL,
+                day TEXT NOT NULL,
+                ids TEXT NOT NULL,
+                fetched_at REAL NOT NULL,
+                PRIMARY KEY (category, day)
+            );
+            """
+        )
+        self._conn.commit()
+
+    def get_listing(self, category: str, day: str) -> list[str] | None:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT ids FROM listings WHERE category=? AND day=?", (category, day)
+            ).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def put_listing(self, category: str, day: str, ids: list[str]) -> None:
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO listings VALUES (?, ?, ?, ?)",
+                (category, day, json.dumps(ids), time.time()),
+            )
+            self._conn.commit()
+
+    def missing(self, ids: Iterable[str]) -> list[str]:
+        """Ids (version stripped) not stored yet, or stored at an older version than the id names."""
+        wanted: dict[str, int] = {}
+        for paper_id in ids:
+            key = normalize_arxiv_id(paper_id)
+            wanted[key] = max(wanted.get(key, 0), arxiv_id_version(paper_id) or 0)
+        keys = list(wanted)
+        stored: dict[str, int] = {}
+        with self._lock:
+            for start in range(0, len(keys), 500):
+                chunk = keys[start : start + 500]
+                marks = ",".join("?" * len(chunk))
+                stored.update(
+                    self._conn.execute(
+                        f"SELECT arxiv_id, version FROM papers WHERE arxiv_id IN ({marks})", chunk
+                    ).fetchall()
+                )
+        return [i for i in keys if stored.get(i, -1) < wanted[i]]
+
+    def get_many(self, ids: Iterable[str]) -> list[ArxivPaper]:
+        """Papers for `ids` in the given order; unknown ids are skipped."""
+        ids = list(dict.fromkeys(normalize_arxiv_id(i) for i in ids))
+        rows: dict[str, str] = {}
+        with self._lock:
+            for start in range(0, len(ids), 500):
+                chunk = ids[start : start + 500]
+                marks = ",".join("?" * len(chunk))
+                rows.update(
+                    self._conn.execute(
+                        f"SELECT arxiv_id, data FROM papers WHERE arxiv_id IN ({marks})", chunk
+                    ).fetchall()
+                )
+        return [ArxivPaper.from_dict(json.loads(rows[i])) for i in ids if i in rows]
+
+    def put_many(self, papers: Iterable[ArxivPaper]) -> int:
+        now = time.time()
+        records = []
+        for paper in papers:
+            data = paper.to_dict()
+            version = arxiv_id_version(data["entry_id"]) or 1
+            records.append(
+                (paper.arxiv_id, version, data["published"], json.dumps(data, ensure_ascii=False), now)
+            )
+        with self._lock:
+            # Keep the newest version when the same id is stored twice.
+            self._conn.executemany(
+                """
+                INSERT INTO papers VALUES (?, ?, ?, ?, ?)
+                ON CONFLICT(arxiv_id) DO UPDATE SET
+                    version=excluded.version, published=excluded.published,
+                    data=excluded.data, fetched_at=excluded.fetched_at
+                WHERE excluded.version >= papers.version
+                """,
+                records,
+            )
+            self._conn.commit()
+        return len(records)
+
+    def __len__(self) -> int:
+        with self._lock:
+            (count,) = self._conn.execute("SELECT COUNT(*) FROM papers").fetchone()
+        return count
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
@@ -0,0 +1,129 @@
+from __future__ import annotations
+
+import heapq
+import logging
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Callable, Iterable
+
+from utils.paper import ArxivPaper
+
+
+def paper_record(paper: ArxivPaper, rank: int | None = None) -> dict[str, Any]:
+    """JSON-ready view of a paper and its scores, as emitted in NDJSON output."""
+    return {
+        "rank": rank,
+        "arxiv_id": paper.arxiv_id,
+        "title": paper.title,
+        "authors": paper.authors,
+        "summary": paper.summary,
+        "url": paper.url,
+        "pdf_url": paper.pdf_url,
+        "published": paper.published_date,
+        "categories": paper.categories,
+        "score": paper.score,
+        "final_score": paper.final_score,
+        "llm_rerank_relevant": paper.llm_rerank_relevant,
+        "llm_rerank_fit_score": paper.llm_rerank_fit_score,
+        "llm_rerank_reasons": paper.llm_rerank_reasons,
+        "llm_rerank_action": paper.llm_rerank_action,
+        "llm_rerank_failed": paper.llm_rerank_failed,
+        "llm_rerank_skipped": paper.llm_rerank_skipped,
+    }
+
+
+class StreamingRanker:
+    """Embed candidate batches as they arrive and start LLM rerank on stable leaders.
+
+    After every batch the provisional top-`top_k` is recomputed. A paper that has stayed
+    in it for `stable_batches` consecutive batches is sent to `llm_rerank` right away, in
+    the background, instead of waiting for the fetch to finish. Papers that later fall
+    out of the top-k keep their verdict but are simply not part of the final ranking.
+
+    Events passed to `emit`:
+    - `{"event": "embedded", "batch": n, "papers": m, "total": t}` after each batch.
+    - `{"event": "verdict", "elapsed": s, "paper": {...}}` as each LLM verdict lands.
+    """
+
+    def __init__(
+        self,
+        score_fn: Callable[[list[ArxivPaper]], Iterable[float]],
+        top_k: int,
+        emit: Callable[[dict[str, Any]], None],
+        llm_rerank: Callable[[list[ArxivPaper]], None] | None = None,
+        stable_batches: int = 2,
+        llm_workers: int = 2,
+    ):
+        self.score_fn = score_fn
+        self.top_k = max(0, top_k)
+        self.emit = emit
+        self.llm_rerank = llm_rerank
+        self.stable_batches = max(1, stable_batches)
+        self.papers: list[ArxivPaper] = []
+        self._streak: dict[str, int] = {}
+        self._dispatched: set[str] = set()
+        self._futures: list[Future] = []
+        self._emit_lock = threading.Lock()
+        self._started = time.perf_counter()
+        self._pool = ThreadPoolExecutor(max_workers=llm_workers) if llm_rerank else None
+
+    def _emit(self, event: dict[str, Any]) -> None:
+        with self._emit_lock:
+            self.emit(event)
+
+    def _provisional_top(self) -> list[ArxivPaper]:
+        return heapq.nlargest(self.top_k, self.papers, key=lambda p: p.score or 0.0)
+
+    def _dispatch(self, papers: list[ArxivPaper]) -> None:
+        papers = [p for p in papers if p.arxiv_id not in self._dispatched]
+        if not papers or self._pool is None:
+            return
+        self._dispatched.update(p.arxiv_id for p in papers)
+
+        def _run() -> None:
+            try:
+                self.llm_rerank(papers)
+            except Exception as exc:
+                logging.warning("Streaming LLM rerank chunk failed: %s", exc)
+                return
+            for paper in papers:
+                self._emit(
+                    {
+                        "event": "verdict",
+                        "elapsed": time.perf_counter() - self._started,
+                        "paper": paper_record(paper),
+                    }
+                )
+
+        self._futures.append(self._pool.submit(_run))
+
+    def add_batch(self, batch: list[ArxivPaper]) -> None:
+        if not batch:
+            return
+        for paper, score in zip(batch, self.score_fn(batch)):
+            paper.score = float(score)
+        self.papers.extend(batch)
+        self._emit(
+            {
+                "event": "embedded",
+                "batch": len(batch),
+                "total": len(self.papers),
+                "elapsed": time.perf_counter() - self._started,
+            }
+        )
+        if self._pool is None:
+            return
+        top = self._provisional_top()
+        top_ids = {p.arxiv_id for p in top}
+        self._streak = {i: self._streak.get(i, 0) + 1 for i in top_ids}
+        self._dispatch([p for p in top if self._streak[p.arxiv_id] >= self.stable_batches])
+
+    def finish(self) -> list[ArxivPaper]:
+        """Judge any final top-k papers not yet dispatched, wait, and return all papers ranked."""
+        self._dispatch(self._provisional_top())
+        for future in self._futures:
+            future.result()
+        if self._pool is not None:
+            self._pool.shutdown()
+        return sorted(self.papers, key=lambda p: p.score or 0.0, reverse=True)
@@ -1,32 +1,309 @@
+import copy
+import logging
+import os
+import re
+import time
 import numpy as np
 from datetime import datetime
+from typing import Any
 
-import torch
-from sentence_transformers import SentenceTransformer
-
+from utils import lexical
+from utils.ann_index import IVFIndex, knn_decay_scores, l2_normalize, time_decay_weights
+from utils.embedding_store import EmbeddingStore, text_key
+from utils.encoder import (
+    DEFAULT_EMBEDDING_MODEL,
+    DEFAULT_ENGINE,
+    EncodeOptions,
+    cache_model_key,
+    encode_texts,
+    get_encoder,
+)
 from utils.paper import ArxivPaper
+from utils.tracing import tracer
 
 
-def rerank_paper(
-    candidate: list[ArxivPaper],
-    corpus: list[dict],
-    model: str = "avsolatorio/GIST-small-Embedding-v0",
-) -> list[ArxivPaper]:
-    encoder = SentenceTransformer(
-        model, device="cuda" if torch.cuda.is_available() else "cpu"
-    )
-    corpus = sorted(
+def _sort_corpus(corpus: list[dict]) -> list[dict]:
+    return sorted(
         corpus,
         key=lambda x: datetime.strptime(x["data"]["dateAdded"], "%Y-%m-%dT%H:%M:%SZ"),
         reverse=True,
     )
-    time_decay_weight = 1 / (1 + np.log10(np.arange(len(corpus)) + 1))
-    time_decay_weight = time_decay_weight / time_decay_weight.sum()
-    corpus_feature = encoder.encode([paper["data"]["abstractNote"] for paper in corpus])
-    candidate_feature = encoder.encode([paper.summary for paper in candidate])
-    sim = encoder.similarity(candidate_feature, corpus_feature)
-    scores = (sim * time_decay_weight).sum(axis=1) * 10
+
+
+class ProfileScorer:
+    """Embedding scorer for a fixed set of named corpora (one per profile).
+
+    Corpus embeddings and profile vectors are computed once at construction; `score`
+    can then be called on any number of candidate batches. Call `close` to persist the
+    embedding cache.
+    """
+
+    def __init__(
+        self,
+        corpora: dict[str, list[dict]],
+        model: str = DEFAULT_EMBEDDING_MODEL,
+        cache_dir: str | None = None,
+        corpus_top_k: int | None = None,
+        engine: str = DEFAULT_ENGINE,
+        encode_options: EncodeOptions | None = None,
+    ):
+        self.model = model
+        self.engine = engine
+        self.encode_options = encode_options or EncodeOptions()
+        self.corpus_top_k = corpus_top_k
+        self.store = (
+            EmbeddingStore(cache_dir, cache_model_key(model, engine), max_entries=200_000, max_age_days=180)
+            if cache_dir
+            else None
+        )
+        self.names = list(corpora)
+        profiles: list[np.ndarray] = []
+        self._indexes: dict[str, tuple[IVFIndex, np.ndarray]] = {}
+        for name in self.names:
+            corpus = _sort_corpus(corpora[name])
+            time_decay_weight = time_decay_weights(len(corpus))
+            texts = [paper["data"]["abstractNote"] for paper in corpus]
+            if corpus_top_k and len(corpus) > corpus_top_k:
+                # Large corpora: score each candidate against its top-k neighbours only.
+                index, id_weights = self._corpus_index(name, texts, time_decay_weight)
+                self._indexes[name] = (index, id_weights)
+                profiles.append(np.zeros(index.dim, dtype=np.float32))
+            else:
+                # sum_j(cos(c, e_j) * w_j) == c_hat . sum_j(w_j * e_hat_j): one weighted profile
+                # vector replaces the full candidate x corpus similarity matrix.
+                corpus_feature = l2_normalize(self.embed(texts))
+                profiles.append(corpus_feature.T @ time_decay_weight)
+        self.profiles = np.stack(profiles, axis=1)
+
+    def _encode(self, texts: list[str]) -> np.ndarray:
+        # The encoder is resolved on first miss, so a fully cached run never imports torch.
+        # Large inputs with `workers > 1` go to the worker pool, which loads its own encoders.
+        options = self.encode_options
+        pooled = options.workers > 1 and len(texts) >= options.min_pool_texts
+        encoder = None if pooled else get_encoder(self.model, engine=self.engine)
+        return encode_texts(texts, self.model, self.engine, options, encoder=encoder)
+
+    def _corpus_index(
+        self, name: str, texts: list[str], time_decay_weight: np.ndarray
+    ) -> tuple[IVFIndex, np.ndarray]:
+        """IVF index over the distinct `texts` and the time-decay weight of each index id.
+
+        With a cache dir the index is saved next to the embedding store and reused by
+        later runs: texts it lacks are encoded and `add`ed. It is rebuilt when it holds
+        a text no longer in the corpus.
+        """
+        keys = [text_key(text) for text in texts]
+        path = None
+        index, index_keys = None, []
+        if self.store is not None:
+            path = os.path.join(self.store.directory, f"ivf-{re.sub(r'[^A-Za-z0-9._-]+', '_', name)}.npz")
+            if os.path.exists(path):
+                index, extra = IVFIndex.load(path)
+                index_keys = extra["keys"].tolist()
+                if not set(index_keys) <= set(keys):
+                    index, index_keys = None, []
+        ids = {key: i for i, key in enumerate(index_keys)}
+        reused = len(ids)
+        new_rows = []
+        for row, key in enumerate(keys):
+            if key not in ids:
+                ids[key] = len(index_keys)
+                index_keys.append(key)
+                new_rows.append(row)
+        if new_rows:
+            vectors = l2_normalize(self.embed([texts[row] for row in new_rows]))
+            index = index or IVFIndex(vectors.shape[1])
+            index.add(vectors)
+            if path is not None:
+                index.save(path, keys=np.array(index_keys))
+        logging.info("IVF index for %s: %s vectors reused, %s added", name, reused, len(new_rows))
+        # Duplicate texts share one id, so their weights add up.
+        id_weights = np.zeros(len(index_keys), dtype=np.float64)
+        np.add.at(id_weights, [ids[key] for key in keys], time_decay_weight)
+        return index, id_weights
+
+    def embed(self, texts: list[str]) -> np.ndarray:
+        with tracer.span("encode", texts=len(texts)):
+            return self.store.encode(texts, self._encode) if self.store is not None else self._encode(texts)
+
+    def score(self, candidate: list[ArxivPaper]) -> dict[str, np.ndarray]:
+        if not candidate:
+            return {name: np.zeros(0, dtype=np.float32) for name in self.names}
+        candidate_feature = l2_normalize(self.embed([paper.summary for paper in candidate]))
+        with tracer.span("similarity", candidates=len(candidate), profiles=len(self.names)):
+            scores = (candidate_feature @ self.profiles) * 10
+            result = {}
+            for i, name in enumerate(self.names):
+                if name in self._indexes:
+                    index, time_decay_weight = self._indexes[name]
+                    sims, ids = index.search(candidate_feature, self.corpus_top_k)
+                    result[name] = knn_decay_scores(sims, ids, time_decay_weight)
+                else:
+                    result[name] = scores[:, i]
+        return result
+
+    def close(self) -> None:
+        if self.store is not None:
+            self.store.flush()
+            stats = self.store.stats()
+            tracer.count("embedding_cache.hits", stats["hits"])
+            tracer.count("embedding_cache.misses", stats["misses"])
+            logging.info("Embedding cache: %s", stats)
+
+
+def score_profiles(
+    candidate: list[ArxivPaper],
+    corpora: dict[str, list[dict]],
+    model: str = DEFAULT_EMBEDDING_MODEL,
+    cache_dir: str | None = None,
+    corpus_top_k: int | None = None,
+    engine: str = DEFAULT_ENGINE,
+    encode_options: EncodeOptions | None = None,
+) -> dict[str, np.ndarray]:
+    """Embedding scores of every candidate against every named corpus (one per profile).
+
+    Candidates are encoded once. Each corpus is reduced to a single time-decayed profile
+    vector, so all profiles are scored with one `(candidates x profiles)` product.
+    """
+    scorer = ProfileScorer(
+        corpora,
+        model=model,
+        cache_dir=cache_dir,
+        corpus_top_k=corpus_top_k,
+        engine=engine,
+        encode_options=encode_options,
+    )
+    try:
+        return scorer.score(candidate)
+    finally:
+        scorer.close()
+
+
+def rank_by_scores(
+    candidate: list[ArxivPaper], scores: np.ndarray, copy_papers: bool = False
+) -> list[ArxivPaper]:
+    """Write `paper.score` and sort desc; `copy_papers` keeps per-profile state separate."""
+    if copy_papers:
+        candidate = [copy.copy(paper) for paper in candidate]
     for score, paper in zip(scores, candidate):
         paper.score = float(score)
-    candidate = sorted(candidate, key=lambda x: x.score or 0.0, reverse=True)
-    return candidate
+    return sorted(candidate, key=lambda x: x.score or 0.0, reverse=True)
+
+
+def rerank_paper(
+    candidate: list[ArxivPaper],
+    corpus: list[dict],
+    model: str = DEFAULT_EMBEDDING_MODEL,
+    cache_dir: str | None = None,
+    corpus_top_k: int | None = None,
+    engine: str = DEFAULT_ENGINE,
+    encode_options: EncodeOptions | None = None,
+) -> list[ArxivPaper]:
+    scores = score_profiles(
+        candidate,
+        {"overview": corpus},
+        model=model,
+        cache_dir=cache_dir,
+        corpus_top_k=corpus_top_k,
+        engine=engine,
+        encode_options=encode_options,
+    )["overview"]
+    return rank_by_scores(candidate, scores)
+
+
+def _rss_mb() -> float | None:
+    try:
+        with open(f"/proc/{os.getpid()}/status", "r", encoding="utf-8") as f:
+            for line in f:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        return None
+    return None
+
+
+def _ranks(values: np.ndarray) -> np.ndarray:
+    ranks = np.empty(len(values), dtype=np.float64)
+    ranks[np.argsort(values)] = np.arange(len(values))
+    return ranks
+
+
+def verify_engine(
+    candidate: list[ArxivPaper],
+    corpus: list[dict],
+    engine: str,
+    model: str = DEFAULT_EMBEDDING_MODEL,
+    top_k: int = 20,
+) -> dict[str, Any]:
+    """Compare `engine` with the default fp32 engine on the same candidates and corpus.
+
+    Reports per-engine load time, RSS growth while loading and abstracts/s, the cosine
+    drift between paired embeddings, and how the rerank scores differ (top-k overlap,
+    Spearman rank correlation, max absolute score difference). Nothing is cached.
+    """
+    texts = [paper.summary for paper in candidate]
+    report: dict[str, Any] = {"model": model, "engine": engine, "papers": len(texts), "top_k": top_k}
+    vectors: dict[str, np.ndarray] = {}
+    scores: dict[str, np.ndarray] = {}
+    for name in dict.fromkeys((DEFAULT_ENGINE, engine)):
+        rss_before = _rss_mb()
+        start = time.perf_counter()
+        encoder = get_encoder(model, engine=name)
+        loaded = time.perf_counter()
+        rss_after = _rss_mb()
+        vectors[name] = l2_normalize(np.asarray(encoder.encode(texts), dtype=np.float32))
+        encoded = time.perf_counter()
+        report[name] = {
+            "load_s": round(loaded - start, 3),
+            "rss_delta_mb": round(rss_after - rss_before, 1) if rss_before is not None else None,
+            "abstracts_per_s": round(len(texts) / max(encoded - loaded, 1e-9), 1),
+        }
+        scores[name] = ProfileScorer({"overview": corpus}, model=model, engine=name).score(candidate)["overview"]
+
+    reference, other = vectors[DEFAULT_ENGINE], vectors[engine]
+    drift = 1.0 - np.sum(reference * other, axis=1)
+    k = min(top_k, len(texts))
+    ref_top = set(np.argsort(-scores[DEFAULT_ENGINE])[:k].tolist())
+    eng_top = set(np.argsort(-scores[engine])[:k].tolist())
+    ref_ranks, eng_ranks = _ranks(scores[DEFAULT_ENGINE]), _ranks(scores[engine])
+    report["cosine_drift"] = {"mean": float(drift.mean()), "max": float(drift.max())} if len(texts) else {}
+    report["top_k_overlap"] = len(ref_top & eng_top) / k if k else None
+    report["spearman"] = float(np.corrcoef(ref_ranks, eng_ranks)[0, 1]) if len(texts) > 1 else None
+    report["max_score_diff"] = (
+        float(np.abs(scores[DEFAULT_ENGINE] - scores[engine]).max()) if len(texts) else None
+    )
+    return report
+
+
+def verify_prefilter(
+    candidate: list[ArxivPaper],
+    corpus: list[dict],
+    overview_text: str,
+    engine: str = DEFAULT_ENGINE,
+    model: str = DEFAULT_EMBEDDING_MODEL,
+    top_k: int = 20,
+    margin: float = 0.25,
+    sizes: list[int] | None = None,
+    encode_options: EncodeOptions | None = None,
+) -> dict[str, Any]:
+    """Recall of the BM25 prefilter against the full embedding ranking, for a range of M.
+
+    Every candidate is encoded (uncached) to get the reference top-`top_k`; the report
+    gives, per M, the fraction of papers that would still be encoded, the recall of the
+    reference top-k, and the estimated encode time at that M.
+    """
+    texts = [f"{paper.title} {paper.summary}" for paper in candidate]
+    start = time.perf_counter()
+    lexical_scores = lexical.bm25_scores(texts, [overview_text])[:, 0]
+    lexical_s = time.perf_counter() - start
+    scorer = ProfileScorer({"overview": corpus}, model=model, engine=engine, encode_options=encode_options)
+    start = time.perf_counter()
+    embedding_scores = scorer.score(candidate)["overview"]
+    embed_s = time.perf_counter() - start
+    if sizes is None:
+        sizes = [top_k * factor for factor in (1, 2, 3, 5, 10, 20, 50) if top_k * factor < len(candidate)]
+    report = lexical.recall_report(lexical_scores, embedding_scores, top_k, sizes, margin)
+    report.update({"engine": engine, "lexical_s": round(lexical_s, 4), "embed_s": round(embed_s, 3)})
+    for row in report["sizes"]:
+        row["est_embed_s"] = round(embed_s * row["encode_fraction"] + lexical_s, 3)
+    return report
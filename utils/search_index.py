@@ -0,0 +1,279 @@
+from __future__ import annotations
+
+import os
+import re
+import sqlite3
+import threading
+import time
+from typing import Any, Iterable
+
+from utils.paper import ArxivPaper
+from utils.tracing import tracer
+
+# bm25 column weights: title, abstract, authors, categories, reasons.
+_RANK = "bm25(10.0, 1.0, 3.0, 2.0, 2.0)"
+_COLUMNS = ("title", "abstract", "authors", "categories", "reasons")
+_TERM = re.compile(r'(?:(%s):)?("[^"]*"|[^\s"]+)' % "|".join(_COLUMNS))
+SNIPPET_START, SNIPPET_END = "\x02", "\x03"
+
+
+def fts_query(text: str) -> str:
+    """User search text as an FTS5 query: every term must match (implicit AND).
+
+    Terms are quoted, so FTS5 operators in user input are plain words. `"a b"` is a
+    phrase, a trailing `*` is a prefix match, and `title:`, `abstract:`, `authors:`,
+    `categories:` or `reasons:` restrict a term to one column.
+    """
+    parts = []
+    for column, term in _TERM.findall(text):
+        prefix = term.endswith("*") and not term.startswith('"')
+        term = term.strip('"').rstrip("*")
+        if not re.search(r"\w", term):
+            continue
+        phrase = '"' + term.replace('"', '""') + '"' + ("*" if prefix else "")
+        parts.append(f"{column} : {phrase}" if column else phrase)
+    return " ".join(parts)
+
+
+class SearchIndex:
+    """SQLite FTS5 index over fetched and recommended papers.
+
+    `docs` holds one row per arXiv id and is the external content of `docs_fts` (every
+    paper) and `rec_fts` (recommended papers only), kept in sync by triggers, so text
+    is stored once. `recommendations` keeps one row per paper and profile; `docs`
+    carries their reasons joined, the best fit score, the latest day and the profile
+    names. Re-adding an unchanged
+    paper is a no-op, which makes per-run indexing proportional to what actually changed.
+    Ranking is bm25 with title matches weighted highest.
+    """
+
+    def __init__(self, path: str, max_ranked: int = 20_000):
+        self.path = path
+        self.max_ranked = max_ranked
+        self._lock = threading.Lock()
+        if path != ":memory:":
+            os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        exists = self._conn.execute("SELECT 1 FROM sqlite_master WHERE name='docs_fts'").fetchone()
+        columns = ", ".join(_COLUMNS)
+        old = ", ".join(f"old.{c}" for c in _COLUMNS)
+        new = ", ".join(f"new.{c}" for c in _COLUMNS)
+        fts = (
+            f"fts5({columns}, content='docs', content_rowid='id', "
+            "tokenize='porter unicode61 remove_diacritics 2')"
+        )
+        self._conn.executescript(
+            f"""
+            CREATE TABLE IF NOT EXISTS docs (
+                id INTEGER PRIMARY KEY,
+                arxiv_id TEXT NOT NULL UNIQUE,
+                title TEXT NOT NULL,
+                abstract TEXT NOT NULL,
+                authors TEXT NOT NULL,
+                categories TEXT NOT NULL,
+                reasons TEXT NOT NULL DEFAULT '',
+                url TEXT,
+                published TEXT,
+                recommended TEXT,
+                fit_score REAL,
+                profiles TEXT NOT NULL DEFAULT '',
+                indexed_at REAL NOT NULL
+            );
+            CREATE TABLE IF NOT EXISTS recommendations (
+                arxiv_id TEXT NOT NULL,
+                profile TEXT NOT NULL,
+                day TEXT NOT NULL,
+                reasons TEXT NOT NULL,
+                fit_score REAL,
+                PRIMARY KEY (arxiv_id, profile)
+            );
+            CREATE VIRTUAL TABLE IF NOT EXISTS docs_fts USING {fts};
+            CREATE VIRTUAL TABLE IF NOT EXISTS rec_fts USING {fts};
+            CREATE TRIGGER IF NOT EXISTS docs_ai AFTER INSERT ON docs BEGIN
+                INSERT INTO docs_fts(rowid, {columns}) VALUES (new.id, {new});
+                INSERT INTO rec_fts(rowid, {columns}) SELECT new.id, {new} WHERE new.recommended IS NOT NULL;
+            END;
+            CREATE TRIGGER IF NOT EXISTS docs_ad AFTER DELETE ON docs BEGIN
+                INSERT INTO docs_fts(docs_fts, rowid, {columns}) VALUES ('delete', old.id, {old});
+                INSERT INTO rec_fts(rec_fts, rowid, {columns})
+                SELECT 'delete', old.id, {old} WHERE old.recommended IS NOT NULL;
+            END;
+            CREATE TRIGGER IF NOT EXISTS docs_au AFTER UPDATE OF {columns} ON docs BEGIN
+                INSERT INTO docs_fts(docs_fts, rowid, {columns}) VALUES ('delete', old.id, {old});
+                INSERT INTO docs_fts(rowid, {columns}) VALUES (new.id, {new});
+            END;
+            CREATE TRIGGER IF NOT EXISTS docs_au_rec AFTER UPDATE OF {columns}, recommended ON docs BEGIN
+                INSERT INTO rec_fts(rec_fts, rowid, {columns})
+                SELECT 'delete', old.id, {old} WHERE old.recommended IS NOT NULL;
+                INSERT INTO rec_fts(rowid, {columns}) SELECT new.id, {new} WHERE new.recommended IS NOT NULL;
+            END;
+            """
+        )
+        if "profiles" not in {row[1] for row in self._conn.execute("PRAGMA table_info(docs)")}:
+            self._conn.execute("ALTER TABLE docs ADD COLUMN profiles TEXT NOT NULL DEFAULT ''")
+        if not exists:
+            # A persistent rank function lets FTS5 serve `ORDER BY rank LIMIT n` without
+            # scoring and sorting every match in SQL.
+            for table in ("docs_fts", "rec_fts"):
+                self._conn.execute(f"INSERT INTO {table}({table}, rank) VALUES ('rank', '{_RANK}')")
+        self._conn.commit()
+
+    def add_papers(self, papers: Iterable[ArxivPaper]) -> int:
+        """Index fetched papers (new or changed metadata); returns the number of rows written."""
+        now = time.time()
+        rows = [
+            (
+                paper.arxiv_id,
+                paper.title or "",
+                paper.summary or "",
+                ", ".join(paper.authors or []),
+                " ".join(paper.categories or []),
+                paper.url,
+                paper.published_date,
+                now,
+            )
+            for paper in papers
+        ]
+        with self._lock, tracer.span("search_index.add", papers=len(rows)):
+            cur = self._conn.executemany(
+                """
+                INSERT INTO docs (arxiv_id, title, abstract, authors, categories, url, published, indexed_at)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+                ON CONFLICT(arxiv_id) DO UPDATE SET
+                    title=excluded.title, abstract=excluded.abstract, authors=excluded.authors,
+                    categories=excluded.categories, url=excluded.url, published=excluded.published,
+                    indexed_at=excluded.indexed_at
+                WHERE docs.title IS NOT excluded.title OR docs.abstract IS NOT excluded.abstract
+                    OR docs.authors IS NOT excluded.authors OR docs.categories IS NOT excluded.categories
+                """,
+                rows,
+            )
+            self._conn.commit()
+            written = max(cur.rowcount, 0)
+        tracer.count("search_index.writes", written)
+        return written
+
+    def add_recommendations(self, papers: Iterable[ArxivPaper], day: str, profile: str = "") -> None:
+        """Index papers recommended to `profile` on `day` with their LLM reasons and fit score.
+
+        Each profile keeps its own row, so recommending a paper to another profile
+        adds to, rather than replaces, what earlier profiles recorded.
+        """
+        papers = list(papers)
+        self.add_papers(papers)
+        rows = [
+            (
+                paper.arxiv_id,
+                profile,
+                day,
+                "\n".join(paper.llm_rerank_reasons or []),
+                paper.llm_rerank_fit_score,
+            )
+            for paper in papers
+        ]
+        with self._lock:
+            self._conn.executemany(
+                """
+                INSERT INTO recommendations (arxiv_id, profile, day, reasons, fit_score) VALUES (?, ?, ?, ?, ?)
+                ON CONFLICT(arxiv_id, profile) DO UPDATE SET
+                    day=excluded.day, reasons=excluded.reasons, fit_score=excluded.fit_score
+                WHERE day IS NOT excluded.day OR reasons IS NOT excluded.reasons
+                    OR fit_score IS NOT excluded.fit_score
+                """,
+                rows,
+            )
+            self._conn.execute("CREATE TEMP TABLE IF NOT EXISTS touched (arxiv_id TEXT PRIMARY KEY)")
+            self._conn.execute("DELETE FROM touched")
+            self._conn.executemany("INSERT OR IGNORE INTO touched VALUES (?)", [(row[0],) for row in rows])
+            # Only rows whose rollup changed are rewritten, so the FTS triggers fire only for them.
+            self._conn.execute(
+                """
+                WITH agg AS (
+                    SELECT arxiv_id,
+                           group_concat(NULLIF(reasons, ''), char(10)) AS reasons,
+                           max(fit_score) AS fit_score,
+                           max(day) AS day,
+                           COALESCE(group_concat(NULLIF(profile, ''), ' '), '') AS profiles
+                    FROM (
+                        SELECT * FROM recommendations WHERE arxiv_id IN (SELECT arxiv_id FROM touched)
+                        ORDER BY arxiv_id, profile
+                    )
+                    GROUP BY arxiv_id
+                )
+                UPDATE docs SET reasons=COALESCE(agg.reasons, ''), fit_score=agg.fit_score,
+                    recommended=agg.day, profiles=agg.profiles
+                FROM agg
+                WHERE docs.arxiv_id = agg.arxiv_id
+                    AND (docs.reasons IS NOT COALESCE(agg.reasons, '') OR docs.fit_score IS NOT agg.fit_score
+                        OR docs.recommended IS NOT agg.day OR docs.profiles IS NOT agg.profiles)
+                """
+            )
+            self._conn.commit()
+
+    def search(
+        self, query: str, offset: int = 0, limit: int = 20, recommended_only: bool = False
+    ) -> dict[str, Any]:
+        """Paginated matches: `{"query", "total", "offset", "limit", "order", "results": [...]}`.
+
+        Results are ordered by bm25 (`order="rank"`), or newest indexed first when more
+        than `max_ranked` papers match (`order="recent"`). Each result carries a `snippet`
+        with matches wrapped in `SNIPPET_START` / `SNIPPET_END`.
+        """
+        match = fts_query(query)
+        payload: dict[str, Any] = {"query": query, "total": 0, "offset": offset, "limit": limit, "results": []}
+        if not match:
+            return payload
+        table = "rec_fts" if recommended_only else "docs_fts"
+        with self._lock, tracer.span("search_index.query"):
+            (payload["total"],) = self._conn.execute(
+                f"SELECT COUNT(*) FROM {table} WHERE {table} MATCH ?", (match,)
+            ).fetchone()
+            # Counting walks the doclists only; ranking scores every match, so very broad
+            # queries are served newest first instead.
+            ranked = payload["total"] <= self.max_ranked
+            payload["order"] = "rank" if ranked else "recent"
+            rows = self._conn.execute(
+                f"""
+                SELECT d.arxiv_id, d.title, d.url, d.published, d.categories, d.recommended, d.fit_score, d.profiles,
+                       snippet({table}, -1, '{SNIPPET_START}', '{SNIPPET_END}', '...', 32), rank
+                FROM {table} JOIN docs d ON d.id = {table}.rowid
+                WHERE {table} MATCH ?
+                ORDER BY {"rank" if ranked else f"{table}.rowid DESC"}
+                LIMIT ? OFFSET ?
+                """,
+                (match, limit, offset),
+            ).fetchall()
+        tracer.count("search_index.queries")
+        payload["results"] = [
+            {
+                "arxiv_id": arxiv_id,
+                "title": title,
+                "url": url,
+                "published": published,
+                "categories": categories.split(),
+                "recommended": recommended,
+                "fit_score": fit_score,
+                "profiles": profiles.split(),
+                "snippet": snippet,
+                "score": -rank,
+            }
+            for arxiv_id, title, url, published, categories, recommended, fit_score, profiles, snippet, rank in rows
+        ]
+        return payload
+
+    def optimize(self) -> None:
+        """Merge FTS5 segments; worth running after a large backfill."""
+        with self._lock:
+            for table in ("docs_fts", "rec_fts"):
+                self._conn.execute(f"INSERT INTO {table}({table}) VALUES ('optimize')")
+            self._conn.commit()
+
+    def __len__(self) -> int:
+        with self._lock:
+            (count,) = self._conn.execute("SELECT COUNT(*) FROM docs").fetchone()
+        return count
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
@@ -0,0 +1,234 @@
+from __future__ import annotations
+
+import datetime
+import http.server
+import logging
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Any, Callable
+from urllib.parse import parse_qs, urlparse
+
+from utils.pipeline import paper_record
+from utils.tracing import tracer
+from utils.web_display import Asset, _json_asset, build_site, make_asset, search_payload, send_asset
+
+
+@dataclass(frozen=True)
+class RunSnapshot:
+    """One finished pipeline run. Never mutated, so readers can hold it without locking."""
+
+    run_id: int
+    started_at: str
+    finished_at: str
+    duration_s: float
+    papers: tuple[dict[str, Any], ...]
+    site: dict[str, Asset] = field(repr=False)  # precompressed shell and JSON pages, see `build_site`
+    by_id: dict[str, dict[str, Any]] = field(repr=False)
+
+
+class PaperService:
+    """Keeps the latest ranking in memory and re-runs the pipeline on demand or on a schedule.
+
+    `run_pipeline` returns the ranked papers to publish. Refreshes run in a background
+    thread; the new snapshot replaces the old one with a single reference swap, so
+    readers always see either the previous or the new ranking, never a partial one.
+    """
+
+    def __init__(
+        self,
+        run_pipeline: Callable[[], list[Any]],
+        refresh_interval_s: float | None = None,
+        max_runs: int = 50,
+        search_index: Any = None,
+    ):
+        self.run_pipeline = run_pipeline
+        self.search_index = search_index
+        self.refresh_interval_s = refresh_interval_s
+        self.max_runs = max_runs
+        self.current: RunSnapshot | None = None
+        self._runs: list[dict[str, Any]] = []
+        self._next_run_id = 1
+        self._refresh_lock = threading.Lock()
+        self._runs_lock = threading.Lock()
+        self._stop = threading.Event()
+
+    def runs(self) -> list[dict[str, Any]]:
+        with self._runs_lock:
+            return list(reversed(self._runs))
+
+    def refresh(self) -> bool:
+        """Run the pipeline now; returns False if a refresh is already in progress."""
+        if not self._refresh_lock.acquire(blocking=False):
+            return False
+        self._refresh_owned()
+        return True
+
+    def _refresh_owned(self) -> None:
+        """One pipeline run; the caller holds `_refresh_lock`, released here when the run ends."""
+        try:
+            with self._runs_lock:
+                run_id = self._next_run_id
+                self._next_run_id += 1
+                run = {
+                    "run_id": run_id,
+                    "status": "running",
+                    "started_at": _now(),
+                    "finished_at": None,
+                    "duration_s": None,
+                    "count": None,
+                    "error": None,
+                }
+                self._runs.append(run)
+                del self._runs[: -self.max_runs]
+            start = time.perf_counter()
+            # Rendering failures fail the run too, so `refresh()` never raises and the run never stays "running".
+            try:
+                with tracer.span("pipeline.run", run_id=run_id):
+                    papers = self.run_pipeline()
+                records = tuple(paper_record(paper, rank) for rank, paper in enumerate(papers, start=1))
+                duration = time.perf_counter() - start
+                snapshot = RunSnapshot(
+                    run_id=run_id,
+                    started_at=run["started_at"],
+                    finished_at=_now(),
+                    duration_s=duration,
+                    papers=records,
+                    site=build_site(papers),
+                    by_id={record["arxiv_id"]: record for record in records},
+                )
+            except Exception as exc:
+                logging.exception("Pipeline run %s failed", run_id)
+                run.update(status="failed", error=str(exc), finished_at=_now())
+                return
+            self.current = snapshot
+            run.update(
+                status="ok",
+                finished_at=snapshot.finished_at,
+                duration_s=duration,
+                count=len(records),
+            )
+            logging.info("Run %s published %s papers in %.1fs", run_id, len(records), duration)
+        finally:
+            self._refresh_lock.release()
+
+    def refresh_in_background(self) -> bool:
+        """Start a refresh thread; returns False if a refresh is already in progress."""
+        # The lock is taken here and handed to the thread, so two callers cannot both start one.
+        if not self._refresh_lock.acquire(blocking=False):
+            return False
+        try:
+            threading.Thread(target=self._refresh_owned, name="pipeline-refresh", daemon=True).start()
+        except BaseException:
+            self._refresh_lock.release()
+            raise
+        return True
+
+    def _schedule_loop(self) -> None:
+        while not self._stop.wait(self.refresh_interval_s):
+            try:
+                self.refresh()
+            except Exception:
+                # One bad run must not end the schedule.
+                logging.exception("Scheduled refresh failed")
+
+    def serve_forever(self, host: str = "127.0.0.1", port: int = 0) -> None:
+        server = http.server.ThreadingHTTPServer((host, port), _make_service_handler(self))
+        print(f"Service: http://{host}:{server.server_address[1]}/ (JSON: /papers, /papers/<id>, /runs, /search)")
+        print("Press Ctrl+C to stop the server.")
+        self.refresh_in_background()
+        if self.refresh_interval_s:
+            threading.Thread(target=self._schedule_loop, name="pipeline-schedule", daemon=True).start()
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            self._stop.set()
+            server.server_close()
+
+
+def _now() -> str:
+    return datetime.datetime.now(datetime.timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ")
+
+
+def _int_param(query: dict[str, list[str]], name: str, default: int, upper: int) -> int:
+    try:
+        value = int(query.get(name, [default])[0])
+    except ValueError:
+        value = default
+    return max(0, min(upper, value))
+
+
+def _make_service_handler(service: PaperService) -> type[http.server.BaseHTTPRequestHandler]:
+    class ServiceHandler(http.server.BaseHTTPRequestHandler):
+        def _send(self, status: int, body: bytes, content_type: str) -> None:
+            send_asset(self, make_asset(body, content_type, best=False), status=status)
+
+        def _json(self, payload: Any, status: int = 200) -> None:
+            send_asset(self, _json_asset(payload, best=False), status=status)
+
+        def do_GET(self) -> None:
+            tracer.count("http.requests")
+            with tracer.span("http.serve", path=self.path):
+                self._route_get()
+
+        def _route_get(self) -> None:
+            url = urlparse(self.path)
+            query = parse_qs(url.query)
+            path = url.path.rstrip("/") or "/"
+            snapshot = service.current
+            if path == "/metrics":
+                self._send(200, tracer.prometheus_text().encode("utf-8"), "text/plain; version=0.0.4")
+            elif path == "/search":
+                if service.search_index is None:
+                    self._json({"error": "search index disabled"}, status=404)
+                else:
+                    self._json(search_payload(service.search_index, query))
+            elif path == "/runs":
+                self._json({"runs": service.runs()})
+            elif path in ("/", "/index.html"):
+                if snapshot is None:
+                    self._send(503, b"<p>First run in progress, reload shortly.</p>", "text/html; charset=utf-8")
+                else:
+                    send_asset(self, snapshot.site["index.html"])
+            elif snapshot is None and path.startswith(("/papers", "/data/")):
+                self._json({"error": "no completed run yet"}, status=503)
+            elif path.startswith("/data/"):
+                asset = snapshot.site.get(path.lstrip("/"))
+                if asset is None:
+                    self._json({"error": "not found"}, status=404)
+                else:
+                    send_asset(self, asset)
+            elif path == "/papers":
+                offset = _int_param(query, "offset", 0, len(snapshot.papers))
+                limit = _int_param(query, "limit", 20, 200)
+                self._json(
+                    {
+                        "run_id": snapshot.run_id,
+                        "total": len(snapshot.papers),
+                        "offset": offset,
+                        "limit": limit,
+                        "papers": list(snapshot.papers[offset : offset + limit]),
+                    }
+                )
+            elif path.startswith("/papers/"):
+                record = snapshot.by_id.get(path.removeprefix("/papers/"))
+                if record is None:
+                    self._json({"error": "not found"}, status=404)
+                else:
+                    self._json(record)
+            else:
+                self._json({"error": "not found"}, status=404)
+
+        def do_POST(self) -> None:
+            if urlparse(self.path).path.rstrip("/") == "/runs":
+                started = service.refresh_in_background()
+                self._json({"started": started}, status=202 if started else 409)
+            else:
+                self._json({"error": "not found"}, status=404)
+
+        def log_message(self, format: str, *args) -> None:
+            return
+
+    return ServiceHandler
@@ -0,0 +1,133 @@
+from __future__ import annotations
+
+import contextlib
+import cProfile
+import json
+import os
+import re
+import threading
+import time
+import tracemalloc
+from collections import defaultdict
+from typing import Any, Iterator
+
+
+class Tracer:
+    """Process-wide spans and counters for pipeline runs.
+
+    Spans are recorded as Chrome trace "complete" events (`write_chrome_trace`, open in
+    chrome://tracing or Perfetto); counters and per-span totals are exposed as
+    Prometheus text (`prometheus_text`). With `profile_dir` set, spans opened with
+    `stage=True` also write a cProfile dump and a tracemalloc top-N report.
+    """
+
+    def __init__(self, max_events: int = 200_000):
+        self.max_events = max_events
+        self.profile_dir: str | None = None
+        self._events: list[dict[str, Any]] = []
+        self._counters: dict[str, float] = defaultdict(float)
+        self._span_totals: dict[str, list[float]] = defaultdict(lambda: [0.0, 0])
+        self._lock = threading.Lock()
+        self._profiling = False
+        self._profile_runs: dict[str, int] = defaultdict(int)
+        self._origin = time.perf_counter()
+        self._pid = os.getpid()
+
+    def count(self, name: str, value: float = 1) -> None:
+        with self._lock:
+            self._counters[name] += value
+
+    @contextlib.contextmanager
+    def span(self, name: str, stage: bool = False, **args: Any) -> Iterator[dict[str, Any]]:
+        """Time a block; the yielded dict can be filled with extra args while it runs."""
+        profiler = None
+        if stage and self.profile_dir:
+            with self._lock:
+                # Only one profiler can be active per interpreter; nested or concurrent
+                # stages (streaming mode) are timed but not profiled.
+                if not self._profiling:
+                    self._profiling = True
+                    profiler = cProfile.Profile()
+            if profiler is not None:
+                tracemalloc.start()
+                profiler.enable()
+        start = time.perf_counter()
+        try:
+            yield args
+        finally:
+            duration = time.perf_counter() - start
+            if profiler is not None:
+                profiler.disable()
+                self._write_profile(name, args, profiler)
+                with self._lock:
+                    self._profiling = False
+            with self._lock:
+                totals = self._span_totals[name]
+                totals[0] += duration
+                totals[1] += 1
+                if len(self._events) < self.max_events:
+                    self._events.append(
+                        {
+                            "name": name,
+                            "cat": "stage" if stage else name.split(".", 1)[0],
+                            "ph": "X",
+                            "ts": (start - self._origin) * 1e6,
+                            "dur": duration * 1e6,
+                            "pid": self._pid,
+                            "tid": threading.get_ident(),
+                            "args": args,
+                        }
+                    )
+
+    def _write_profile(self, name: str, args: dict[str, Any], profiler: cProfile.Profile) -> None:
+        snapshot = tracemalloc.take_snapshot()
+        tracemalloc.stop()
+        # A stage runs once per profile in batch mode (and once per refresh in the
+        # daemon): name files by profile and number repeats so none is overwritten.
+        label = re.sub(r"[^A-Za-z0-9_.-]+", "_", f"{name}-{args['profile']}" if args.get("profile") else name)
+        with self._lock:
+            self._profile_runs[label] += 1
+            run = self._profile_runs[label]
+        if run > 1:
+            label = f"{label}-{run}"
+        os.makedirs(self.profile_dir, exist_ok=True)
+        base = os.path.join(self.profile_dir, label)
+        profiler.dump_stats(base + ".prof")
+        with open(base + ".tracemalloc.txt", "w", encoding="utf-8") as f:
+            for stat in snapshot.statistics("lineno")[:25]:
+                f.write(f"{stat}\n")
+
+    def counters(self) -> dict[str, float]:
+        with self._lock:
+            return dict(self._counters)
+
+    def write_chrome_trace(self, path: str) -> None:
+        with self._lock:
+            events = list(self._events)
+            counters = dict(self._counters)
+        now_us = (time.perf_counter() - self._origin) * 1e6
+        events.extend(
+            {"name": name, "ph": "C", "ts": now_us, "pid": self._pid, "args": {"value": value}}
+            for name, value in counters.items()
+        )
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump({"traceEvents": events, "displayTimeUnit": "ms"}, f, default=str)
+
+    def prometheus_text(self) -> str:
+        with self._lock:
+            counters = dict(self._counters)
+            spans = {name: tuple(v) for name, v in self._span_totals.items()}
+        lines = []
+        for name, value in sorted(counters.items()):
+            metric = "arxivlens_" + re.sub(r"[^a-zA-Z0-9_]", "_", name) + "_total"
+            lines += [f"# TYPE {metric} counter", f"{metric} {value:g}"]
+        if spans:
+            lines.append("# TYPE arxivlens_span_seconds_sum counter")
+            lines += [f'arxivlens_span_seconds_sum{{span="{n}"}} {v[0]:.6f}' for n, v in sorted(spans.items())]
+            lines.append("# TYPE arxivlens_span_seconds_count counter")
+            lines += [f'arxivlens_span_seconds_count{{span="{n}"}} {v[1]}' for n, v in sorted(spans.items())]
+        return "\n".join(lines) + "\n"
+
+
+tracer = Tracer()
@@ -1,69 +1,344 @@
 from __future__ import annotations
 
+import gzip
+import hashlib
 import html
 import http.server
+import json
+import mimetypes
+import os
 import tempfile
+import threading
+from dataclasses import dataclass, field
 from pathlib import Path
-from typing import Iterable
-
-
-def _build_html(papers: Iterable[object]) -> str:
-    cards: list[str] = []
-    for idx, paper in enumerate(papers, start=1):
-        title = html.escape(getattr(paper, "title", "") or "")
-        url = html.escape(getattr(paper, "url", "") or "")
-        pdf_url = html.escape(getattr(paper, "pdf_url", "") or "")
-        paper_link = url or "#"
-        pdf_link = pdf_url or url or "#"
-        summary = html.escape(getattr(paper, "summary", "") or "")
-        reasons = getattr(paper, "llm_rerank_reasons", None) or []
-        reasons_items = "".join(
-            f"<li>{html.escape(reason)}</li>" for reason in reasons
-        )
-        if not reasons_items:
-            reasons_items = "<li>No recommendation reasons provided.</li>"
-        cards.append(
-            f"""
-            <article class="card" style="--i: {idx};">
-              <div class="card-header">
-                <span class="rank">#{idx:02d}</span>
-                <h2 class="title">{title}</h2>
-              </div>
-              <div class="links">
-                <a href="{paper_link}" target="_blank" rel="noopener">Paper</a>
-                <a href="{pdf_link}" target="_blank" rel="noopener">PDF</a>
-              </div>
-              <p class="summary">{summary}</p>
-              <div class="reasons">
-                <h3>Recommendation reasons</h3>
-                <ul>{reasons_items}</ul>
-              </div>
-            </article>
-            """
-        )
-
-    cards_html = "\n".join(cards) if cards else "<p>No papers to display.</p>"
-    return f"""<!doctype html>
+from typing import Any, Iterable
+from urllib.parse import parse_qs, urlparse
+
+from utils.tracing import tracer
+
+PAGE_SIZE = 50
+# Bodies below this are sent as-is: compression would not pay for its headers.
+MIN_COMPRESS_BYTES = 512
+
+
+@dataclass(frozen=True)
+class Asset:
+    """A response body with its precompressed variants and a content-hash ETag."""
+
+    body: bytes
+    content_type: str
+    etag: str
+    encoded: dict[str, bytes] = field(default_factory=dict, repr=False)  # "br" / "gzip" -> body
+
+
+def _brotli():
+    try:
+        import brotli
+    except ImportError:
+        return None
+    return brotli
+
+
+def make_asset(body: bytes, content_type: str, best: bool = True) -> Asset:
+    """`best` compresses hard (build time); otherwise fast settings for per-request bodies."""
+    encoded: dict[str, bytes] = {}
+    if len(body) >= MIN_COMPRESS_BYTES:
+        encoded["gzip"] = gzip.compress(body, compresslevel=9 if best else 5, mtime=0)
+        brotli = _brotli()
+        if brotli is not None:
+            encoded["br"] = brotli.compress(body, quality=11 if best else 5)
+    etag = f'W/"{hashlib.sha256(body).hexdigest()[:20]}"'
+    return Asset(body, content_type, etag, encoded)
+
+
+def _json_asset(payload: Any, best: bool = True) -> Asset:
+    body = json.dumps(payload, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+    return make_asset(body, "application/json", best=best)
+
+
+def _accepted_encodings(header: str | None) -> set[str]:
+    accepted = set()
+    for part in (header or "").split(","):
+        name, _, params = part.strip().partition(";")
+        q = params.strip().removeprefix("q=")
+        if name and not (params and q.replace(".", "", 1).isdigit() and float(q) == 0):
+            accepted.add(name.strip().lower())
+    return accepted
+
+
+def send_asset(
+    handler: http.server.BaseHTTPRequestHandler,
+    asset: Asset,
+    status: int = 200,
+    cache_control: str = "no-cache",
+    include_body: bool = True,
+) -> None:
+    """Send `asset`, answering If-None-Match with 304 and picking br > gzip > identity."""
+    if status == 200:
+        tags = [tag.strip() for tag in (handler.headers.get("If-None-Match") or "").split(",")]
+        if asset.etag in tags or "*" in tags:
+            handler.send_response(304)
+            handler.send_header("ETag", asset.etag)
+            handler.send_header("Cache-Control", cache_control)
+            handler.send_header("Vary", "Accept-Encoding")
+            handler.end_headers()
+            return
+    accepted = _accepted_encodings(handler.headers.get("Accept-Encoding"))
+    encoding = next((name for name in ("br", "gzip") if name in asset.encoded and name in accepted), None)
+    body = asset.encoded[encoding] if encoding else asset.body
+    handler.send_response(status)
+    handler.send_header("Content-Type", asset.content_type)
+    handler.send_header("Content-Length", str(len(body)))
+    handler.send_header("ETag", asset.etag)
+    handler.send_header("Cache-Control", cache_control)
+    handler.send_header("Vary", "Accept-Encoding")
+    if encoding:
+        handler.send_header("Content-Encoding", encoding)
+    handler.end_headers()
+    if include_body:
+        handler.wfile.write(body)
+
+
+def search_payload(search_index: Any, query: dict[str, list[str]]) -> dict[str, Any]:
+    """Run `/search?q=...&offset=0&limit=20&recommended=1` against a `SearchIndex`."""
+
+    def number(name: str, default: int, low: int, high: int) -> int:
+        try:
+            value = int(query.get(name, [default])[0])
+        except ValueError:
+            value = default
+        return max(low, min(high, value))
+
+    recommended = query.get("recommended", [""])[0].lower() in ("1", "true", "yes")
+    return search_index.search(
+        query.get("q", [""])[0],
+        offset=number("offset", 0, 0, 10_000),
+        limit=number("limit", 20, 1, 100),
+        recommended_only=recommended,
+    )
+
+
+def _reasons(paper: object) -> list[str]:
+    reasons = list(getattr(paper, "llm_rerank_reasons", None) or [])
+    if not reasons and getattr(paper, "llm_rerank_skipped", False):
+        return ["Not LLM-scored (deadline or budget reached); ranked by embedding score."]
+    return reasons or ["No recommendation reasons provided."]
+
+
+def _row(paper: object, rank: int) -> dict[str, Any]:
+    score = getattr(paper, "final_score", None)
+    return {
+        "rank": rank,
+        "arxiv_id": getattr(paper, "arxiv_id", "") or "",
+        "title": getattr(paper, "title", "") or "",
+        "url": getattr(paper, "url", "") or "",
+        "pdf_url": getattr(paper, "pdf_url", "") or "",
+        "score": score if score is not None else getattr(paper, "score", None),
+        "fit": getattr(paper, "llm_rerank_fit_score", None),
+        "skipped": bool(getattr(paper, "llm_rerank_skipped", False)),
+    }
+
+
+def build_site(papers: Iterable[object], page_size: int = PAGE_SIZE) -> dict[str, Asset]:
+    """The results page as relative path -> `Asset`.
+
+    `index.html` is a static shell; `data/manifest.json` gives the total and page
+    size, `data/page-NNNN.json` the list rows, and `data/details-NNNN.json` the
+    summaries and reasons, which the shell fetches only for pages scrolled into view.
+    """
+    with tracer.span("html.build") as span:
+        papers = list(papers)
+        span["papers"] = len(papers)
+        site = {"index.html": make_asset(_SHELL_HTML.encode("utf-8"), "text/html; charset=utf-8")}
+        pages = (len(papers) + page_size - 1) // page_size
+        site["data/manifest.json"] = _json_asset({"total": len(papers), "page_size": page_size, "pages": pages})
+        for page in range(pages):
+            chunk = papers[page * page_size : (page + 1) * page_size]
+            rows = [_row(paper, page * page_size + i) for i, paper in enumerate(chunk, start=1)]
+            details = [{"summary": getattr(p, "summary", "") or "", "reasons": _reasons(p)} for p in chunk]
+            site[f"data/page-{page:04d}.json"] = _json_asset(rows)
+            site[f"data/details-{page:04d}.json"] = _json_asset(details)
+        return site
+
+
+def write_papers_html(papers: Iterable[object], output_dir: str | Path, page_size: int = PAGE_SIZE) -> Path:
+    """Write the shell, JSON pages and their `.gz` / `.br` variants under `output_dir`."""
+    output_dir = Path(output_dir)
+    data_dir = output_dir / "data"
+    data_dir.mkdir(parents=True, exist_ok=True)
+    # Pages from a previous, longer run would otherwise linger next to the new manifest.
+    for stale in data_dir.glob("*.json*"):
+        stale.unlink()
+    for rel_path, asset in build_site(papers, page_size).items():
+        write_asset(output_dir / rel_path, asset)
+    return output_dir / "index.html"
+
+
+def write_asset(path: str | Path, asset: Asset) -> None:
+    """Write `asset` and its `.gz` / `.br` siblings, removing siblings it no longer has."""
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_bytes(asset.body)
+    for encoding, suffix in _SUFFIXES.items():
+        sibling = path.with_name(path.name + suffix)
+        if encoding in asset.encoded:
+            sibling.write_bytes(asset.encoded[encoding])
+        else:
+            sibling.unlink(missing_ok=True)
+
+
+def write_profile_index(profiles: dict[str, int], output_dir: str | Path) -> Path:
+    """Landing page linking to each profile's `<name>/index.html` with its paper count."""
+    items = "".join(
+        f'<li><a href="{html.escape(name)}/index.html">{html.escape(name)}</a> ({count} papers)</li>'
+        for name, count in profiles.items()
+    )
+    page = f"""<!doctype html>
+<html lang="en">
+  <head>
+    <meta charset="utf-8" />
+    <title>ArxivLens Profiles</title>
+  </head>
+  <body>
+    <h1>ArxivLens</h1>
+    <ul>{items or "<li>No profiles.</li>"}</ul>
+  </body>
+</html>
+"""
+    output_dir = Path(output_dir)
+    output_dir.mkdir(parents=True, exist_ok=True)
+    index_path = output_dir / "index.html"
+    index_path.write_text(page, encoding="utf-8")
+    return index_path
+
+
+def serve_directory(
+    directory: str | Path, host: str = "127.0.0.1", port: int = 0, search_index: Any = None
+) -> str:
+    """Serve `directory` until Ctrl+C; with a `SearchIndex`, also answer `GET /search`."""
+    handler = _make_handler(str(directory), search_index)
+    server = http.server.ThreadingHTTPServer((host, port), handler)
+    url = f"http://{host}:{server.server_address[1]}/"
+    print(f"Web results: {url}")
+    print("Press Ctrl+C to stop the server.")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+    return url
+
+
+def serve_papers(
+    papers: Iterable[object], host: str = "127.0.0.1", port: int = 0, search_index: Any = None
+) -> str:
+    with tempfile.TemporaryDirectory(prefix="arxivlens_web_") as tmp_dir:
+        write_papers_html(papers, tmp_dir)
+        return serve_directory(tmp_dir, host=host, port=port, search_index=search_index)
+
+
+_SUFFIXES = {"br": ".br", "gzip": ".gz"}
+_FILE_ASSETS: dict[str, tuple[tuple[int, int], Asset]] = {}
+_FILE_ASSETS_LOCK = threading.Lock()
+
+
+def _file_asset(path: str) -> Asset:
+    """`Asset` for a file on disk, using `.br` / `.gz` siblings when present; cached until the file changes."""
+    stat = os.stat(path)
+    key = (stat.st_mtime_ns, stat.st_size)
+    with _FILE_ASSETS_LOCK:
+        cached = _FILE_ASSETS.get(path)
+    if cached is not None and cached[0] == key:
+        return cached[1]
+    with open(path, "rb") as f:
+        body = f.read()
+    content_type = mimetypes.guess_type(path)[0] or "application/octet-stream"
+    if content_type.startswith("text/"):
+        content_type += "; charset=utf-8"
+    encoded = {}
+    for encoding, suffix in _SUFFIXES.items():
+        sibling = path + suffix
+        if os.path.exists(sibling) and os.stat(sibling).st_mtime_ns >= stat.st_mtime_ns:
+            with open(sibling, "rb") as f:
+                encoded[encoding] = f.read()
+    if encoded:
+        asset = Asset(body, content_type, f'W/"{hashlib.sha256(body).hexdigest()[:20]}"', encoded)
+    else:
+        asset = make_asset(body, content_type)
+    with _FILE_ASSETS_LOCK:
+        _FILE_ASSETS[path] = (key, asset)
+    return asset
+
+
+def _make_handler(directory: str, search_index: Any = None) -> type[http.server.SimpleHTTPRequestHandler]:
+    class QuietHandler(http.server.SimpleHTTPRequestHandler):
+        def __init__(self, *args, **kwargs):
+            super().__init__(*args, directory=directory, **kwargs)
+
+        def do_GET(self) -> None:
+            tracer.count("http.requests")
+            url = urlparse(self.path)
+            if url.path == "/search":
+                if search_index is None:
+                    send_asset(self, _json_asset({"error": "search index disabled"}), status=404)
+                else:
+                    send_asset(self, _json_asset(search_payload(search_index, parse_qs(url.query)), best=False))
+                return
+            if url.path == "/metrics":
+                body = tracer.prometheus_text().encode("utf-8")
+                self.send_response(200)
+                self.send_header("Content-Type", "text/plain; version=0.0.4")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+                return
+            with tracer.span("http.serve", path=self.path):
+                self._serve_file(include_body=True)
+
+        def do_HEAD(self) -> None:
+            self._serve_file(include_body=False)
+
+        def _serve_file(self, include_body: bool) -> None:
+            path = self.translate_path(self.path)
+            if os.path.isdir(path):
+                if not self.path.split("?", 1)[0].endswith("/"):
+                    # Directory listings and redirects stay with the stock handler.
+                    return super().do_GET() if include_body else super().do_HEAD()
+                path = os.path.join(path, "index.html")
+            if not os.path.isfile(path) or path.endswith(tuple(_SUFFIXES.values())):
+                self.send_error(404, "File not found")
+                return
+            send_asset(self, _file_asset(path), include_body=include_body)
+
+        def log_message(self, format: str, *args) -> None:
+            return
+
+    return QuietHandler
+
+
+_SHELL_HTML = """<!doctype html>
 <html lang="en">
   <head>
     <meta charset="utf-8" />
     <meta name="viewport" content="width=device-width, initial-scale=1" />
     <title>ArxivLens Results</title>
     <style>
-      :root {{
+      :root {
         --bg: #f6f1e8;
         --ink: #1f1e1c;
         --muted: #5e5a55;
         --accent: #2f6d6a;
         --card: #fffaf1;
         --shadow: rgba(28, 27, 26, 0.12);
-      }}
+        --row: 212px;
+      }
 
-      * {{
+      * {
         box-sizing: border-box;
-      }}
+      }
 
-      body {{
+      body {
         margin: 0;
         font-family: "Iowan Old Style", "Palatino", "Book Antiqua", "Georgia", serif;
         color: var(--ink);
@@ -71,160 +346,359 @@ def _build_html(papers: Iterable[object]) -> str:
           radial-gradient(circle at top left, rgba(46, 110, 105, 0.12), transparent 45%),
           radial-gradient(circle at top right, rgba(153, 114, 73, 0.12), transparent 40%),
           var(--bg);
-      }}
+      }
 
-      header {{
+      header {
         max-width: 1100px;
         margin: 52px auto 32px;
         padding: 0 24px;
-      }}
+      }
 
-      h1 {{
+      h1 {
         font-size: clamp(2.2rem, 4vw, 3rem);
         margin: 0 0 10px;
         letter-spacing: 0.02em;
-      }}
+      }
 
-      .subtitle {{
+      .subtitle {
         color: var(--muted);
         margin: 0;
         font-size: 1.05rem;
-      }}
+      }
 
-      main {{
+      main {
         max-width: 1100px;
         margin: 0 auto 60px;
         padding: 0 24px 24px;
-        display: grid;
-        gap: 22px;
-      }}
+      }
 
-      .card {{
+      #list {
+        position: relative;
+      }
+
+      .card {
+        position: absolute;
+        left: 0;
+        right: 0;
+        height: calc(var(--row) - 20px);
+        overflow: hidden;
         background: var(--card);
         border-radius: 18px;
-        padding: 24px 26px;
-        box-shadow: 0 20px 40px var(--shadow);
+        padding: 18px 24px;
+        box-shadow: 0 12px 28px var(--shadow);
         border: 1px solid rgba(31, 30, 28, 0.06);
-        animation: fadeUp 0.6s ease forwards;
-        opacity: 0;
-        animation-delay: calc(var(--i) * 0.05s);
-      }}
+      }
 
-      .card-header {{
+      .card-header {
         display: flex;
         gap: 14px;
         align-items: baseline;
-      }}
+      }
 
-      .rank {{
+      .rank {
         color: var(--accent);
         font-weight: 700;
         letter-spacing: 0.08em;
         font-size: 0.9rem;
-      }}
+      }
 
-      .title {{
+      .title {
         margin: 0;
-        font-size: 1.35rem;
-        line-height: 1.4;
-      }}
+        font-size: 1.2rem;
+        line-height: 1.35;
+        white-space: nowrap;
+        overflow: hidden;
+        text-overflow: ellipsis;
+      }
 
-      .links {{
-        margin: 12px 0 16px;
+      .links {
+        margin: 8px 0 10px;
         display: flex;
         gap: 16px;
         font-size: 0.95rem;
-      }}
+        align-items: baseline;
+      }
 
-      .links a {{
+      .links a,
+      .links button {
         color: var(--accent);
         text-decoration: none;
+        border: 0;
         border-bottom: 1px solid rgba(47, 109, 106, 0.3);
-      }}
+        background: none;
+        padding: 0;
+        font: inherit;
+        cursor: pointer;
+      }
 
-      .summary {{
+      .meta {
         color: var(--muted);
-        line-height: 1.6;
-        margin: 0 0 18px;
-      }}
+        font-size: 0.85rem;
+        margin-left: auto;
+      }
 
-      .reasons h3 {{
-        margin: 0 0 10px;
+      .summary {
+        color: var(--muted);
+        line-height: 1.5;
+        margin: 0 0 6px;
+        display: -webkit-box;
+        -webkit-line-clamp: 3;
+        -webkit-box-orient: vertical;
+        overflow: hidden;
+      }
+
+      .reason {
+        margin: 0;
+        white-space: nowrap;
+        overflow: hidden;
+        text-overflow: ellipsis;
+      }
+
+      #search {
+        margin-top: 18px;
+        display: flex;
+        gap: 10px;
+      }
+
+      #search input {
+        flex: 1;
+        font: inherit;
+        padding: 8px 12px;
+        border-radius: 10px;
+        border: 1px solid rgba(31, 30, 28, 0.2);
+        background: var(--card);
+      }
+
+      #hits {
+        margin: 0 0 28px;
+      }
+
+      #hits li {
+        margin-bottom: 12px;
+      }
+
+      #hits mark {
+        background: rgba(47, 109, 106, 0.18);
+      }
+
+      dialog {
+        max-width: 760px;
+        border: 0;
+        border-radius: 18px;
+        padding: 26px 30px;
+        background: var(--card);
+        color: var(--ink);
+        box-shadow: 0 20px 40px var(--shadow);
+      }
+
+      dialog h3 {
+        margin: 18px 0 10px;
         font-size: 1rem;
         text-transform: uppercase;
         letter-spacing: 0.12em;
         color: var(--accent);
-      }}
+      }
 
-      .reasons ul {{
-        margin: 0;
-        padding-left: 18px;
-        color: var(--ink);
-        line-height: 1.5;
-      }}
-
-      @keyframes fadeUp {{
-        from {{
-          transform: translateY(16px);
-          opacity: 0;
-        }}
-        to {{
-          transform: translateY(0);
-          opacity: 1;
-        }}
-      }}
-
-      @media (max-width: 700px) {{
-        .card {{
-          padding: 20px;
-        }}
-
-        .card-header {{
-          flex-direction: column;
-          align-items: flex-start;
-        }}
-      }}
+      dialog p {
+        line-height: 1.6;
+        color: var(--muted);
+      }
+
+      @media (max-width: 700px) {
+        :root {
+          --row: 244px;
+        }
+
+        .card {
+          padding: 16px 18px;
+        }
+      }
     </style>
   </head>
   <body>
     <header>
       <h1>ArxivLens</h1>
-      <p class="subtitle">Curated arXiv recommendations with summaries and reasons.</p>
+      <p class="subtitle" id="status">Curated arXiv recommendations with summaries and reasons.</p>
+      <form id="search">
+        <input name="q" type="search" placeholder="Search past papers (title:, authors:, prefix*)" />
+        <button>Search</button>
+      </form>
     </header>
     <main>
-      {cards_html}
+      <section id="hits" hidden></section>
+      <div id="list"></div>
     </main>
-  </body>
-</html>
-"""
+    <dialog id="details">
+      <h2 id="d-title"></h2>
+      <p id="d-summary"></p>
+      <h3>Recommendation reasons</h3>
+      <ul id="d-reasons"></ul>
+      <form method="dialog"><button>Close</button></form>
+    </dialog>
+    <script>
+      // Only the rows in (and just around) the viewport exist in the DOM. Rows come
+      // from data/page-NNNN.json, summaries from data/details-NNNN.json, both fetched
+      // when their page first scrolls into view.
+      const list = document.getElementById("list");
+      const status = document.getElementById("status");
+      const OVERSCAN = 6;
+      const pages = new Map();
+      const details = new Map();
+      let manifest = null;
+      let rowHeight = 0;
+      let scheduled = false;
 
+      function load(map, name, page) {
+        if (!map.has(page)) {
+          const file = `data/${name}-${String(page).padStart(4, "0")}.json`;
+          map.set(page, null);
+          fetch(file)
+            .then((r) => (r.ok ? r.json() : Promise.reject(r.status)))
+            .then((data) => { map.set(page, data); schedule(); })
+            .catch(() => map.delete(page));
+        }
+        return map.get(page);
+      }
 
-def serve_papers(papers: Iterable[object], host: str = "127.0.0.1", port: int = 0) -> str:
-    with tempfile.TemporaryDirectory(prefix="arxivlens_web_") as tmp_dir:
-        output_dir = Path(tmp_dir)
-        html_path = output_dir / "index.html"
-        html_path.write_text(_build_html(papers), encoding="utf-8")
-
-        handler = _make_handler(str(output_dir))
-        server = http.server.ThreadingHTTPServer((host, port), handler)
-        url = f"http://{host}:{server.server_address[1]}/"
-        print(f"Web results: {url}")
-        print("Press Ctrl+C to stop the server.")
-        try:
-            server.serve_forever()
-        except KeyboardInterrupt:
-            pass
-        finally:
-            server.server_close()
-        return url
+      function el(tag, cls, text) {
+        const node = document.createElement(tag);
+        if (cls) node.className = cls;
+        if (text !== undefined) node.textContent = text;
+        return node;
+      }
 
+      function link(label, href) {
+        const a = el("a", "", label);
+        a.href = /^https?:/.test(href) ? href : "#";
+        a.target = "_blank";
+        a.rel = "noopener";
+        return a;
+      }
 
-def _make_handler(directory: str) -> type[http.server.SimpleHTTPRequestHandler]:
-    class QuietHandler(http.server.SimpleHTTPRequestHandler):
-        def __init__(self, *args, **kwargs):
-            super().__init__(*args, directory=directory, **kwargs)
+      function card(index) {
+        const page = Math.floor(index / manifest.page_size);
+        const offset = index % manifest.page_size;
+        const rows = load(pages, "page", page);
+        const node = el("article", "card");
+        node.style.top = `${index * rowHeight}px`;
+        const row = rows && rows[offset];
+        if (!row) {
+          node.append(el("p", "summary", "Loading..."));
+          return node;
+        }
+        const header = el("div", "card-header");
+        header.append(el("span", "rank", `#${String(row.rank).padStart(2, "0")}`), el("h2", "title", row.title));
+        header.title = row.title;
+        const links = el("div", "links");
+        const more = el("button", "", "Details");
+        more.onclick = () => openDetails(row, page, offset);
+        const meta = [];
+        if (row.score !== null) meta.push(`score ${Number(row.score).toFixed(3)}`);
+        if (row.fit !== null) meta.push(`fit ${row.fit}/10`);
+        if (row.skipped) meta.push("not LLM-scored");
+        links.append(link("Paper", row.url), link("PDF", row.pdf_url || row.url), more, el("span", "meta", meta.join(" · ")));
+        const info = load(details, "details", page);
+        const detail = info && info[offset];
+        node.append(
+          header,
+          links,
+          el("p", "summary", detail ? detail.summary : "..."),
+          el("p", "reason", detail ? detail.reasons[0] : "")
+        );
+        return node;
+      }
 
-        def log_message(self, format: str, *args) -> None:
-            return
+      function openDetails(row, page, offset) {
+        const info = details.get(page);
+        const detail = info && info[offset];
+        document.getElementById("d-title").textContent = row.title;
+        document.getElementById("d-summary").textContent = detail ? detail.summary : "Loading...";
+        const reasons = document.getElementById("d-reasons");
+        reasons.replaceChildren(...(detail ? detail.reasons : []).map((r) => el("li", "", r)));
+        document.getElementById("details").showModal();
+      }
 
-    return QuietHandler
+      function render() {
+        scheduled = false;
+        const top = list.getBoundingClientRect().top;
+        const first = Math.max(0, Math.floor(-top / rowHeight) - OVERSCAN);
+        const last = Math.min(manifest.total, Math.ceil((window.innerHeight - top) / rowHeight) + OVERSCAN);
+        const nodes = [];
+        for (let i = first; i < last; i++) nodes.push(card(i));
+        list.replaceChildren(...nodes);
+      }
+
+      function schedule() {
+        if (!scheduled && manifest) {
+          scheduled = true;
+          requestAnimationFrame(render);
+        }
+      }
+
+      function measure() {
+        rowHeight = parseFloat(getComputedStyle(document.documentElement).getPropertyValue("--row")) || 212;
+        if (manifest) list.style.height = `${manifest.total * rowHeight}px`;
+      }
+
+      // Full-text search over the local index (served as /search when one is configured).
+      const hits = document.getElementById("hits");
+      let searchQuery = "";
+      let searchOffset = 0;
+
+      function snippet(text) {
+        const p = el("p", "summary");
+        text.split("\u0002").forEach((part, i) => {
+          const [hit, rest] = i ? part.split("\u0003") : [null, part];
+          if (hit !== null) p.append(el("mark", "", hit));
+          p.append(rest || "");
+        });
+        return p;
+      }
+
+      function search(offset) {
+        const params = new URLSearchParams({ q: searchQuery, offset: String(offset), limit: "20" });
+        fetch(`/search?${params}`)
+          .then((r) => (r.ok ? r.json() : Promise.reject(r.status)))
+          .then((data) => {
+            const list = offset ? hits.querySelector("ol") : el("ol");
+            if (!offset) hits.replaceChildren(el("p", "subtitle", `${data.total} matches`), list);
+            for (const hit of data.results) {
+              const item = el("li");
+              const meta = [hit.published, hit.categories.join(" "), hit.recommended ? `recommended ${hit.recommended}` : "", hit.profiles.join(", ")];
+              item.append(link(hit.title, hit.url), el("span", "meta", ` ${meta.filter(Boolean).join(" · ")}`), snippet(hit.snippet));
+              list.append(item);
+            }
+            hits.querySelector("button")?.remove();
+            searchOffset = offset + data.results.length;
+            if (searchOffset < data.total) {
+              const more = el("button", "", "More results");
+              more.onclick = () => search(searchOffset);
+              hits.append(more);
+            }
+            hits.hidden = false;
+          })
+          .catch(() => { hits.replaceChildren(el("p", "subtitle", "Search is not available here.")); hits.hidden = false; });
+      }
+
+      document.getElementById("search").addEventListener("submit", (event) => {
+        event.preventDefault();
+        searchQuery = new FormData(event.target).get("q").trim();
+        if (searchQuery) search(0);
+        else hits.hidden = true;
+      });
+
+      fetch("data/manifest.json")
+        .then((r) => r.json())
+        .then((data) => {
+          manifest = data;
+          if (!data.total) status.textContent = "No papers to display.";
+          measure();
+          schedule();
+        })
+        .catch(() => { status.textContent = "Could not load results."; });
+      window.addEventListener("scroll", schedule, { passive: true });
+      window.addEventListener("resize", () => { measure(); schedule(); });
+    </script>
+  </body>
+</html>
+"""